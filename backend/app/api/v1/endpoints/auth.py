@@ -2,11 +2,13 @@
 Authentication API endpoints
 """
 
+from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
 from app.middleware.auth import get_current_user
+from app.services.api_keys import api_key_service
 
 router = APIRouter()
 
@@ -53,12 +55,14 @@ async def list_api_keys(
 
 @router.delete("/api-keys/{key_id}")
 async def delete_api_key(
-    key_id: str,
+    key_id: UUID,
     user: dict = Depends(get_current_user),
 ):
     """Delete an API key."""
-    # TODO: Implement API key deletion
-    raise HTTPException(status_code=501, detail="Not implemented yet")
+    deleted = await api_key_service.delete_api_key(key_id, user["user_id"])
+    if not deleted:
+        raise HTTPException(status_code=404, detail="API key not found")
+    return {"message": "API key deleted successfully"}
 
 
 @router.get("/me")
@@ -6,11 +6,19 @@ Connections API endpoints
 from fastapi import APIRouter, Depends, HTTPException, Query
 from kurobe.core.schemas import ConnectionRequest, ConnectionResponse
 
+from app.core.cache import invalidate_query_results
 from app.middleware.auth import get_current_user
+from app.schemas import CacheInvalidationRequest, CacheInvalidationResponse
+from app.services.connections import ConnectionService
 
 router = APIRouter()
 
 
+def get_connection_service() -> ConnectionService:
+    """Dependency to get connection service."""
+    return ConnectionService()
+
+
 @router.post("/", response_model=ConnectionResponse)
 async def create_connection(
     request: ConnectionRequest,
@@ -40,3 +48,22 @@ async def test_connection(
     """Test a data connection."""
     # TODO: Implement connection testing
     raise HTTPException(status_code=501, detail="Not implemented yet")
+
+
+@router.post("/{connection_id}/cache/invalidate", response_model=CacheInvalidationResponse)
+async def invalidate_connection_cache(
+    connection_id: str,
+    request: CacheInvalidationRequest,
+    user: dict = Depends(get_current_user),
+    service: ConnectionService = Depends(get_connection_service),
+):
+    """Invalidate cached query results that read the given tables of a connection."""
+    connection = await service.get_connection(connection_id)
+    if not connection:
+        raise HTTPException(status_code=404, detail="Connection not found")
+    if not service.can_manage(connection, user):
+        raise HTTPException(status_code=403, detail="Not allowed to manage this connection")
+
+    # Results are cached under the connection's name
+    invalidated = await invalidate_query_results(connection["name"], request.tables)
+    return CacheInvalidationResponse(connection_id=connection_id, tables=request.tables, invalidated=invalidated)
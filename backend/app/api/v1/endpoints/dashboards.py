@@ -5,13 +5,22 @@ Dashboards API endpoints
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from kurobe.core.schemas import DashboardRequest, DashboardResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from kurobe.core.schemas import DashboardRequest, DashboardResponse, DashboardSummary, PanelResultResponse
 
+from app.core.projection import parse_fields
 from app.middleware.auth import get_current_user
+from app.services.dashboards import DASHBOARD_FIELDS, DashboardService
 
 router = APIRouter()
 
 
+def get_dashboard_service() -> DashboardService:
+    """Dependency to get dashboard service."""
+    return DashboardService()
+
+
 @router.post("/", response_model=DashboardResponse)
 async def create_dashboard(
     request: DashboardRequest,
@@ -32,12 +41,34 @@ async def get_dashboard(
     raise HTTPException(status_code=501, detail="Not implemented yet")
 
 
-@router.get("/", response_model=list[DashboardResponse])
+@router.get("/{dashboard_id}/results", response_model=list[PanelResultResponse])
+async def get_dashboard_results(
+    dashboard_id: UUID,
+    user: dict = Depends(get_current_user),
+    service: DashboardService = Depends(get_dashboard_service),
+):
+    """Get the current results of a dashboard's panels, refreshed on its refresh interval."""
+    results = await service.get_panel_results(dashboard_id, user["user_id"])
+    if results is None:
+        raise HTTPException(status_code=404, detail="Dashboard not found")
+    return results
+
+
+@router.get("/", response_model=list[DashboardResponse] | list[DashboardSummary])
 async def list_dashboards(
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. id,name,updated_at"),
     user: dict = Depends(get_current_user),
+    service: DashboardService = Depends(get_dashboard_service),
 ):
-    """List dashboards."""
-    # TODO: Implement dashboard listing
-    raise HTTPException(status_code=501, detail="Not implemented yet")
+    """List dashboards, newest first."""
+    try:
+        selected = parse_fields(fields, DASHBOARD_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    dashboards = await service.list_dashboards(user["user_id"], limit=limit, offset=offset, fields=selected)
+    if selected:
+        # Sent as is: validating summaries against the response model could fill in unselected fields
+        return JSONResponse(jsonable_encoder(dashboards))
+    return dashboards
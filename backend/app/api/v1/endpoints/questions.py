@@ -4,16 +4,25 @@ Questions API endpoints
 
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from kurobe.core.schemas import (
+    ChatHistoryResponse,
     ChatRequest,
     ChatResponse,
+    PanelResultResponse,
+    QuestionListResponse,
     QuestionRequest,
     QuestionResponse,
+    QuestionSummaryListResponse,
 )
 
+from app.core.conditional import etag_matches
+from app.core.config import settings
+from app.core.projection import parse_fields
 from app.middleware.auth import get_current_user
-from app.services.questions import QuestionService
+from app.services.questions import QUESTION_FIELDS, QuestionService
 
 router = APIRouter()
 
@@ -46,24 +55,36 @@ async def get_question(
     return question
 
 
-@router.get("/", response_model=list[QuestionResponse])
+@router.get("/", response_model=QuestionListResponse | QuestionSummaryListResponse)
 async def list_questions(
-    limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    offset: int = Query(0, ge=0, deprecated=True),
     status: str | None = Query(None),
     tags: str | None = Query(None),
+    fields: str | None = Query(None, description="Comma-separated fields to return, e.g. id,text,status"),
     user: dict = Depends(get_current_user),
     service: QuestionService = Depends(get_question_service),
 ):
-    """List questions with optional filters."""
+    """List questions with optional filters, newest first."""
     tag_list = tags.split(",") if tags else None
-    return await service.list_questions(
-        user_id=user["user_id"],
-        limit=limit,
-        offset=offset,
-        status=status,
-        tags=tag_list,
-    )
+    try:
+        selected = parse_fields(fields, QUESTION_FIELDS)
+        page = await service.list_questions(
+            user_id=user["user_id"],
+            limit=limit,
+            offset=offset,
+            status=status,
+            tags=tag_list,
+            cursor=cursor,
+            fields=selected,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if selected:
+        # Sent as is: validating summaries against the response model could fill in unselected fields
+        return JSONResponse(jsonable_encoder(page))
+    return page
 
 
 @router.put("/{question_id}", response_model=QuestionResponse)
@@ -111,12 +132,54 @@ async def chat_with_question(
 @router.get("/{question_id}/panels")
 async def get_question_panels(
     question_id: UUID,
+    limit: int | None = Query(None, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
     user: dict = Depends(get_current_user),
     service: QuestionService = Depends(get_question_service),
 ):
-    """Get all panels for a question."""
-    panels = await service.get_question_panels(question_id, user["user_id"])
-    return {"panels": panels}
+    """Get the panels of a question, oldest first; all of them unless ``limit`` is given."""
+    try:
+        panels, next_cursor = await service.get_question_panels(question_id, user["user_id"], limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"panels": panels, "next_cursor": next_cursor}
+
+
+@router.get("/{question_id}/panels/{panel_id}/result", response_model=PanelResultResponse)
+async def get_panel_result(
+    question_id: UUID,
+    panel_id: UUID,
+    request: Request,
+    response: Response,
+    user: dict = Depends(get_current_user),
+    service: QuestionService = Depends(get_question_service),
+):
+    """Get the data and query result of a panel, fetched when the panel is rendered."""
+    result = await service.get_panel_result(question_id, panel_id, user["user_id"])
+    if not result:
+        raise HTTPException(status_code=404, detail="Panel result not found")
+
+    # Results are content-addressed, so their hash is a strong validator
+    etag = f'"{result.result_hash}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return result
+
+
+@router.get("/{question_id}/messages", response_model=ChatHistoryResponse)
+async def get_chat_history(
+    question_id: UUID,
+    limit: int = Query(settings.DEFAULT_PAGE_SIZE, ge=1, le=settings.MAX_PAGE_SIZE),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    user: dict = Depends(get_current_user),
+    service: QuestionService = Depends(get_question_service),
+):
+    """Get the chat messages of a question, oldest first."""
+    try:
+        return await service.get_chat_history(question_id, user["user_id"], limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/{question_id}/retry", response_model=QuestionResponse)
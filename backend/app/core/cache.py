@@ -5,26 +5,85 @@ Redis cache service for Kurobe
 import asyncio
 import hashlib
 import json
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable
+from typing import Any
 
 import redis.asyncio as redis
 
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.metrics import CACHE_LOOKUPS, QUERY_RESULT_BYTES, register_pool
+from app.core.sql import extract_tables, normalize_table_name
 
-# Redis client and connection pool
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+
+    _zstd_compressor = zstandard.ZstdCompressor(level=3)
+    _zstd_decompressor = zstandard.ZstdDecompressor()
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# Redis clients and connection pools; binary_client returns raw bytes
 client: redis.Redis | None = None
 pool: redis.ConnectionPool | None = None
+binary_client: redis.Redis | None = None
+binary_pool: redis.ConnectionPool | None = None
 _initialized = False
 _init_lock = asyncio.Lock()
 
 # Constants
 REDIS_KEY_TTL = 3600 * 24  # 24 hour TTL as safety mechanism
 QUERY_CACHE_TTL = 3600  # 1 hour for query results
+QUERY_CACHE_SOFT_TTL = 300  # results older than 5 minutes are refreshed in the background
+REFRESH_LEASE_TTL = 60  # upper bound on how often one key is refreshed
+COMPRESSION_MIN_BYTES = 1024  # smaller payloads are stored uncompressed
+INVALIDATION_CHANNEL = "query_cache:invalidate"  # keys dropped from local tiers on every replica
+
+
+class CountingConnectionPool(redis.ConnectionPool):
+    """Connection pool that counts its connections for the pool metrics."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created_connections = 0
+        self.in_use_connections = 0
+
+    def reset(self):
+        super().reset()
+        self.created_connections = 0
+        self.in_use_connections = 0
+
+    def make_connection(self):
+        connection = super().make_connection()
+        self.created_connections += 1
+        return connection
+
+    def get_available_connection(self):
+        connection = super().get_available_connection()
+        self.in_use_connections += 1
+        return connection
+
+    async def release(self, connection):
+        await super().release(connection)
+        self.in_use_connections -= 1
 
 
 def initialize():
-    """Initialize Redis connection pool and client."""
-    global client, pool
+    """Initialize Redis connection pools and clients."""
+    global client, pool, binary_client, binary_pool
 
     # Get Redis configuration from settings
     redis_url = str(settings.REDIS_URL)
@@ -39,20 +98,22 @@ def initialize():
 
         logger.debug(f"Initializing Redis connection pool with max {max_connections} connections")
 
-        # Create connection pool with production-optimized settings
-        pool = redis.ConnectionPool.from_url(
-            redis_url,
-            decode_responses=True,
-            socket_timeout=socket_timeout,
-            socket_connect_timeout=connect_timeout,
-            socket_keepalive=True,
-            retry_on_timeout=retry_on_timeout,
-            health_check_interval=30,
-            max_connections=max_connections,
-        )
-
-        # Create Redis client from connection pool
+        # Create connection pools with production-optimized settings; cached
+        # query results are binary, so they get a pool without response decoding
+        pool_options = {
+            "socket_timeout": socket_timeout,
+            "socket_connect_timeout": connect_timeout,
+            "socket_keepalive": True,
+            "retry_on_timeout": retry_on_timeout,
+            "health_check_interval": 30,
+            "max_connections": max_connections,
+        }
+        pool = CountingConnectionPool.from_url(redis_url, decode_responses=True, **pool_options)
+        binary_pool = CountingConnectionPool.from_url(redis_url, decode_responses=False, **pool_options)
+
+        # Create Redis clients from connection pools
         client = redis.Redis(connection_pool=pool)
+        binary_client = redis.Redis(connection_pool=binary_pool)
 
     return client
 
@@ -86,8 +147,25 @@ async def initialize_async():
 
 
 async def close():
-    """Close Redis connection and connection pool."""
-    global client, pool, _initialized
+    """Close Redis connections and connection pools."""
+    global client, pool, binary_client, binary_pool, _initialized, _token_bucket_script
+    _token_bucket_script = None
+    if binary_client:
+        try:
+            await asyncio.wait_for(binary_client.aclose(), timeout=5.0)
+        except Exception as e:
+            logger.warning(f"Error closing Redis binary client: {e}")
+        finally:
+            binary_client = None
+
+    if binary_pool:
+        try:
+            await asyncio.wait_for(binary_pool.aclose(), timeout=5.0)
+        except Exception as e:
+            logger.warning(f"Error closing Redis binary pool: {e}")
+        finally:
+            binary_pool = None
+
     if client:
         logger.debug("Closing Redis connection")
         try:
@@ -114,6 +192,19 @@ async def close():
     logger.debug("Redis connection and pool closed")
 
 
+def _pool_stats() -> tuple[int, int, int] | None:
+    """In-use, idle and maximum connections across both Redis pools."""
+    pools = [p for p in (pool, binary_pool) if isinstance(p, CountingConnectionPool)]
+    if not pools:
+        return None
+    in_use = sum(p.in_use_connections for p in pools)
+    idle = sum(p.created_connections - p.in_use_connections for p in pools)
+    return in_use, idle, sum(p.max_connections for p in pools)
+
+
+register_pool("redis", _pool_stats)
+
+
 async def get_client():
     """Get the Redis client, initializing if necessary."""
     global client, _initialized
@@ -122,6 +213,13 @@ async def get_client():
     return client
 
 
+async def get_binary_client():
+    """Get the Redis client that returns raw bytes, initializing if necessary."""
+    if binary_client is None or not _initialized:
+        await initialize_async()
+    return binary_client
+
+
 # Basic Redis operations
 async def set(key: str, value: str, ex: int | None = None, nx: bool = False):
     """Set a Redis key."""
@@ -136,6 +234,23 @@ async def get(key: str, default: str | None = None):
     return result if result is not None else default
 
 
+async def incr(key: str, ex: int | None = None) -> int:
+    """Increment a counter, setting its expiry when it is created.
+
+    The increment and the expiry run in one transaction, so a counter never
+    outlives a failure between them; ``EXPIRE NX`` (Redis 7) leaves the
+    expiry of an existing counter alone.
+    """
+    redis_client = await get_client()
+    if ex is None:
+        return await redis_client.incr(key)
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.incr(key)
+    pipe.expire(key, ex, nx=True)
+    value, _ = await pipe.execute()
+    return value
+
+
 async def delete(key: str):
     """Delete a Redis key."""
     redis_client = await get_client()
@@ -172,35 +287,433 @@ def generate_query_cache_key(query: str, connection_id: str, parameters: dict |
     return f"query_cache:{query_hash}"
 
 
+# Binary encoding for cached values: a 2-byte header naming the serializer
+# (m = msgpack, j = json) and the compression (z = zstd, 4 = lz4, d = zlib, - = none)
+def _serialize(value: Any) -> tuple[bytes, bytes]:
+    if msgpack is not None:
+        return b"m", msgpack.packb(value, default=str, use_bin_type=True)
+    return b"j", json.dumps(value, separators=(",", ":"), default=str).encode()
+
+
+def _compress(serializer: bytes, body: bytes) -> bytes:
+    if len(body) < COMPRESSION_MIN_BYTES:
+        return serializer + b"-" + body
+    if zstandard is not None:
+        return serializer + b"z" + _zstd_compressor.compress(body)
+    if lz4_frame is not None:
+        return serializer + b"4" + lz4_frame.compress(body)
+    return serializer + b"d" + zlib.compress(body, 3)
+
+
+def _decode(payload: bytes) -> tuple[Any, int]:
+    """Decode a payload, returning the value and its uncompressed size."""
+    if payload[:1] in (b"{", b"["):
+        # Plain JSON written before the binary encoding existed
+        return json.loads(payload), len(payload)
+
+    serializer, compression, body = payload[:1], payload[1:2], payload[2:]
+    if compression == b"z":
+        if zstandard is None:
+            raise ValueError("zstandard is required to decode this cache entry")
+        body = _zstd_decompressor.decompress(body)
+    elif compression == b"4":
+        if lz4_frame is None:
+            raise ValueError("lz4 is required to decode this cache entry")
+        body = lz4_frame.decompress(body)
+    elif compression == b"d":
+        body = zlib.decompress(body)
+
+    if serializer == b"m":
+        if msgpack is None:
+            raise ValueError("msgpack is required to decode this cache entry")
+        return msgpack.unpackb(body, raw=False, strict_map_key=False), len(body)
+    return json.loads(body), len(body)
+
+
+def encode_value(value: Any) -> bytes:
+    """Encode a value in the compact binary cache format."""
+    return _compress(*_serialize(value))
+
+
+def decode_value(payload: bytes) -> Any:
+    """Decode a value written by ``encode_value``."""
+    return _decode(payload)[0]
+
+
+class LocalCache:
+    """Process-local LRU cache bounded by the total size of its entries.
+
+    Values are returned as stored, so callers must treat them as read-only.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[Any, int, float, float | None]] = OrderedDict()
+        self._size = 0
+
+    def get(self, key: str) -> Any:
+        """Get a value, or None if missing or expired."""
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> tuple[Any, float | None] | None:
+        """Get a value and the monotonic time its source entry expires, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] <= time.monotonic():
+            self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[0], entry[3]
+
+    def set(self, key: str, value: Any, size: int, ttl: float, expires_at: float | None = None):
+        """Store a value, evicting least recently used entries to stay within budget.
+
+        ``ttl`` bounds how long this tier keeps the value; ``expires_at`` records
+        when the entry it mirrors expires (None if it never does).
+        """
+        self.delete(key)
+        if size > self.max_bytes or ttl <= 0:
+            return
+        self._entries[key] = (value, size, time.monotonic() + ttl, expires_at)
+        self._size += size
+        while self._size > self.max_bytes:
+            _, (_, evicted_size, _, _) = self._entries.popitem(last=False)
+            self._size -= evicted_size
+
+    def delete(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[1]
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# In-process tier in front of Redis for query results
+local_cache = LocalCache(settings.QUERY_CACHE_LOCAL_MAX_BYTES)
+
+# Lookup counts per tier, for hit ratios
+_lookup_counts = {"local": {"hit": 0, "miss": 0}, "redis": {"hit": 0, "miss": 0}}
+
+
+def _record_lookup(tier: str, hit: bool):
+    result = "hit" if hit else "miss"
+    _lookup_counts[tier][result] += 1
+    CACHE_LOOKUPS.labels(tier=tier, result=result).inc()
+
+
+def get_cache_stats() -> dict:
+    """Get hit ratios per cache tier and the local tier's footprint."""
+    stats = {}
+    for tier, counts in _lookup_counts.items():
+        total = counts["hit"] + counts["miss"]
+        stats[tier] = {**counts, "hit_ratio": counts["hit"] / total if total else 0.0}
+    stats["local"]["entries"] = len(local_cache)
+    stats["local"]["size_bytes"] = local_cache.size_bytes
+    return stats
+
+
 async def cache_query_result(
     query: str, connection_id: str, result: dict, parameters: dict | None = None, ttl: int = QUERY_CACHE_TTL
 ):
-    """Cache a query result."""
+    """Cache a query result in the local and Redis tiers."""
+    await _cache_query_results([(query, connection_id, parameters, result)], ttl)
+
+
+async def _cache_query_results(items: list[tuple[str, str, dict | None, dict]], ttl: int):
+    """Cache ``(query, connection_id, parameters, result)`` items with one Redis round-trip."""
+    if not items:
+        return
     try:
-        cache_key = generate_query_cache_key(query, connection_id, parameters)
-        result_json = json.dumps(result)
-        await set(cache_key, result_json, ex=ttl)
-        logger.debug(f"Cached query result with key: {cache_key}")
+        redis_client = await get_binary_client()
+        pipe = redis_client.pipeline(transaction=False)
+        now = time.time()
+        index_ttl = max(ttl, REDIS_KEY_TTL)
+        for query, connection_id, parameters, result in items:
+            cache_key = generate_query_cache_key(query, connection_id, parameters)
+            serializer, body = _serialize(result)
+            local_cache.set(
+                cache_key, result, len(body), min(ttl, settings.QUERY_CACHE_LOCAL_TTL), time.monotonic() + ttl
+            )
+
+            # Index the result under every table it read, so invalidation can find it.
+            # Members are scored by when their result expires, so expired ones are trimmed
+            payload = _compress(serializer, body)
+            QUERY_RESULT_BYTES.labels(connection_id=connection_id).observe(len(payload))
+            pipe.set(cache_key, payload, ex=ttl)
+            for index_key in [_dependency_key(connection_id)] + [
+                _dependency_key(connection_id, table) for table in extract_tables(query)
+            ]:
+                pipe.zadd(index_key, {cache_key: now + ttl})
+                pipe.zremrangebyscore(index_key, "-inf", now)
+                pipe.expire(index_key, index_ttl)
+            logger.debug(f"Caching query result with key: {cache_key}")
+        await pipe.execute()
     except Exception as e:
-        logger.warning(f"Failed to cache query result: {e}")
+        logger.warning(f"Failed to cache query results: {e}")
+
+
+async def _lookup_query_results(cache_keys: list[str]) -> list[tuple[Any, float | None] | None]:
+    """Find cached results and the monotonic times they expire.
+
+    Keys missing from the local tier are fetched from Redis in one round-trip.
+    """
+    entries = [local_cache.get_entry(cache_key) for cache_key in cache_keys]
+    missing = [i for i, entry in enumerate(entries) if entry is None]
+    for entry in entries:
+        _record_lookup("local", entry is not None)
+    if not missing:
+        return entries
+
+    redis_client = await get_binary_client()
+    pipe = redis_client.pipeline(transaction=False)
+    for i in missing:
+        pipe.get(cache_keys[i])
+        pipe.pttl(cache_keys[i])
+    replies = await pipe.execute()
+
+    now = time.monotonic()
+    for n, i in enumerate(missing):
+        cache_key = cache_keys[i]
+        payload, ttl_ms = replies[2 * n], replies[2 * n + 1]
+
+        _record_lookup("redis", payload is not None)
+        if payload is None:
+            logger.debug(f"Cache miss for query key: {cache_key}")
+            continue
+
+        logger.debug(f"Cache hit for query key: {cache_key}")
+        result, size = _decode(payload)
+
+        # PTTL is -1 for keys without an expiry and -2 if the key expired meanwhile
+        expires_at = now + ttl_ms / 1000 if ttl_ms >= 0 else None
+        if ttl_ms != -2:
+            local_ttl = settings.QUERY_CACHE_LOCAL_TTL
+            if ttl_ms >= 0:
+                local_ttl = min(ttl_ms / 1000, local_ttl)
+            local_cache.set(cache_key, result, size, local_ttl, expires_at)
+        entries[i] = (result, expires_at)
+
+    return entries
 
 
 async def get_cached_query_result(query: str, connection_id: str, parameters: dict | None = None) -> dict | None:
-    """Get a cached query result."""
+    """Get a cached query result, trying the local tier before Redis."""
     try:
-        cache_key = generate_query_cache_key(query, connection_id, parameters)
-        cached_result = await get(cache_key)
-        if cached_result:
-            logger.debug(f"Cache hit for query key: {cache_key}")
-            return json.loads(cached_result)
-        else:
-            logger.debug(f"Cache miss for query key: {cache_key}")
-            return None
+        entry = (await _lookup_query_results([generate_query_cache_key(query, connection_id, parameters)]))[0]
+        return entry[0] if entry is not None else None
     except Exception as e:
         logger.warning(f"Failed to get cached query result: {e}")
         return None
 
 
+# Stale-while-revalidate
+_refresh_tasks: dict[str, asyncio.Task] = {}
+
+
+async def get_or_refresh_query_result(
+    query: str,
+    connection_id: str,
+    load: Callable[[], Awaitable[dict]],
+    parameters: dict | None = None,
+    soft_ttl: int = QUERY_CACHE_SOFT_TTL,
+    hard_ttl: int = QUERY_CACHE_TTL,
+) -> dict:
+    """Get a query result from the cache, computing it with ``load`` when needed.
+
+    A result younger than ``soft_ttl`` is fresh. Until ``hard_ttl`` it is still
+    served immediately, but a background refresh is started; across replicas a
+    Redis ``SET NX`` lease lets only one of them run it. Misses and results past
+    ``hard_ttl`` are loaded inline.
+    """
+    results = await get_or_refresh_query_results(
+        [(query, connection_id, parameters, load)], soft_ttl=soft_ttl, hard_ttl=hard_ttl
+    )
+    return results[0]
+
+
+async def get_or_refresh_query_results(
+    queries: list[tuple[str, str, dict | None, Callable[[], Awaitable[dict]]]],
+    soft_ttl: int = QUERY_CACHE_SOFT_TTL,
+    hard_ttl: int = QUERY_CACHE_TTL,
+    return_exceptions: bool = False,
+) -> list[Any]:
+    """Bulk ``get_or_refresh_query_result`` for ``(query, connection_id, parameters, load)`` items.
+
+    This is the batch API of the query result cache. Every lookup missing
+    the local tier shares one pipelined GET+PTTL round-trip (the equivalent
+    of an MGET that also reads expiry times). Misses are loaded concurrently
+    and then written back with one pipeline. As with ``asyncio.gather``, ``return_exceptions`` puts the exception of a
+    failed load in place of its result instead of raising it.
+    """
+    cache_keys = [
+        generate_query_cache_key(query, connection_id, parameters) for query, connection_id, parameters, _ in queries
+    ]
+
+    try:
+        entries = await _lookup_query_results(cache_keys)
+    except Exception as e:
+        logger.warning(f"Failed to get cached query results: {e}")
+        entries = [None] * len(queries)
+
+    now = time.monotonic()
+    results: list[Any] = [None] * len(queries)
+    misses = []
+    for i, entry in enumerate(entries):
+        if entry is None:
+            misses.append(i)
+            continue
+        query, connection_id, parameters, load = queries[i]
+        result, expires_at = entry
+        if expires_at is not None and expires_at - now <= hard_ttl - soft_ttl:
+            _schedule_refresh(cache_keys[i], query, connection_id, load, parameters, soft_ttl, hard_ttl)
+        results[i] = result
+
+    loaded = await asyncio.gather(*(queries[i][3]() for i in misses), return_exceptions=return_exceptions)
+    for i, result in zip(misses, loaded):
+        results[i] = result
+    await _cache_query_results(
+        [(*queries[i][:3], result) for i, result in zip(misses, loaded) if not isinstance(result, BaseException)],
+        hard_ttl,
+    )
+    return results
+
+
+def _schedule_refresh(
+    cache_key: str,
+    query: str,
+    connection_id: str,
+    load: Callable[[], Awaitable[dict]],
+    parameters: dict | None,
+    soft_ttl: int,
+    hard_ttl: int,
+):
+    if cache_key in _refresh_tasks:
+        return
+    task = asyncio.create_task(_refresh(cache_key, query, connection_id, load, parameters, soft_ttl, hard_ttl))
+    _refresh_tasks[cache_key] = task
+    task.add_done_callback(lambda _: _refresh_tasks.pop(cache_key, None))
+
+
+async def _refresh(
+    cache_key: str,
+    query: str,
+    connection_id: str,
+    load: Callable[[], Awaitable[dict]],
+    parameters: dict | None,
+    soft_ttl: int,
+    hard_ttl: int,
+):
+    """Recompute a stale result if this replica wins the refresh lease."""
+    try:
+        # The lease is left to expire, so a key is refreshed at most once per
+        # lease period even while other replicas still hold the stale value
+        lease_ttl = max(1, min(soft_ttl, REFRESH_LEASE_TTL))
+        if not await set(f"query_refresh:{cache_key}", "1", ex=lease_ttl, nx=True):
+            return
+
+        result = await load()
+        await cache_query_result(query, connection_id, result, parameters, ttl=hard_ttl)
+        # Other replicas drop their stale local copies
+        await publish(INVALIDATION_CHANNEL, json.dumps([cache_key]))
+        logger.debug(f"Refreshed stale query result with key: {cache_key}")
+    except Exception as e:
+        logger.warning(f"Failed to refresh query result {cache_key}: {e}")
+
+
+# Table dependency tracking
+def _dependency_key(connection_id: str, table: str | None = None) -> str:
+    """Redis sorted set of cache keys for a connection, or for one of its tables."""
+    if table is None:
+        return f"query_index:{connection_id}"
+    return f"query_index:{connection_id}:{table}"
+
+
+async def invalidate_query_results(connection_id: str, tables: Iterable[str] | None = None) -> int:
+    """Drop cached results of a connection that read any of ``tables``.
+
+    Without ``tables`` every cached result of the connection is dropped.
+    Returns the number of cache keys removed.
+    """
+    if tables is None:
+        index_keys = [_dependency_key(connection_id)]
+    else:
+        index_keys = [_dependency_key(connection_id, normalize_table_name(table)) for table in tables]
+    if not index_keys:
+        return 0
+
+    redis_client = await get_client()
+    pipe = redis_client.pipeline(transaction=False)
+    for index_key in index_keys:
+        pipe.zrangebyscore(index_key, time.time(), "+inf")
+    cache_keys = list({cache_key for members in await pipe.execute() for cache_key in members})
+
+    pipe = redis_client.pipeline(transaction=False)
+    if cache_keys:
+        pipe.delete(*cache_keys)
+    pipe.delete(*index_keys)
+    if cache_keys:
+        pipe.publish(INVALIDATION_CHANNEL, json.dumps(cache_keys))
+    results = await pipe.execute()
+
+    for cache_key in cache_keys:
+        local_cache.delete(cache_key)
+
+    removed = results[0] if cache_keys else 0
+    logger.info(f"Invalidated {removed} cached results for connection {connection_id}")
+    return removed
+
+
+def _drop_local_query_results(message: str):
+    for cache_key in json.loads(message):
+        local_cache.delete(cache_key)
+
+
+# Channel -> handler for messages that evict process-local state on every replica
+_invalidation_handlers: dict[str, Callable[[str], None]] = {INVALIDATION_CHANNEL: _drop_local_query_results}
+
+
+def register_invalidation_handler(channel: str, handler: Callable[[str], None]):
+    """Call ``handler`` with every message published on ``channel``.
+
+    Handlers must be registered before ``init_cache`` starts the listener.
+    """
+    _invalidation_handlers[channel] = handler
+
+
+async def _listen_for_invalidations():
+    """Apply invalidations published by any replica to process-local state."""
+    while True:
+        try:
+            pubsub = await create_pubsub()
+            try:
+                await pubsub.subscribe(*_invalidation_handlers)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        _invalidation_handlers[message["channel"]](message["data"])
+            finally:
+                await pubsub.aclose()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Local entries missed meanwhile still expire after their local TTL
+            logger.warning(f"Cache invalidation listener failed, resubscribing: {e}")
+            await asyncio.sleep(1.0)
+
+
+_invalidation_task: asyncio.Task | None = None
+
+
 # Session management
 async def store_session(session_id: str, data: dict, ttl: int = 3600):
     """Store session data."""
@@ -235,25 +748,166 @@ async def delete_session(session_id: str):
 
 
 # Rate limiting
-async def check_rate_limit(key: str, limit: int, window: int) -> bool:
-    """Check if a rate limit is exceeded."""
+# Token bucket refilled continuously at limit/window tokens per second, using
+# the Redis clock so replicas agree; one atomic round-trip per check
+_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local state = redis.call("HMGET", KEYS[1], "tokens", "ts")
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+
+redis.call("HSET", KEYS[1], "tokens", tokens, "ts", now)
+redis.call("PEXPIRE", KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+_token_bucket_script = None
+
+# After a Redis failure, rate limiting stays local for this many seconds
+RATE_LIMIT_REDIS_BACKOFF = 5.0
+_rate_limit_redis_retry_at = 0.0
+
+# Per-process buckets used while Redis is unreachable: key -> (tokens, updated_at)
+_local_buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+LOCAL_BUCKETS_MAX = 10_000
+
+
+def _take_local_token(key: str, limit: int, window: int, cost: int) -> tuple[bool, int, float]:
+    rate = limit / window
+    now = time.monotonic()
+    tokens, updated_at = _local_buckets.pop(key, (float(limit), now))
+    tokens = min(limit, tokens + (now - updated_at) * rate)
+
+    allowed = tokens >= cost
+    retry_after = 0.0
+    if allowed:
+        tokens -= cost
+    else:
+        retry_after = (cost - tokens) / rate
+
+    _local_buckets[key] = (tokens, now)
+    while len(_local_buckets) > LOCAL_BUCKETS_MAX:
+        _local_buckets.popitem(last=False)
+    return allowed, int(tokens), retry_after
+
+
+async def rate_limit(key: str, limit: int, window: int, cost: int = 1) -> tuple[bool, int, float]:
+    """Take ``cost`` tokens from a bucket allowing ``limit`` requests per ``window`` seconds.
+
+    Returns whether the request is allowed, the tokens left and the seconds
+    until enough tokens are available again. Falls back to a per-process
+    bucket when Redis is unreachable.
+    """
+    global _token_bucket_script, _rate_limit_redis_retry_at
+    if time.monotonic() < _rate_limit_redis_retry_at:
+        return _take_local_token(key, limit, window, cost)
+
     try:
         redis_client = await get_client()
-        current = await redis_client.incr(key)
-        if current == 1:
-            await redis_client.expire(key, window)
-        return current <= limit
+        if _token_bucket_script is None:
+            _token_bucket_script = redis_client.register_script(_TOKEN_BUCKET_SCRIPT)
+        allowed, tokens, retry_after = await _token_bucket_script(keys=[key], args=[limit, limit / window, cost])
+        return bool(allowed), int(float(tokens)), float(retry_after)
     except Exception as e:
-        logger.warning(f"Failed to check rate limit: {e}")
-        return True  # Allow on error
+        logger.warning(f"Failed to check rate limit in Redis, using local buckets: {e}")
+        _rate_limit_redis_retry_at = time.monotonic() + RATE_LIMIT_REDIS_BACKOFF
+        return _take_local_token(key, limit, window, cost)
+
+
+async def check_rate_limit(key: str, limit: int, window: int) -> bool:
+    """Check if a rate limit is exceeded."""
+    allowed, _, _ = await rate_limit(key, limit, window)
+    return allowed
+
+
+# Concurrency slots
+# A sorted set of holders scored by lease expiry; expired leases are dropped
+# first, so holders that crash free their slot after the lease runs out.
+# Acquiring a slot already held renews its lease.
+_SLOT_SCRIPT = """
+local limit = tonumber(ARGV[2])
+local lease = tonumber(ARGV[3])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", now)
+if redis.call("ZSCORE", KEYS[1], ARGV[1]) or redis.call("ZCARD", KEYS[1]) < limit then
+    redis.call("ZADD", KEYS[1], now + lease, ARGV[1])
+    redis.call("EXPIRE", KEYS[1], math.ceil(lease))
+    return 1
+end
+return 0
+"""
+
+_slot_script = None
+
+
+async def _get_slot_script():
+    global _slot_script
+    if _slot_script is None:
+        _slot_script = (await get_client()).register_script(_SLOT_SCRIPT)
+    return _slot_script
+
+
+async def acquire_slot(key: str, holder: str, limit: int, lease: float) -> bool:
+    """Take one of ``limit`` slots for ``holder`` for ``lease`` seconds, or renew its lease."""
+    slot_script = await _get_slot_script()
+    return bool(await slot_script(keys=[key], args=[holder, limit, lease]))
+
+
+async def set_and_acquire_slot(
+    key: str, value: str, ex: int, slot_key: str, holder: str, limit: int, lease: float
+) -> bool:
+    """Set a key and take or renew a slot as ``acquire_slot`` does, in one transaction.
+
+    Returns whether the slot is held.
+    """
+    slot_script = await _get_slot_script()
+    redis_client = await get_client()
+    pipe = redis_client.pipeline(transaction=True)
+    pipe.set(key, value, ex=ex)
+    await slot_script(keys=[slot_key], args=[holder, limit, lease], client=pipe)
+    _, acquired = await pipe.execute()
+    return bool(acquired)
+
+
+async def release_slot(key: str, holder: str):
+    """Give up the slot of ``holder``."""
+    redis_client = await get_client()
+    await redis_client.zrem(key, holder)
 
 
 # Initialization functions for FastAPI
 async def init_cache():
     """Initialize the cache connection."""
+    global _invalidation_task
     await initialize_async()
+    _invalidation_task = asyncio.create_task(_listen_for_invalidations())
 
 
 async def close_cache():
     """Close the cache connection."""
+    global _invalidation_task
+    if _invalidation_task:
+        _invalidation_task.cancel()
+        try:
+            await _invalidation_task
+        except asyncio.CancelledError:
+            pass
+        _invalidation_task = None
     await close()
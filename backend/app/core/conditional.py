@@ -0,0 +1,22 @@
+"""
+Conditional request handling for endpoints serving content-addressed data
+"""
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an ``If-None-Match`` header matches ``etag``.
+
+    The header holds ``*`` or a comma-separated list of entity tags. Tags
+    are compared weakly, as RFC 9110 requires for ``If-None-Match``, so a
+    ``W/`` prefix on either side is ignored.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return opaque(etag) in {opaque(tag) for tag in if_none_match.split(",")}
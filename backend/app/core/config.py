@@ -98,6 +98,8 @@ class Settings(BaseSettings):
 
     # API Keys
     API_KEY_PREFIX: str = "kb_"
+    API_KEY_CACHE_TTL: int = 60  # seconds a validated key is trusted without querying Postgres
+    API_KEY_USAGE_FLUSH_INTERVAL: int = 10  # seconds between batched last_used_at writes
 
     # Engine Configuration
     ENGINE_CONFIG_PATH: Path = Path("config/engines.yaml")
@@ -113,8 +115,20 @@ class Settings(BaseSettings):
 
     SENTRY_DSN: str | None = None
 
+    # Logging; production mode uses orjson rendering and a background writer
+    LOG_PRODUCTION_MODE: bool | None = None  # defaults to ENVIRONMENT == "production"
+    LOG_SUCCESS_SAMPLE_RATE: float = 1.0  # fraction of successful requests logged
+    LOG_QUEUE_SIZE: int = 10_000  # lines buffered for the writer; more are dropped and counted
+
     # Background Jobs
     DRAMATIQ_BROKER_URL: str | None = None
+    QUESTION_MAX_RETRIES: int = 3  # retries of a failing pipeline stage before the question fails
+    QUESTION_RETRY_MIN_BACKOFF: int = 5_000  # milliseconds before the first retry
+    QUESTION_STAGE_TIME_LIMIT: int = 10 * 60 * 1000  # milliseconds a pipeline stage may run
+    QUESTION_MAX_CONCURRENT_PER_USER: int = 3  # questions of one user processed at once
+    QUESTION_SLOT_LEASE: int = 15 * 60  # seconds a user slot survives a worker that died, renewed per stage
+    QUESTION_SLOT_WAIT_DELAY: int = 5_000  # milliseconds before a stage waiting for a user slot is redelivered
+    QUESTION_SLOT_MAX_WAITS: int = 360  # times a question waits for a user slot before it fails
 
     @field_validator("DRAMATIQ_BROKER_URL", mode="before")
     @classmethod
@@ -132,6 +146,20 @@ class Settings(BaseSettings):
     # Query Execution
     DEFAULT_QUERY_TIMEOUT: int = 30  # seconds
     MAX_QUERY_TIMEOUT: int = 300  # 5 minutes
+    SINGLEFLIGHT_CLUSTER_WIDE: bool = False  # share identical in-flight queries across replicas
+
+    # Query Result Cache
+    QUERY_CACHE_LOCAL_MAX_BYTES: int = 64 * 1024 * 1024  # in-process LRU tier budget
+    QUERY_CACHE_LOCAL_TTL: int = 60  # seconds a local entry may lag behind Redis
+    CACHE_CHANGE_POLL_INTERVAL: int = 30  # seconds between change detector polls
+    PANEL_RESULT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # in-process budget for loaded panel results
+    PANEL_RESULT_PRUNE_INTERVAL: int = 3600  # seconds between deletions of unreferenced panel results
+    PANEL_RESULT_PRUNE_GRACE: int = 24 * 3600  # seconds an unreferenced result is kept, for panels being created
+
+    # Rate Limiting (token bucket per API key and endpoint)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_REQUESTS: int = 600  # requests allowed per window, also the burst size
+    RATE_LIMIT_WINDOW: int = 60  # seconds
 
     # Pagination
     DEFAULT_PAGE_SIZE: int = 20
@@ -2,7 +2,9 @@
 Database connection management for Kurobe using asyncpg
 """
 
+import json
 import threading
+import time
 from contextlib import asynccontextmanager
 from typing import Any, Optional
 
@@ -10,6 +12,12 @@ import asyncpg
 
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.metrics import DB_POOL_WAIT, register_pool
+
+
+def _json_dumps(value: Any) -> str:
+    """Encode a JSON parameter; datetimes, UUIDs and Decimals are written as strings."""
+    return json.dumps(value, default=str)
 
 
 class DBConnection:
@@ -42,7 +50,12 @@ class DBConnection:
 
             # Create connection pool
             self._pool = await asyncpg.create_pool(
-                str(settings.DATABASE_URL), min_size=5, max_size=20, command_timeout=60, server_settings={"jit": "off"}
+                str(settings.DATABASE_URL),
+                min_size=5,
+                max_size=20,
+                command_timeout=60,
+                server_settings={"jit": "off"},
+                init=self._init_connection,
             )
 
             self._initialized = True
@@ -52,6 +65,12 @@ class DBConnection:
             logger.error(f"Database initialization error: {e}")
             raise RuntimeError(f"Failed to initialize database connection: {str(e)}")
 
+    @staticmethod
+    async def _init_connection(conn: asyncpg.Connection):
+        """Decode and encode JSON columns as Python objects."""
+        for type_name in ("json", "jsonb"):
+            await conn.set_type_codec(type_name, encoder=_json_dumps, decoder=json.loads, schema="pg_catalog")
+
     async def disconnect(self):
         """Close the database connection pool."""
         if self._pool:
@@ -71,9 +90,18 @@ class DBConnection:
         if not self._initialized:
             await self.initialize()
 
+        start = time.perf_counter()
         async with self._pool.acquire() as conn:
+            DB_POOL_WAIT.observe(time.perf_counter() - start)
             yield conn
 
+    def pool_stats(self) -> tuple[int, int, int] | None:
+        """In-use, idle and maximum connections of the pool."""
+        if self._pool is None:
+            return None
+        idle = self._pool.get_idle_size()
+        return self._pool.get_size() - idle, idle, self._pool.get_max_size()
+
     async def execute(self, query: str, *args) -> str:
         """Execute a query without returning results."""
         async with self.acquire() as conn:
@@ -108,6 +136,7 @@ class DBConnection:
 
 # Global database instance
 db = DBConnection()
+register_pool("postgres", db.pool_stats)
 
 
 async def init_db():
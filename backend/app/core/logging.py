@@ -2,16 +2,123 @@
 Structured logging configuration for Kurobe
 """
 
+import json
 import logging
 import os
+import queue
+import sys
+import threading
+from typing import TextIO
 
 import structlog
 
 from app.core.config import settings
+from app.core.metrics import LOG_LINES_DROPPED
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-def setup_logging():
-    """Configure structured logging for the application."""
+
+class QueueLogger:
+    """structlog logger that hands rendered lines to a writer thread."""
+
+    def __init__(self, writer: "QueueWriter"):
+        self._writer = writer
+
+    def msg(self, message: str):
+        self._writer.write(message)
+
+    log = debug = info = warn = warning = error = critical = exception = fatal = msg
+
+
+class QueueWriter:
+    """Writes lines from a bounded queue to a stream on a background thread.
+
+    Lines are dropped and counted when the queue is full, so a slow stream
+    never blocks callers or grows memory. Once stopped, lines are written
+    directly to the stream.
+    """
+
+    def __init__(self, stream: TextIO, maxsize: int = settings.LOG_QUEUE_SIZE):
+        self.queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self.dropped = 0
+        self._stream = stream
+        self._stream_lock = threading.Lock()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, line: str):
+        """Queue a line for the writer thread, or write it directly once stopped."""
+        if self._stopped:
+            self._write([line])
+            return
+        try:
+            self.queue.put_nowait(line)
+        except queue.Full:
+            self.dropped += 1
+            LOG_LINES_DROPPED.inc()
+
+    def _run(self):
+        while True:
+            line = self.queue.get()
+            if line is None:
+                break
+            lines = [line]
+            # Write whatever else is queued with a single flush
+            while not self.queue.empty():
+                line = self.queue.get_nowait()
+                if line is None:
+                    self._write(lines)
+                    return
+                lines.append(line)
+            self._write(lines)
+
+    def _write(self, lines: list[str]):
+        try:
+            with self._stream_lock:
+                self._stream.write("\n".join(lines) + "\n")
+                self._stream.flush()
+        except Exception:
+            pass
+
+    def stop(self):
+        """Write the lines still queued and stop the thread."""
+        self._stopped = True
+        self.queue.put(None)
+        self._thread.join()
+
+
+_queue_writer: QueueWriter | None = None
+
+
+def _orjson_dumps(obj, **kwargs) -> str:
+    return orjson.dumps(obj, default=str).decode()
+
+
+def shutdown_logging():
+    """Flush queued log lines and stop the writer thread; later lines are written directly."""
+    global _queue_writer
+    if _queue_writer is not None:
+        _queue_writer.stop()
+        _queue_writer = None
+
+
+def setup_logging(production: bool | None = None):
+    """Configure structured logging for the application.
+
+    Production mode skips callsite inspection, renders JSON with orjson when it
+    is installed and hands lines to a background thread, so writing logs never
+    blocks the event loop.
+    """
+    global _queue_writer
+
+    if production is None:
+        production = settings.LOG_PRODUCTION_MODE
+    if production is None:
+        production = settings.ENVIRONMENT == "production"
 
     # Set default logging level based on environment
     if settings.ENVIRONMENT == "production":
@@ -21,35 +128,55 @@ def setup_logging():
 
     LOGGING_LEVEL = logging.getLevelNamesMapping().get(os.getenv("LOGGING_LEVEL", default_level).upper(), logging.DEBUG)
 
-    # Use JSON renderer in production, console renderer in development
-    if settings.ENVIRONMENT == "production":
-        renderer = [structlog.processors.JSONRenderer()]
+    shutdown_logging()
+
+    if production:
+        _queue_writer = QueueWriter(sys.stdout)
+        queue_logger = QueueLogger(_queue_writer)
+        serializer = _orjson_dumps if orjson is not None else json.dumps
+        structlog.configure(
+            processors=[
+                structlog.contextvars.merge_contextvars,
+                structlog.stdlib.add_log_level,
+                structlog.processors.TimeStamper(fmt="iso", utc=True),
+                structlog.processors.format_exc_info,
+                structlog.processors.JSONRenderer(serializer=serializer),
+            ],
+            context_class=dict,
+            logger_factory=lambda *args: queue_logger,
+            cache_logger_on_first_use=True,
+            wrapper_class=structlog.make_filtering_bound_logger(LOGGING_LEVEL),
+        )
     else:
-        renderer = [structlog.dev.ConsoleRenderer()]
-
-    structlog.configure(
-        processors=[
-            structlog.stdlib.add_log_level,
-            structlog.stdlib.PositionalArgumentsFormatter(),
-            structlog.processors.StackInfoRenderer(),
-            structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.CallsiteParameterAdder(
-                {
-                    structlog.processors.CallsiteParameter.FILENAME,
-                    structlog.processors.CallsiteParameter.FUNC_NAME,
-                    structlog.processors.CallsiteParameter.LINENO,
-                }
-            ),
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.contextvars.merge_contextvars,
-            *renderer,
-        ],
-        context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
-        cache_logger_on_first_use=True,
-        wrapper_class=structlog.make_filtering_bound_logger(LOGGING_LEVEL),
-    )
+        # Use JSON renderer in production, console renderer in development
+        if settings.ENVIRONMENT == "production":
+            renderer = [structlog.processors.JSONRenderer()]
+        else:
+            renderer = [structlog.dev.ConsoleRenderer()]
+
+        structlog.configure(
+            processors=[
+                structlog.stdlib.add_log_level,
+                structlog.stdlib.PositionalArgumentsFormatter(),
+                structlog.processors.StackInfoRenderer(),
+                structlog.processors.format_exc_info,
+                structlog.processors.UnicodeDecoder(),
+                structlog.processors.CallsiteParameterAdder(
+                    {
+                        structlog.processors.CallsiteParameter.FILENAME,
+                        structlog.processors.CallsiteParameter.FUNC_NAME,
+                        structlog.processors.CallsiteParameter.LINENO,
+                    }
+                ),
+                structlog.processors.TimeStamper(fmt="iso"),
+                structlog.contextvars.merge_contextvars,
+                *renderer,
+            ],
+            context_class=dict,
+            logger_factory=structlog.PrintLoggerFactory(),
+            cache_logger_on_first_use=True,
+            wrapper_class=structlog.make_filtering_bound_logger(LOGGING_LEVEL),
+        )
 
     # Configure standard logging to work with structlog
     logging.basicConfig(
@@ -0,0 +1,192 @@
+"""
+Prometheus metrics for query execution, caching, connection pools and engines
+"""
+
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from prometheus_client import REGISTRY, Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+# Warehouse queries
+QUERY_DURATION = Histogram(
+    "kurobe_query_duration_seconds",
+    "Warehouse query execution time in seconds",
+    ["connection_id", "connector_type", "status"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+
+QUERY_ROWS = Histogram(
+    "kurobe_query_rows",
+    "Rows returned by warehouse queries",
+    ["connection_id", "connector_type"],
+    buckets=(0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000),
+)
+
+QUERY_TIMEOUTS = Counter(
+    "kurobe_query_timeouts_total", "Warehouse queries that timed out", ["connection_id", "connector_type"]
+)
+
+QUERY_RESULT_BYTES = Histogram(
+    "kurobe_query_result_bytes",
+    "Encoded size of query results written to the cache",
+    ["connection_id"],
+    buckets=(1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000),
+)
+
+# Query result cache
+CACHE_LOOKUPS = Counter("kurobe_query_cache_lookups_total", "Query result cache lookups", ["tier", "result"])
+
+# Connection pools
+DB_POOL_WAIT = Histogram(
+    "kurobe_db_pool_wait_seconds",
+    "Time spent waiting for a Postgres connection from the pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+)
+
+# Logging
+LOG_LINES_DROPPED = Counter("kurobe_log_lines_dropped_total", "Log lines dropped because the writer queue was full")
+
+# LLM engines
+ENGINE_DURATION = Histogram(
+    "kurobe_engine_duration_seconds",
+    "Engine call duration in seconds",
+    ["engine_type", "provider", "operation", "status"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120),
+)
+
+ENGINE_TOKENS = Counter(
+    "kurobe_engine_tokens_total", "Tokens used by engine calls", ["engine_type", "provider", "kind"]
+)
+
+
+async def track_query(connector: Any, execution: Awaitable[Any]) -> Any:
+    """Await a connector's query execution, recording its latency and row count."""
+    config = connector.config
+    labels = {"connection_id": config.name, "connector_type": config.type}
+
+    start = time.perf_counter()
+    status = "error"
+    try:
+        result = await execution
+        status = "success"
+        QUERY_ROWS.labels(**labels).observe(result.row_count)
+        return result
+    except TimeoutError:
+        status = "timeout"
+        QUERY_TIMEOUTS.labels(**labels).inc()
+        raise
+    finally:
+        QUERY_DURATION.labels(**labels, status=status).observe(time.perf_counter() - start)
+
+
+class EngineCall:
+    """Records the token usage of one engine call."""
+
+    def __init__(self, engine_type: str, provider: str):
+        self.engine_type = engine_type
+        self.provider = provider
+
+    def record_usage(self, usage: dict | None):
+        """Count tokens from an OpenAI-style ``usage`` mapping.
+
+        Accepts ``prompt_tokens``/``completion_tokens`` as well as
+        ``input_tokens``/``output_tokens``.
+        """
+        if not usage:
+            return
+        prompt = usage.get("prompt_tokens", usage.get("input_tokens")) or 0
+        completion = usage.get("completion_tokens", usage.get("output_tokens")) or 0
+        ENGINE_TOKENS.labels(engine_type=self.engine_type, provider=self.provider, kind="prompt").inc(prompt)
+        ENGINE_TOKENS.labels(engine_type=self.engine_type, provider=self.provider, kind="completion").inc(completion)
+
+
+@asynccontextmanager
+async def track_engine_call(engine_type: str, provider: str, operation: str):
+    """Time an engine call; the yielded ``EngineCall`` records token usage.
+
+    ``provider`` is the engine's ``EngineConfig.provider``.
+    """
+    call = EngineCall(engine_type, provider)
+    start = time.perf_counter()
+    status = "error"
+    try:
+        yield call
+        status = "success"
+    finally:
+        ENGINE_DURATION.labels(
+            engine_type=engine_type, provider=provider, operation=operation, status=status
+        ).observe(time.perf_counter() - start)
+
+
+# Pool name -> function returning (in_use, idle, max) connections, or None if not connected
+_pools: dict[str, Callable[[], tuple[int, int, int] | None]] = {}
+
+
+def register_pool(name: str, stats: Callable[[], tuple[int, int, int] | None]):
+    """Expose a connection pool's saturation, read when metrics are scraped."""
+    _pools[name] = stats
+
+
+# Functions returning ``AdmissionController.stats()`` per connection name
+_admission: list[Callable[[], dict[str, dict[str, Any]]]] = []
+
+
+def register_admission(stats: Callable[[], dict[str, dict[str, Any]]]):
+    """Expose the query admission queues of a set of connections, read when metrics are scraped."""
+    _admission.append(stats)
+
+
+class PoolCollector(Collector):
+    """Reports connection pool usage at scrape time."""
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        connections = GaugeMetricFamily(
+            "kurobe_pool_connections", "Connections per pool by state", labels=["pool", "state"]
+        )
+        for name, stats in list(_pools.items()):
+            usage = stats()
+            if usage is None:
+                continue
+            in_use, idle, maximum = usage
+            connections.add_metric([name, "in_use"], in_use)
+            connections.add_metric([name, "idle"], idle)
+            connections.add_metric([name, "max"], maximum)
+        yield connections
+
+
+class AdmissionCollector(Collector):
+    """Reports query slots, queue depth and admission outcomes per data connection at scrape time."""
+
+    def collect(self) -> Iterator[GaugeMetricFamily | CounterMetricFamily]:
+        slots = GaugeMetricFamily(
+            "kurobe_query_slots", "Query slots per connection by state", labels=["connection_id", "state"]
+        )
+        queued = GaugeMetricFamily(
+            "kurobe_query_queue_depth", "Queries waiting for a slot per connection", labels=["connection_id"]
+        )
+        admissions = CounterMetricFamily(
+            "kurobe_query_admissions", "Query slot requests by outcome", labels=["connection_id", "outcome"]
+        )
+        wait = CounterMetricFamily(
+            "kurobe_query_admission_wait_seconds", "Time admitted queries waited for a slot", labels=["connection_id"]
+        )
+        for stats in list(_admission):
+            for name, usage in stats().items():
+                slots.add_metric([name, "in_use"], usage["in_flight"])
+                slots.add_metric([name, "max"], usage["max_in_flight"])
+                queued.add_metric([name], usage["queue_depth"])
+                for outcome in ("admitted", "rejected", "timed_out"):
+                    admissions.add_metric([name, outcome], usage[outcome])
+                wait.add_metric([name], usage["wait_time_total_ms"] / 1000)
+        yield slots
+        yield queued
+        yield admissions
+        yield wait
+
+
+REGISTRY.register(PoolCollector())
+REGISTRY.register(AdmissionCollector())
@@ -0,0 +1,50 @@
+"""
+Keyset pagination helpers for Kurobe
+
+Listings are ordered by ``(created_at, id)`` and pages continue from the last
+row of the previous page, so the cost of a page does not grow with its depth.
+Cursors are opaque to clients.
+"""
+
+import base64
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """Encode the position of a row as an opaque cursor."""
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{row_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor; raises ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|")
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_condition(
+    cursor: str, first_param: int, descending: bool = True, prefix: str = ""
+) -> tuple[str, list[Any]]:
+    """SQL condition selecting the rows after a cursor, and its parameters.
+
+    ``first_param`` is the number of the first placeholder to use, and
+    ``prefix`` qualifies the columns, e.g. ``"p."``.
+    """
+    created_at, row_id = decode_cursor(cursor)
+    operator = "<" if descending else ">"
+    condition = f"({prefix}created_at, {prefix}id) {operator} (${first_param}, ${first_param + 1})"
+    return condition, [created_at, row_id]
+
+
+def split_page(rows: Sequence, limit: int) -> tuple[Sequence, str | None]:
+    """Trim rows fetched with ``LIMIT limit + 1`` to a page and its next cursor."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
@@ -0,0 +1,36 @@
+"""
+Field projections for list endpoints
+
+List endpoints accept ``?fields=id,text,status`` to return only some fields.
+Services select just the matching columns, so heavy JSONB columns are not
+read for views that do not show them.
+"""
+
+from collections.abc import Iterable
+
+
+def parse_fields(fields: str | None, allowed: Iterable[str]) -> set[str] | None:
+    """Parse a comma-separated field selection; None selects every field.
+
+    Raises ValueError for fields that are not in ``allowed``.
+    """
+    if fields is None:
+        return None
+
+    selected = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = selected - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    if not selected:
+        raise ValueError("No fields selected")
+    return selected
+
+
+def select_columns(selected: set[str], columns: dict[str, str], always: Iterable[str] = ()) -> str:
+    """SELECT list for the selected fields plus the ``always`` ones.
+
+    ``columns`` maps field names to SQL column expressions; fields without a
+    column, such as those loaded by a separate query, are skipped.
+    """
+    names = [name for name in columns if name in selected or name in always]
+    return ", ".join(columns[name] for name in names)
@@ -0,0 +1,174 @@
+"""
+Single-flight execution of identical queries for Kurobe
+
+Concurrent executions of the same query on the same connection share one
+``DataConnector.execute_query`` call, which waits for one of the connection's
+query slots like any other. Calls are keyed by
+``generate_query_cache_key``. Within a process the callers await one shared
+task. With ``cluster=True`` a Redis lock elects one replica to run the query,
+and the others pick up its result when it is published.
+"""
+
+import asyncio
+import json
+from collections.abc import Awaitable, Callable
+from typing import Any
+from uuid import uuid4
+
+from kurobe.bi.connectors import DataConnector
+from kurobe.core.models import QueryResult
+
+from app.core import cache
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import track_query
+
+# Seconds a shared result stays readable for replicas that subscribed late
+RESULT_TTL = 30
+
+# Extra seconds the cluster lock outlives the query timeout
+LOCK_GRACE = 5
+
+# Compare-and-delete, so a leader never releases a lock that expired and was re-taken
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class _Call:
+    """An in-flight execution and the number of callers waiting on it"""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+_calls: dict[str, _Call] = {}
+
+
+async def do(
+    key: str,
+    fn: Callable[[], Awaitable[Any]],
+    cluster: bool = False,
+    lock_ttl: float = 60,
+    encode: Callable[[Any], str] = json.dumps,
+    decode: Callable[[str], Any] = json.loads,
+) -> Any:
+    """Run ``fn`` once for all concurrent callers sharing ``key``.
+
+    With ``cluster`` set, ``encode``/``decode`` convert the result to and from
+    the string published to other replicas.
+    """
+    if cluster:
+        return await _do_local(key, lambda: _do_cluster(key, fn, lock_ttl, encode, decode))
+    return await _do_local(key, fn)
+
+
+async def _do_local(key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+    call = _calls.get(key)
+    if call is None:
+        call = _calls[key] = _Call(asyncio.create_task(fn()))
+        call.task.add_done_callback(lambda _: _calls.pop(key, None) if _calls.get(key) is call else None)
+
+    call.waiters += 1
+    try:
+        # Shielded so one caller giving up does not cancel the others' result
+        return await asyncio.shield(call.task)
+    finally:
+        call.waiters -= 1
+        if call.waiters == 0 and not call.task.done():
+            call.task.cancel()
+
+
+async def _do_cluster(
+    key: str,
+    fn: Callable[[], Awaitable[Any]],
+    lock_ttl: float,
+    encode: Callable[[Any], str],
+    decode: Callable[[str], Any],
+) -> Any:
+    try:
+        redis_client = await cache.get_client()
+    except Exception as e:
+        logger.warning(f"Single-flight falling back to local execution: {e}")
+        return await fn()
+
+    lock_key = f"singleflight:lock:{key}"
+    result_key = f"singleflight:result:{key}"
+    channel = f"singleflight:done:{key}"
+    token = uuid4().hex
+
+    if await redis_client.set(lock_key, token, nx=True, px=int(lock_ttl * 1000)):
+        try:
+            result = await fn()
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.set(result_key, encode(result), ex=RESULT_TTL)
+            pipe.publish(channel, "done")
+            await pipe.execute()
+            return result
+        except Exception as e:
+            await redis_client.publish(channel, json.dumps({"error": str(e)}))
+            raise
+        finally:
+            await redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+
+    # Another replica is running the query: subscribe before checking for a
+    # published result, so the notification cannot slip in between
+    pubsub = redis_client.pubsub()
+    try:
+        await pubsub.subscribe(channel)
+        payload = await redis_client.get(result_key)
+        if payload is None:
+            async with asyncio.timeout(lock_ttl):
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    if message["data"] != "done":
+                        raise RuntimeError(json.loads(message["data"])["error"])
+                    payload = await redis_client.get(result_key)
+                    break
+    except TimeoutError:
+        logger.warning(f"Single-flight leader for {key} did not finish in time, executing locally")
+        payload = None
+    finally:
+        await pubsub.aclose()
+
+    if payload is None:
+        return await fn()
+    return decode(payload)
+
+
+async def execute_query(
+    connector: DataConnector,
+    query: str,
+    parameters: dict | None = None,
+    timeout: int | None = None,
+    cluster: bool | None = None,
+    user_id: str | None = None,
+) -> QueryResult:
+    """Execute a query, sharing the execution with identical concurrent calls.
+
+    The shared execution is admitted on behalf of ``user_id`` of the caller
+    that starts it.
+    """
+    timeout = timeout or settings.DEFAULT_QUERY_TIMEOUT
+    cluster = settings.SINGLEFLIGHT_CLUSTER_WIDE if cluster is None else cluster
+    key = cache.generate_query_cache_key(query, connector.config.name, parameters)
+
+    async def run() -> QueryResult:
+        async with connector.admit(user_id):
+            return await track_query(connector, connector.execute_query(query, parameters, timeout))
+
+    return await do(
+        key,
+        run,
+        cluster=cluster,
+        lock_ttl=timeout + LOCK_GRACE,
+        encode=lambda result: result.model_dump_json(),
+        decode=QueryResult.model_validate_json,
+    )
@@ -0,0 +1,50 @@
+"""
+Lightweight SQL inspection helpers for Kurobe
+"""
+
+import re
+
+# String literals and comments are blanked out before looking for table references
+_NOISE_RE = re.compile(r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+_IDENT = r'(?:"[^"]+"|`[^`]+`|[A-Za-z_][\w$]*)'
+_QUALIFIED = rf"{_IDENT}(?:\s*\.\s*{_IDENT})*"
+_TABLE_ITEM = rf"{_QUALIFIED}(?:\s+(?:AS\s+)?{_IDENT})?"
+
+# FROM a [alias], b [alias] ... and JOIN / UPDATE / INTO a
+_FROM_LIST_RE = re.compile(rf"\bFROM\s+({_TABLE_ITEM}(?:\s*,\s*{_TABLE_ITEM})*)", re.IGNORECASE)
+_TABLE_REF_RE = re.compile(rf"\b(?:JOIN|UPDATE|INTO)\s+({_QUALIFIED})", re.IGNORECASE)
+_QUALIFIED_RE = re.compile(_QUALIFIED)
+_CTE_RE = re.compile(
+    rf"(?:\bWITH(?:\s+RECURSIVE)?|,)\s*({_IDENT})\s+AS\s*(?:NOT\s+)?(?:MATERIALIZED\s+)?\(",
+    re.IGNORECASE,
+)
+
+
+def normalize_table_name(reference: str) -> str:
+    """Unquoted, lower-cased last segment of a possibly qualified name."""
+    return reference.split(".")[-1].strip().strip('"`').lower()
+
+
+def extract_tables(query: str) -> set[str]:
+    """Extract the names of tables referenced by a query.
+
+    Names are reduced to their unqualified, lower-cased form, so ``sales.Orders``
+    and ``"orders"`` both yield ``orders``. The scan is deliberately permissive:
+    it may report names that are not tables (for example table functions), but
+    it does not miss plain table references, which is what cache invalidation
+    needs.
+    """
+    text = _NOISE_RE.sub(" ", query)
+    ctes = {normalize_table_name(match.group(1)) for match in _CTE_RE.finditer(text)}
+
+    tables = set()
+    for match in _FROM_LIST_RE.finditer(text):
+        for item in match.group(1).split(","):
+            reference = _QUALIFIED_RE.match(item.strip())
+            if reference:
+                tables.add(normalize_table_name(reference.group()))
+    for match in _TABLE_REF_RE.finditer(text):
+        tables.add(normalize_table_name(match.group(1)))
+
+    return tables - ctes
@@ -8,16 +8,22 @@ from typing import Any
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from kurobe.bi.connectors import AdmissionRejectedError
 
 from app.api.v1.api import api_router
 from app.core.cache import close_cache, init_cache
 from app.core.config import settings
 from app.core.database import close_db, init_db
-from app.core.logging import logger, setup_logging
+from app.core.logging import logger, setup_logging, shutdown_logging
 from app.engines.registry import close_engines, init_engines
 from app.middleware.auth import AuthMiddleware
 from app.middleware.logging import LoggingMiddleware
 from app.middleware.metrics import MetricsMiddleware
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.services.api_keys import api_key_service
+from app.services.change_detection import change_detection
+from app.services.connections import data_connections
+from app.services.panel_results import panel_result_store
 
 
 @asynccontextmanager
@@ -34,6 +40,10 @@ async def lifespan(app: FastAPI):
 
     # Initialize cache
     await init_cache()
+    await change_detection.register_connections()
+    change_detection.start()
+    api_key_service.start()
+    panel_result_store.start()
 
     # Initialize engines
     await init_engines()
@@ -45,16 +55,21 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Kurobe Backend API")
 
-    # Close engines
+    # Close engines and data connections
     await close_engines()
+    await data_connections.close()
 
     # Close cache
+    await api_key_service.stop()
+    await panel_result_store.stop()
+    await change_detection.stop()
     await close_cache()
 
     # Close database
     await close_db()
 
     logger.info("Kurobe Backend API shut down successfully")
+    shutdown_logging()
 
 
 # Create FastAPI app
@@ -77,7 +92,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add custom middleware
+# Add custom middleware (the last one added runs first, so Auth precedes RateLimit)
+app.add_middleware(RateLimitMiddleware)
 app.add_middleware(MetricsMiddleware)
 app.add_middleware(LoggingMiddleware)
 app.add_middleware(AuthMiddleware)
@@ -107,6 +123,20 @@ async def health_check() -> dict[str, Any]:
     }
 
 
+@app.exception_handler(AdmissionRejectedError)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejectedError) -> JSONResponse:
+    """A data connection has no query slot free: ask the client to retry later"""
+    logger.warning(f"Query rejected on {request.url.path}: {exc}")
+
+    return JSONResponse(
+        status_code=503,
+        content={
+            "detail": str(exc),
+            "type": "connection_busy",
+        },
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
     """Global exception handler"""
@@ -2,30 +2,42 @@
 Logging middleware for Kurobe API
 """
 
+import random
 import time
 import uuid
 
 import structlog
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.config import settings
 from app.core.logging import logger
 
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log all HTTP requests and responses."""
+class LoggingMiddleware:
+    """Middleware to log all HTTP requests and responses.
+
+    Only ``LOG_SUCCESS_SAMPLE_RATE`` of requests are logged when they succeed;
+    client and server errors are always logged.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
 
-    async def dispatch(self, request: Request, call_next):
         # Clear any existing context
         structlog.contextvars.clear_contextvars()
 
         # Generate request ID
         request_id = str(uuid.uuid4())
         start_time = time.time()
-        client_ip = request.client.host if request.client else "unknown"
-        method = request.method
-        path = request.url.path
-        query_params = str(request.query_params)
+        client_ip = scope["client"][0] if scope.get("client") else "unknown"
+        method = scope["method"]
+        path = scope["path"]
+        query_params = scope["query_string"].decode("latin-1")
 
         # Bind context variables
         structlog.contextvars.bind_contextvars(
@@ -33,28 +45,34 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         )
 
         # Add request ID to request state
-        request.state.request_id = request_id
+        scope.setdefault("state", {})["request_id"] = request_id
 
         # Log the incoming request
-        logger.info("Request started", method=method, path=path, client_ip=client_ip, query_params=query_params)
+        sampled = settings.LOG_SUCCESS_SAMPLE_RATE >= 1 or random.random() < settings.LOG_SUCCESS_SAMPLE_RATE
+        if sampled:
+            logger.info("Request started", method=method, path=path, client_ip=client_ip, query_params=query_params)
 
-        try:
-            response = await call_next(request)
-            process_time = time.time() - start_time
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                process_time = time.time() - start_time
 
-            # Log successful response
-            logger.info(
-                "Request completed",
-                method=method,
-                path=path,
-                status_code=response.status_code,
-                process_time=f"{process_time:.3f}s",
-            )
+                # Log the response; unsampled requests only if they failed
+                if sampled or message["status"] >= 400:
+                    logger.info(
+                        "Request completed",
+                        method=method,
+                        path=path,
+                        status_code=message["status"],
+                        process_time=f"{process_time:.3f}s",
+                    )
 
-            # Add request ID to response headers
-            response.headers["X-Request-ID"] = request_id
+                # Add request ID to response headers
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
 
-            return response
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
 
         except Exception as e:
             process_time = time.time() - start_time
@@ -2,11 +2,13 @@
 Metrics middleware for Kurobe API using Prometheus
 """
 
+import re
 import time
 
-from fastapi import Request
-from prometheus_client import Counter, Histogram, generate_latest
-from starlette.middleware.base import BaseHTTPMiddleware
+from prometheus_client import Counter, Gauge, Histogram, generate_latest
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
 
 # Prometheus metrics
 REQUEST_COUNT = Counter("kurobe_http_requests_total", "Total HTTP requests", ["method", "endpoint", "status_code"])
@@ -15,58 +17,93 @@ REQUEST_DURATION = Histogram(
     "kurobe_http_request_duration_seconds", "HTTP request duration in seconds", ["method", "endpoint"]
 )
 
-ACTIVE_CONNECTIONS = Counter("kurobe_active_connections_total", "Total active connections")
-
-
-class MetricsMiddleware(BaseHTTPMiddleware):
-    """Middleware to collect Prometheus metrics."""
-
-    async def dispatch(self, request: Request, call_next):
-        # Skip metrics collection for metrics endpoint itself
-        if request.url.path == "/metrics":
-            return await call_next(request)
-
-        start_time = time.time()
-        method = request.method
-        path = request.url.path
-
-        # Normalize path for metrics (remove dynamic segments)
-        normalized_path = self.normalize_path(path)
+REQUESTS_IN_PROGRESS = Gauge("kurobe_http_requests_in_progress", "HTTP requests currently being served", ["method"])
 
-        try:
-            response = await call_next(request)
-            duration = time.time() - start_time
-            status_code = str(response.status_code)
-
-            # Record metrics
-            REQUEST_COUNT.labels(method=method, endpoint=normalized_path, status_code=status_code).inc()
-
-            REQUEST_DURATION.labels(method=method, endpoint=normalized_path).observe(duration)
+RESPONSE_SIZE = Histogram(
+    "kurobe_http_response_size_bytes",
+    "HTTP response body size in bytes",
+    ["method", "endpoint"],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000),
+)
 
-            return response
+# Endpoint label for requests that matched no route, e.g. 404s
+OTHER_ENDPOINT = "other"
 
-        except Exception:
-            duration = time.time() - start_time
+# Endpoint label by id() of the matched route; routes live as long as the app
+_route_labels: dict[int, str] = {}
 
-            # Record error metrics
-            REQUEST_COUNT.labels(method=method, endpoint=normalized_path, status_code="500").inc()
+UUID_SEGMENT = re.compile(r"/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+NUMERIC_SEGMENT = re.compile(r"/\d+")
 
-            REQUEST_DURATION.labels(method=method, endpoint=normalized_path).observe(duration)
 
-            raise
+class MetricsMiddleware:
+    """Middleware to collect Prometheus metrics.
 
-    def normalize_path(self, path: str) -> str:
-        """Normalize path for metrics to avoid high cardinality."""
-        # Replace UUIDs and other dynamic segments with placeholders
-        import re
+    Requests are labelled with the template of the route they matched, such
+    as ``/api/v1/questions/{question_id}``, so label cardinality is bounded by
+    the number of routes.
+    """
 
-        # Replace UUIDs
-        path = re.sub(r"/[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", "/{id}", path)
+    SKIP_PATHS = {"/metrics", f"{settings.API_V1_STR}/metrics"}
 
-        # Replace other common patterns
-        path = re.sub(r"/\d+", "/{id}", path)  # Replace numeric IDs
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        return path
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        # Skip metrics collection for metrics endpoint itself
+        if scope["type"] != "http" or scope["path"] in self.SKIP_PATHS:
+            return await self.app(scope, receive, send)
+
+        start_time = time.perf_counter()
+        method = scope["method"]
+        status_code = "500"
+        response_size = 0
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = str(message["status"])
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+
+            # Record metrics; requests failing before a response count as 500
+            duration = time.perf_counter() - start_time
+            endpoint = self.endpoint_label(scope)
+            REQUEST_COUNT.labels(method=method, endpoint=endpoint, status_code=status_code).inc()
+            REQUEST_DURATION.labels(method=method, endpoint=endpoint).observe(duration)
+            RESPONSE_SIZE.labels(method=method, endpoint=endpoint).observe(response_size)
+
+    @staticmethod
+    def endpoint_label(scope: Scope) -> str:
+        """Template of the route the router matched, or ``"other"``."""
+        route = scope.get("route")
+        if route is None:
+            return OTHER_ENDPOINT
+
+        label = _route_labels.get(id(route))
+        if label is None:
+            label = route.path
+            # Routes of routers included with a prefix may not carry the prefix,
+            # in which case it is the part of the path before the route's own match
+            tail = re.search(route.path_regex.pattern.lstrip("^"), scope["path"])
+            if tail and tail.start() > 0 and not label.startswith(scope["path"][: tail.start()]):
+                label = scope["path"][: tail.start()] + label
+            _route_labels[id(route)] = label
+        return label
+
+    @staticmethod
+    def normalize_path(path: str) -> str:
+        """Normalize a raw path, before routing, by replacing ID segments with placeholders."""
+        path = UUID_SEGMENT.sub("/{id}", path)
+        return NUMERIC_SEGMENT.sub("/{id}", path)
 
 
 def get_metrics() -> str:
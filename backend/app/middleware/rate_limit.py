@@ -0,0 +1,59 @@
+"""
+Rate limiting middleware for Kurobe API
+"""
+
+import math
+
+from fastapi import status
+from starlette.datastructures import MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.cache import rate_limit
+from app.core.config import settings
+from app.core.logging import logger
+from app.middleware.metrics import MetricsMiddleware
+
+
+class RateLimitMiddleware:
+    """Token bucket rate limiting per API key and endpoint.
+
+    Must run inside AuthMiddleware, which identifies the API key; requests
+    without an authenticated user are not limited here.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        user = scope.get("state", {}).get("user") if scope["type"] == "http" else None
+        if not settings.RATE_LIMIT_ENABLED or user is None:
+            return await self.app(scope, receive, send)
+
+        endpoint = f"{scope['method']}:{MetricsMiddleware.normalize_path(scope['path'])}"
+        key = f"rate_limit:{user['api_key_id']}:{endpoint}"
+        limit = settings.RATE_LIMIT_REQUESTS
+
+        allowed, remaining, retry_after = await rate_limit(key, limit, settings.RATE_LIMIT_WINDOW)
+        headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(remaining),
+        }
+
+        if not allowed:
+            logger.warning(f"Rate limit exceeded for API key {user['api_key_id']} on {endpoint}")
+            headers["Retry-After"] = str(math.ceil(retry_after))
+            response = Response(
+                content='{"detail": "Rate limit exceeded"}',
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                media_type="application/json",
+                headers=headers,
+            )
+            return await response(scope, receive, send)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
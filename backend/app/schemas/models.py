@@ -89,6 +89,7 @@ class Panel(BaseModel):
     spec: PanelSpec
     is_pinned: bool = False
     position: dict[str, int] | None = None  # {"x": 0, "y": 0}
+    result_hash: str | None = None  # data and query_result, loaded separately
     created_by: UUID
     created_at: datetime
     updated_at: datetime
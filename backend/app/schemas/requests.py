@@ -68,6 +68,12 @@ class ConnectionRequest(BaseModel):
     metadata: dict[str, Any] | None = None
 
 
+class CacheInvalidationRequest(BaseModel):
+    """Request to invalidate cached query results of a connection"""
+
+    tables: list[str] | None = Field(default=None, description="Changed tables; all cached results if omitted")
+
+
 class QueryRequest(BaseModel):
     """Request to execute a query"""
 
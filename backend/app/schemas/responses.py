@@ -6,9 +6,9 @@ from datetime import datetime
 from typing import Any
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_serializer
 
-from .models import Panel, PanelSpec
+from .models import DataPoint, Panel, PanelSpec, QueryResult
 
 
 class QuestionResponse(BaseModel):
@@ -25,6 +25,39 @@ class QuestionResponse(BaseModel):
     completed_at: datetime | None = None
 
 
+class QuestionSummary(BaseModel):
+    """Projection of a question holding only the fields selected with ``?fields=``"""
+
+    id: UUID | None = None
+    text: str | None = None
+    status: str | None = None
+    panels: list[PanelSpec] | None = None
+    plan: dict[str, Any] | None = None
+    error: str | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    completed_at: datetime | None = None
+
+    @model_serializer(mode="wrap")
+    def _serialize_selected(self, handler):
+        # Leave out the fields that were not selected rather than sending nulls
+        return {name: value for name, value in handler(self).items() if name in self.model_fields_set}
+
+
+class QuestionListResponse(BaseModel):
+    """Page of questions; pass ``next_cursor`` back to get the next page"""
+
+    questions: list[QuestionResponse]
+    next_cursor: str | None = None
+
+
+class QuestionSummaryListResponse(BaseModel):
+    """Page of questions projected to the fields selected with ``?fields=``"""
+
+    questions: list[QuestionSummary]
+    next_cursor: str | None = None
+
+
 class PanelResponse(BaseModel):
     """Response for panel operations"""
 
@@ -33,10 +66,20 @@ class PanelResponse(BaseModel):
     spec: PanelSpec
     is_pinned: bool
     position: dict[str, int] | None
+    result_hash: str | None = None
     created_at: datetime
     updated_at: datetime
 
 
+class PanelResultResponse(BaseModel):
+    """Data and query result of a panel, stored apart from its spec"""
+
+    panel_id: UUID
+    result_hash: str
+    data: list[DataPoint] | None = None
+    query_result: QueryResult | None = None
+
+
 class DashboardResponse(BaseModel):
     """Response for dashboard operations"""
 
@@ -54,6 +97,28 @@ class DashboardResponse(BaseModel):
     updated_at: datetime
 
 
+class DashboardSummary(BaseModel):
+    """Projection of a dashboard holding only the fields selected with ``?fields=``"""
+
+    id: UUID | None = None
+    user_id: UUID | None = None
+    name: str | None = None
+    description: str | None = None
+    panels: list[Panel] | None = None
+    layout: dict[str, Any] | None = None
+    refresh_interval: int | None = None
+    filters: dict[str, Any] | None = None
+    tags: list[str] | None = None
+    is_public: bool | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+    @model_serializer(mode="wrap")
+    def _serialize_selected(self, handler):
+        # Leave out the fields that were not selected rather than sending nulls
+        return {name: value for name, value in handler(self).items() if name in self.model_fields_set}
+
+
 class ChatMessage(BaseModel):
     """Chat message in a conversation"""
 
@@ -63,6 +128,13 @@ class ChatMessage(BaseModel):
     metadata: dict[str, Any] | None = None
 
 
+class ChatHistoryResponse(BaseModel):
+    """Page of a question's chat messages, oldest first"""
+
+    messages: list[ChatMessage]
+    next_cursor: str | None = None
+
+
 class ChatResponse(BaseModel):
     """Response from chat interaction"""
 
@@ -100,6 +172,14 @@ class ConnectionResponse(BaseModel):
     last_used_at: datetime | None = None
 
 
+class CacheInvalidationResponse(BaseModel):
+    """Response for cache invalidation"""
+
+    connection_id: str
+    tables: list[str] | None = None
+    invalidated: int
+
+
 class QueryResponse(BaseModel):
     """Response from query execution"""
 
@@ -0,0 +1,198 @@
+"""
+API key service with cached validation and batched usage tracking
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from datetime import UTC, datetime
+from uuid import UUID
+
+from app.core import cache
+from app.core.config import settings
+from app.core.database import db
+from app.core.logging import logger
+
+# Published with a key hash when a key is revoked, to evict it on every replica
+REVOCATION_CHANNEL = "api_key:revoked"
+
+# Seconds a replica trusts its own copy of a validated key
+LOCAL_CACHE_TTL = 10
+
+LOCAL_CACHE_MAX_ENTRIES = 10_000
+
+
+def hash_api_key(api_key: str) -> str:
+    """Hash an API key the way it is stored."""
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+class APIKeyService:
+    """Service for validating, tracking and revoking API keys.
+
+    Validated keys are cached in-process and in Redis for ``API_KEY_CACHE_TTL``
+    seconds, so most requests never query Postgres. Revoking a key evicts it
+    from both tiers on every replica. ``last_used_at`` updates are collected in
+    memory and written in one batched statement every
+    ``API_KEY_USAGE_FLUSH_INTERVAL`` seconds.
+    """
+
+    def __init__(self):
+        # Entries count as size 1, so the size budget is an entry budget
+        self._local = cache.LocalCache(LOCAL_CACHE_MAX_ENTRIES)
+        self._usage: dict[UUID, datetime] = {}
+        self._flush_task: asyncio.Task | None = None
+        cache.register_invalidation_handler(REVOCATION_CHANNEL, self._local.delete)
+
+    async def validate(self, api_key: str) -> dict | None:
+        """Validate an API key and return user information."""
+        key_hash = hash_api_key(api_key)
+
+        entry = self._local.get(key_hash)
+        if entry is None:
+            entry = await self._get_cached(key_hash)
+            if entry is None:
+                entry = await self._fetch(key_hash)
+                if entry is None:
+                    return None
+                await self._store_cached(key_hash, entry)
+            self._local.set(key_hash, entry, 1, min(LOCAL_CACHE_TTL, settings.API_KEY_CACHE_TTL))
+
+        user, expires_at = entry
+        if expires_at is not None and expires_at < time.time():
+            return None
+        return user
+
+    async def _fetch(self, key_hash: str) -> tuple[dict, float | None] | None:
+        query = """
+        SELECT ak.id, ak.user_id, ak.name, ak.expires_at, ak.is_active,
+               u.id as user_id, u.email, u.username, u.full_name, u.is_active as user_active, u.is_superuser
+        FROM api_keys ak
+        JOIN users u ON ak.user_id = u.id
+        WHERE ak.key_hash = $1 AND ak.is_active = true AND u.is_active = true
+        """
+
+        result = await db.fetchrow(query, key_hash)
+        if not result:
+            return None
+
+        user = {
+            "api_key_id": result["id"],
+            "user_id": result["user_id"],
+            "email": result["email"],
+            "username": result["username"],
+            "full_name": result["full_name"],
+            "is_superuser": result["is_superuser"],
+        }
+        expires_at = result["expires_at"].timestamp() if result["expires_at"] else None
+        return user, expires_at
+
+    async def _get_cached(self, key_hash: str) -> tuple[dict, float | None] | None:
+        try:
+            cached = await cache.get(f"api_key:{key_hash}")
+        except Exception as e:
+            logger.warning(f"Failed to read cached API key: {e}")
+            return None
+        if not cached:
+            return None
+
+        data = json.loads(cached)
+        user = data["user"]
+        user["api_key_id"] = UUID(user["api_key_id"])
+        user["user_id"] = UUID(user["user_id"])
+        return user, data["expires_at"]
+
+    async def _store_cached(self, key_hash: str, entry: tuple[dict, float | None]):
+        user, expires_at = entry
+        try:
+            await cache.set(
+                f"api_key:{key_hash}",
+                json.dumps({"user": user, "expires_at": expires_at}, default=str),
+                ex=settings.API_KEY_CACHE_TTL,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to cache API key: {e}")
+
+    async def revoke(self, key_hash: str):
+        """Evict a key from the validation caches of every replica."""
+        self._local.delete(key_hash)
+        try:
+            await cache.delete(f"api_key:{key_hash}")
+            await cache.publish(REVOCATION_CHANNEL, key_hash)
+        except Exception as e:
+            logger.warning(f"Failed to propagate API key revocation: {e}")
+
+    async def delete_api_key(self, key_id: UUID, user_id: UUID) -> bool:
+        """Delete a user's API key and revoke it immediately."""
+        try:
+            query = """
+            DELETE FROM api_keys
+            WHERE id = $1 AND user_id = $2
+            RETURNING key_hash
+            """
+
+            result = await db.fetchrow(query, key_id, user_id)
+            if not result:
+                return False
+
+            await self.revoke(result["key_hash"])
+            self._usage.pop(key_id, None)
+            logger.info(f"Deleted API key {key_id} for user {user_id}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to delete API key {key_id}: {e}")
+            raise
+
+    def record_usage(self, api_key_id: UUID):
+        """Note that a key was used; written to Postgres on the next flush."""
+        self._usage[api_key_id] = datetime.now(UTC)
+
+    async def flush_usage(self):
+        """Write pending ``last_used_at`` updates in one statement."""
+        if not self._usage:
+            return
+
+        usage, self._usage = self._usage, {}
+        try:
+            await db.execute(
+                """
+                UPDATE api_keys AS ak
+                SET last_used_at = u.used_at
+                FROM unnest($1::uuid[], $2::timestamptz[]) AS u(id, used_at)
+                WHERE ak.id = u.id
+                """,
+                list(usage),
+                list(usage.values()),
+            )
+        except Exception as e:
+            logger.warning(f"Failed to update API key usage: {e}")
+            # Keep the timestamps for the next flush unless newer ones arrived
+            for api_key_id, used_at in usage.items():
+                self._usage.setdefault(api_key_id, used_at)
+
+    async def _run_flush(self):
+        while True:
+            await asyncio.sleep(settings.API_KEY_USAGE_FLUSH_INTERVAL)
+            await self.flush_usage()
+
+    def start(self):
+        """Start flushing usage in the background."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._run_flush())
+
+    async def stop(self):
+        """Stop background flushing and write any pending usage."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush_usage()
+
+
+# Global API key service
+api_key_service = APIKeyService()
@@ -0,0 +1,246 @@
+"""
+Change detection service that invalidates cached query results when source tables change
+"""
+
+import asyncio
+import os
+from abc import ABC, abstractmethod
+
+from kurobe.bi.connectors import ConnectionConfig, ConnectionPool, DataConnector
+
+from app.core import cache
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.sql import normalize_table_name
+from app.services.connections import ConnectionService
+
+
+class ChangeDetector(ABC):
+    """Reports the tables of a connection whose data changed since the previous poll."""
+
+    def __init__(self, connector: DataConnector):
+        self.connector = connector
+
+    @abstractmethod
+    async def changed_tables(self) -> set[str] | None:
+        """Return changed table names, or None if any table may have changed.
+
+        The first poll only records a baseline and reports no changes.
+        """
+
+
+class PostgresChangeDetector(ChangeDetector):
+    """Detects writes through the cumulative counters in ``pg_stat_user_tables``.
+
+    The server publishes these counters with a delay of up to about ten
+    seconds, so changes are noticed on the poll after that.
+    """
+
+    QUERY = """
+    SELECT relname, n_tup_ins, n_tup_upd, n_tup_del, n_live_tup
+    FROM pg_stat_user_tables
+    ORDER BY relid
+    """
+
+    def __init__(self, connector: DataConnector):
+        super().__init__(connector)
+        self._counters: dict[str, tuple] | None = None
+
+    async def changed_tables(self) -> set[str] | None:
+        result = await self.connector.execute_query(self.QUERY)
+
+        counters = {}
+        for row in result.rows:
+            table = normalize_table_name(row[0])
+            # Same-named tables in different schemas are folded together
+            counters[table] = tuple(row[1:]) + counters.get(table, ())
+
+        previous, self._counters = self._counters, counters
+        if previous is None:
+            return set()
+        return {table for table, values in counters.items() if previous.get(table) != values}
+
+
+class DuckDBChangeDetector(ChangeDetector):
+    """Detects changes through file modification times.
+
+    A change to the database file (or its WAL) may touch any table. Files read
+    directly by queries, such as Parquet extracts, can be mapped to the table
+    names they are queried as via ``files``.
+    """
+
+    def __init__(self, connector: DataConnector, files: dict[str, str] | None = None):
+        super().__init__(connector)
+        self._files = {normalize_table_name(table): path for table, path in (files or {}).items()}
+        self._mtimes: dict[str, int | None] | None = None
+
+    @staticmethod
+    def _mtime(path: str) -> int | None:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _snapshot(self) -> dict[str, int | None]:
+        mtimes = {table: self._mtime(path) for table, path in self._files.items()}
+        database = self.connector.config.extra_params.get("path", ":memory:")
+        if database != ":memory:":
+            mtimes[""] = self._mtime(database)
+            mtimes[".wal"] = self._mtime(f"{database}.wal")
+        return mtimes
+
+    async def changed_tables(self) -> set[str] | None:
+        mtimes = await asyncio.to_thread(self._snapshot)
+
+        previous, self._mtimes = self._mtimes, mtimes
+        if previous is None:
+            return set()
+        if previous.get("") != mtimes.get("") or previous.get(".wal") != mtimes.get(".wal"):
+            return None
+        return {table for table in self._files if previous.get(table) != mtimes.get(table)}
+
+
+class TrinoChangeDetector(ChangeDetector):
+    """Detects new commits through Iceberg ``$snapshots`` metadata tables.
+
+    ``tables`` are qualified as ``catalog.schema.table`` or ``schema.table``.
+    """
+
+    def __init__(self, connector: DataConnector, tables: list[str]):
+        super().__init__(connector)
+        self._tables = tables
+        self._snapshots: dict[str, object] | None = None
+
+    async def _latest_snapshot(self, table: str) -> object:
+        *namespace, name = table.split(".")
+        metadata_table = ".".join([*namespace, f'"{name}$snapshots"'])
+        result = await self.connector.execute_query(
+            f"SELECT snapshot_id FROM {metadata_table} ORDER BY committed_at DESC LIMIT 1"
+        )
+        return result.rows[0][0] if result.row_count else None
+
+    async def changed_tables(self) -> set[str] | None:
+        latest = await asyncio.gather(*(self._latest_snapshot(table) for table in self._tables))
+        snapshots = dict(zip(self._tables, latest, strict=True))
+
+        previous, self._snapshots = self._snapshots, snapshots
+        if previous is None:
+            return set()
+        return {
+            normalize_table_name(table) for table, snapshot in snapshots.items() if previous.get(table) != snapshot
+        }
+
+
+def create_detector(connection: dict, connector: DataConnector) -> ChangeDetector | None:
+    """Create the change detector for a connection row, if its type has one.
+
+    Detectors are configured by ``metadata.change_detection``: ``enabled``
+    turns one off, ``files`` maps DuckDB tables to the files they are read
+    from and ``tables`` lists the Iceberg tables watched on Trino.
+    """
+    options = (connection.get("metadata") or {}).get("change_detection") or {}
+    if options.get("enabled") is False:
+        return None
+    if connection["type"] == "postgres":
+        return PostgresChangeDetector(connector)
+    if connection["type"] == "duckdb":
+        return DuckDBChangeDetector(connector, options.get("files"))
+    if connection["type"] == "trino" and options.get("tables"):
+        return TrinoChangeDetector(connector, options["tables"])
+    return None
+
+
+class ChangeDetectionService:
+    """Polls registered change detectors and invalidates affected cached results."""
+
+    def __init__(self, interval: float = settings.CACHE_CHANGE_POLL_INTERVAL):
+        self.interval = interval
+        self._detectors: dict[str, ChangeDetector] = {}
+        self._connections = ConnectionPool()
+        self._task: asyncio.Task | None = None
+
+    def register(self, connection_id: str, detector: ChangeDetector):
+        """Watch a connection with the given detector."""
+        self._detectors[connection_id] = detector
+
+    def unregister(self, connection_id: str):
+        """Stop watching a connection."""
+        self._detectors.pop(connection_id, None)
+
+    async def register_connections(self) -> int:
+        """Watch every active connection that has a change detector; returns how many are watched.
+
+        Detectors are registered under the connection name, which is what
+        query results are cached under. Their connectors connect on first poll.
+        """
+        try:
+            connections = await ConnectionService().list_active_connections()
+        except Exception as e:
+            logger.warning(f"Could not load connections for change detection: {e}")
+            return 0
+
+        for connection in connections:
+            name = connection["name"]
+            if name in self._detectors:
+                continue
+            try:
+                config = ConnectionConfig(**{**connection["config"], "name": name, "type": connection["type"]})
+                connector = await self._connections.add_connection(config, lazy=True)
+            except Exception as e:
+                logger.warning(f"Cannot watch connection {name} for changes: {e}")
+                continue
+
+            detector = create_detector(connection, connector)
+            if detector is None:
+                await self._connections.remove_connection(name)
+                continue
+            self.register(name, detector)
+
+        logger.info(f"Watching {len(self._detectors)} connections for changes")
+        return len(self._detectors)
+
+    async def poll(self) -> dict[str, int]:
+        """Poll every detector once; returns the number of results invalidated per connection."""
+        connection_ids = list(self._detectors)
+        invalidated = await asyncio.gather(*(self._poll_connection(cid) for cid in connection_ids))
+        return dict(zip(connection_ids, invalidated, strict=True))
+
+    async def _poll_connection(self, connection_id: str) -> int:
+        try:
+            if connection_id in self._connections.list_connections():
+                await self._connections.acquire(connection_id)
+            changed = await self._detectors[connection_id].changed_tables()
+            if changed is None:
+                return await cache.invalidate_query_results(connection_id)
+            if changed:
+                return await cache.invalidate_query_results(connection_id, changed)
+            return 0
+        except Exception as e:
+            logger.warning(f"Change detection failed for connection {connection_id}: {e}")
+            return 0
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.poll()
+
+    def start(self):
+        """Start polling in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._connections.start_health_checks()
+
+    async def stop(self):
+        """Stop background polling."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._connections.close_all()
+
+
+# Global change detection service
+change_detection = ChangeDetectionService()
@@ -0,0 +1,102 @@
+"""
+Connection service for looking up configured data connections
+"""
+
+from kurobe.bi.connectors import ConnectionConfig, ConnectionPool, DataConnector
+
+from app.core.database import db
+from app.core.logging import logger
+from app.core.metrics import register_admission
+
+
+class ConnectionService:
+    """Service for reading data connections."""
+
+    async def get_connection(self, connection_id: str) -> dict | None:
+        """Get an active connection by name or ID."""
+        try:
+            query = """
+            SELECT id, name, type, config, metadata, created_by
+            FROM connections
+            WHERE (name = $1 OR id::text = $1) AND is_active
+            """
+
+            result = await db.fetchrow(query, connection_id)
+            return dict(result) if result else None
+
+        except Exception as e:
+            logger.error(f"Failed to get connection {connection_id}: {e}")
+            raise
+
+    async def list_active_connections(self) -> list[dict]:
+        """List all active connections."""
+        try:
+            query = """
+            SELECT id, name, type, config, metadata, created_by
+            FROM connections
+            WHERE is_active
+            ORDER BY name
+            """
+
+            return [dict(result) for result in await db.fetch(query)]
+
+        except Exception as e:
+            logger.error(f"Failed to list connections: {e}")
+            raise
+
+    @staticmethod
+    def can_manage(connection: dict, user: dict) -> bool:
+        """Whether a user may manage a connection: its creator or a superuser."""
+        return bool(user.get("is_superuser")) or connection["created_by"] == user["user_id"]
+
+
+class DataConnections:
+    """Connectors for the configured connections, shared by everything that runs queries.
+
+    Connectors are keyed by connection name, which is also what their
+    results are cached under, and connect on first use.
+    """
+
+    def __init__(self):
+        self._pool = ConnectionPool()
+        # Connection ID -> name, for connections referred to by ID
+        self._names: dict[str, str] = {}
+
+    async def get_connector(self, connection_id: str) -> DataConnector:
+        """Get a connected connector for a connection, by name or ID.
+
+        Raises LookupError if there is no such active connection.
+        """
+        # Probe connected connectors in the background from the first use on
+        self._pool.start_health_checks()
+
+        name = self._names.get(connection_id, connection_id)
+        if name not in self._pool.list_connections():
+            connection = await ConnectionService().get_connection(connection_id)
+            if not connection:
+                raise LookupError(f"Connection {connection_id} not found")
+
+            name = connection["name"]
+            self._names[connection_id] = name
+            if name not in self._pool.list_connections():
+                config = ConnectionConfig(**{**connection["config"], "name": name, "type": connection["type"]})
+                try:
+                    await self._pool.add_connection(config, lazy=True)
+                except ValueError:
+                    # Added concurrently
+                    pass
+        return await self._pool.acquire(name)
+
+    def admission_stats(self) -> dict[str, dict]:
+        """Query slot usage of every connection with a concurrency limit."""
+        return self._pool.admission_stats()
+
+    async def close(self):
+        """Disconnect every connector."""
+        await self._pool.close_all()
+        self._names.clear()
+
+
+# Global data connections
+data_connections = DataConnections()
+register_admission(data_connections.admission_stats)
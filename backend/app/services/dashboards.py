@@ -0,0 +1,191 @@
+"""
+Dashboard service for managing collections of pinned panels
+"""
+
+from uuid import UUID
+
+from app.core.database import db
+from app.core.logging import logger
+from app.core.projection import select_columns
+from app.schemas import DashboardResponse, DashboardSummary, PanelResultResponse
+from app.services.connections import data_connections
+from app.services.panel_results import hash_result, panel_result_store
+from app.services.query_execution import QueryExecutionService
+
+# Columns behind the fields of a dashboard; panels are loaded separately
+DASHBOARD_COLUMNS = {
+    "id": "id",
+    "user_id": "user_id",
+    "name": "name",
+    "description": "description",
+    "layout": "layout",
+    "refresh_interval": "refresh_interval",
+    "filters": "filters",
+    "tags": "tags",
+    "is_public": "is_public",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+}
+DASHBOARD_FIELDS = (*DASHBOARD_COLUMNS, "panels")
+
+
+class DashboardService:
+    """Service for managing dashboards."""
+
+    async def list_dashboards(
+        self,
+        user_id: UUID,
+        limit: int = 20,
+        offset: int = 0,
+        fields: set[str] | None = None,
+    ) -> list[DashboardResponse] | list[DashboardSummary]:
+        """List a user's dashboards, newest first.
+
+        With ``fields`` only those columns are read and the dashboards are
+        returned as summaries; panels are loaded only when selected.
+        """
+        try:
+            columns = select_columns(fields or set(DASHBOARD_FIELDS), DASHBOARD_COLUMNS, always=("id",))
+
+            query = f"""
+            SELECT {columns}
+            FROM dashboards
+            WHERE user_id = $1
+            ORDER BY created_at DESC, id DESC
+            LIMIT $2 OFFSET $3
+            """
+
+            results = await db.fetch(query, user_id, limit, offset)
+
+            panels = {}
+            if fields is None or "panels" in fields:
+                panels = await self.get_panels_for_dashboards([result["id"] for result in results])
+
+            if fields is not None:
+                summaries = []
+                for result in results:
+                    values = {name: result[name] for name in fields if name in DASHBOARD_COLUMNS}
+                    if "panels" in fields:
+                        values["panels"] = panels.get(result["id"], [])
+                    summaries.append(DashboardSummary(**values))
+                return summaries
+
+            return [
+                DashboardResponse(
+                    id=result["id"],
+                    user_id=result["user_id"],
+                    name=result["name"],
+                    description=result["description"],
+                    panels=panels.get(result["id"], []),
+                    layout=result["layout"] or {},
+                    refresh_interval=result["refresh_interval"],
+                    filters=result["filters"] or {},
+                    tags=result["tags"] or [],
+                    is_public=result["is_public"],
+                    created_at=result["created_at"],
+                    updated_at=result["updated_at"],
+                )
+                for result in results
+            ]
+
+        except Exception as e:
+            logger.error(f"Failed to list dashboards for user {user_id}: {e}")
+            raise
+
+    async def get_panel_results(self, dashboard_id: UUID, user_id: UUID) -> list[PanelResultResponse] | None:
+        """Get the current results of a dashboard's panels; None if the dashboard is not visible to the user.
+
+        Panels of answered questions re-run the question's SQL through the
+        query cache, which refreshes them on the dashboard's
+        ``refresh_interval``; all their cache lookups share one round-trip.
+        Other panels, and panels whose query fails, serve their stored result.
+        """
+        try:
+            refresh_interval = await db.fetchval(
+                "SELECT COALESCE(refresh_interval, 0) FROM dashboards WHERE id = $1 AND (user_id = $2 OR is_public)",
+                dashboard_id,
+                user_id,
+            )
+            if refresh_interval is None:
+                return None
+
+            query = """
+            SELECT p.id, p.result_hash, q.plan->>'sql' AS sql, q.plan->>'connection_id' AS connection_id
+            FROM dashboard_panels dp
+            JOIN panels p ON dp.panel_id = p.id
+            JOIN questions q ON p.question_id = q.id
+            WHERE dp.dashboard_id = $1
+            ORDER BY dp.added_at, p.id
+            """
+
+            panels = await db.fetch(query, dashboard_id)
+
+            live, queries = [], []
+            for panel in panels:
+                if not panel["sql"] or not panel["connection_id"]:
+                    continue
+                try:
+                    connector = await data_connections.get_connector(panel["connection_id"])
+                except Exception as e:
+                    # Fall back to the stored result
+                    logger.warning(f"Cannot refresh panel {panel['id']}: {e}")
+                    continue
+                live.append(panel)
+                queries.append((connector, panel["sql"], None))
+            live_results = await QueryExecutionService().execute_many(
+                queries, refresh_interval=refresh_interval or None, user_id=user_id
+            )
+
+            results = {}
+            for panel, query_result in zip(live, live_results, strict=True):
+                if isinstance(query_result, Exception):
+                    # Fall back to the stored result
+                    logger.warning(f"Cannot refresh panel {panel['id']}: {query_result}")
+                    continue
+                result = {"data": None, "query_result": query_result}
+                results[panel["id"]] = PanelResultResponse(
+                    panel_id=panel["id"], result_hash=hash_result(result), **result
+                )
+
+            for panel in panels:
+                if panel["id"] in results or not panel["result_hash"]:
+                    continue
+                stored = await panel_result_store.load(panel["result_hash"])
+                if stored is not None:
+                    results[panel["id"]] = PanelResultResponse(
+                        panel_id=panel["id"], result_hash=panel["result_hash"], **stored
+                    )
+
+            return [results[panel["id"]] for panel in panels if panel["id"] in results]
+
+        except Exception as e:
+            logger.error(f"Failed to get panel results of dashboard {dashboard_id}: {e}")
+            raise
+
+    async def get_panels_for_dashboards(self, dashboard_ids: list[UUID]) -> dict[UUID, list[dict]]:
+        """Get the panels of several dashboards, keyed by dashboard ID."""
+        if not dashboard_ids:
+            return {}
+
+        try:
+            query = """
+            SELECT dp.dashboard_id, p.id, p.question_id, p.spec, p.is_pinned,
+                   COALESCE(dp.position, p.position) AS position, p.result_hash,
+                   p.created_by, p.created_at, p.updated_at
+            FROM dashboard_panels dp
+            JOIN panels p ON dp.panel_id = p.id
+            WHERE dp.dashboard_id = ANY($1::uuid[])
+            ORDER BY dp.dashboard_id, dp.added_at, p.id
+            """
+
+            results = await db.fetch(query, dashboard_ids)
+
+            panels: dict[UUID, list[dict]] = {}
+            for result in results:
+                panel = dict(result)
+                panels.setdefault(panel.pop("dashboard_id"), []).append(panel)
+            return panels
+
+        except Exception as e:
+            logger.error(f"Failed to get panels for {len(dashboard_ids)} dashboards: {e}")
+            raise
@@ -0,0 +1,196 @@
+"""
+Content-addressed store for panel result data
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+from typing import Any
+
+from app.core import cache
+from app.core.config import settings
+from app.core.database import db
+from app.core.logging import logger
+
+# PanelSpec fields holding result data, stored apart from the spec
+RESULT_FIELDS = ("data", "query_result")
+
+
+def split_spec(spec: dict[str, Any]) -> tuple[dict[str, Any], dict[str, Any] | None]:
+    """Split a panel spec into the spec without result data and the result, if any."""
+    slim = {key: value for key, value in spec.items() if key not in RESULT_FIELDS}
+    if all(spec.get(field) is None for field in RESULT_FIELDS):
+        return slim, None
+    return slim, {field: spec.get(field) for field in RESULT_FIELDS}
+
+
+def _canonical(result: dict[str, Any]) -> bytes:
+    """Encode a result independently of key order; its SHA-256 is the result's hash."""
+    return json.dumps(result, sort_keys=True, separators=(",", ":"), default=str).encode()
+
+
+def hash_result(result: dict[str, Any]) -> str:
+    """Hash a result the way the store keys it."""
+    return hashlib.sha256(_canonical(result)).hexdigest()
+
+
+class PanelResultStore:
+    """Stores panel data and query results once per distinct content.
+
+    Panels reference a result by its hash, so identical results shared by
+    several panels are stored once, and reading a panel does not read its
+    rows. Stored results never change, so loaded ones are kept in-process
+    until evicted by ``PANEL_RESULT_CACHE_MAX_BYTES``.
+    """
+
+    def __init__(self):
+        self._local = cache.LocalCache(settings.PANEL_RESULT_CACHE_MAX_BYTES)
+        self._maintenance_task: asyncio.Task | None = None
+
+    async def store(self, result: dict[str, Any]) -> str:
+        """Store a result unless it is stored already, and return its hash."""
+        canonical = _canonical(result)
+        result_hash = hashlib.sha256(canonical).hexdigest()
+        try:
+            payload = cache.encode_value(result)
+            query_result = result.get("query_result") or {}
+
+            query = """
+            INSERT INTO panel_results (result_hash, payload, size_bytes, row_count)
+            VALUES ($1, $2, $3, $4)
+            ON CONFLICT (result_hash) DO UPDATE SET created_at = NOW()
+            """
+
+            await db.execute(query, result_hash, payload, len(canonical), query_result.get("row_count"))
+            return result_hash
+
+        except Exception as e:
+            logger.error(f"Failed to store panel result {result_hash}: {e}")
+            raise
+
+    async def store_spec(self, spec: dict[str, Any]) -> tuple[dict[str, Any], str | None]:
+        """Move the result data of a spec into the store.
+
+        Returns the spec to persist in ``panels.spec`` and the hash to persist
+        in ``panels.result_hash``.
+        """
+        slim, result = split_spec(spec)
+        if result is None:
+            return slim, None
+        return slim, await self.store(result)
+
+    async def load(self, result_hash: str) -> dict[str, Any] | None:
+        """Load a result by its hash."""
+        result = self._local.get(result_hash)
+        if result is not None:
+            return result
+
+        try:
+            row = await db.fetchrow(
+                "SELECT payload, size_bytes FROM panel_results WHERE result_hash = $1",
+                result_hash,
+            )
+            if not row:
+                return None
+
+            result = cache.decode_value(row["payload"])
+            self._local.set(result_hash, result, row["size_bytes"], ttl=math.inf)
+            return result
+
+        except Exception as e:
+            logger.error(f"Failed to load panel result {result_hash}: {e}")
+            raise
+
+    async def prune(self, grace: int = settings.PANEL_RESULT_PRUNE_GRACE) -> int:
+        """Delete results no panel references any more.
+
+        Results stored within the last ``grace`` seconds are kept: a question
+        stores its result before it creates the panels referencing it.
+        """
+        try:
+            result = await db.execute(
+                """
+                DELETE FROM panel_results r
+                WHERE r.created_at < NOW() - make_interval(secs => $1)
+                  AND NOT EXISTS (SELECT 1 FROM panels p WHERE p.result_hash = r.result_hash)
+                """,
+                grace,
+            )
+            return int(result.split()[-1])
+
+        except Exception as e:
+            logger.error(f"Failed to prune panel results: {e}")
+            raise
+
+    async def move_embedded_results(self, batch_size: int = 500) -> int:
+        """Move results still embedded in panel specs into the store; returns the number of panels moved.
+
+        Panels created before the store existed keep their results in
+        ``panels.spec``. They are hashed like any other result, so they are
+        shared with identical results stored since.
+        """
+        moved = 0
+        try:
+            while True:
+                panels = await db.fetch(
+                    """
+                    SELECT id, spec
+                    FROM panels
+                    WHERE result_hash IS NULL AND (spec ? 'data' OR spec ? 'query_result')
+                    ORDER BY id
+                    LIMIT $1
+                    """,
+                    batch_size,
+                )
+                if not panels:
+                    return moved
+
+                for panel in panels:
+                    slim, result_hash = await self.store_spec(panel["spec"])
+                    await db.execute(
+                        "UPDATE panels SET spec = $2, result_hash = $3 WHERE id = $1 AND result_hash IS NULL",
+                        panel["id"],
+                        slim,
+                        result_hash,
+                    )
+                moved += len(panels)
+                logger.info(f"Moved the embedded results of {moved} panels")
+
+        except Exception as e:
+            logger.error(f"Failed to move embedded panel results: {e}")
+            raise
+
+    async def _run_maintenance(self):
+        try:
+            await self.move_embedded_results()
+        except Exception:
+            # Logged by move_embedded_results; retried on the next start
+            pass
+        while True:
+            await asyncio.sleep(settings.PANEL_RESULT_PRUNE_INTERVAL)
+            try:
+                pruned = await self.prune()
+                logger.info(f"Pruned {pruned} unreferenced panel results")
+            except Exception:
+                # Logged by prune; retried next interval
+                pass
+
+    def start(self):
+        """Move embedded results, then prune unreferenced ones periodically, in the background."""
+        if self._maintenance_task is None or self._maintenance_task.done():
+            self._maintenance_task = asyncio.create_task(self._run_maintenance())
+
+    async def stop(self):
+        """Stop background maintenance."""
+        if self._maintenance_task:
+            self._maintenance_task.cancel()
+            try:
+                await self._maintenance_task
+            except asyncio.CancelledError:
+                pass
+            self._maintenance_task = None
+
+
+# Global panel result store
+panel_result_store = PanelResultStore()
@@ -0,0 +1,107 @@
+"""
+Query execution service combining the result cache and single-flight execution
+"""
+
+from uuid import UUID
+
+from kurobe.bi.connectors import DataConnector
+
+from app.core import cache, singleflight
+from app.core.config import settings
+from app.core.logging import logger
+
+
+def query_cache_ttls(refresh_interval: int | None = None) -> tuple[int, int]:
+    """Soft and hard cache TTLs for a query.
+
+    Panels on a dashboard with a ``refresh_interval`` go stale after that
+    interval and are refreshed in the background, but stay servable for at
+    least two intervals so a slow refresh never blocks a dashboard load.
+    """
+    if refresh_interval:
+        return refresh_interval, max(cache.QUERY_CACHE_TTL, refresh_interval * 2)
+    return cache.QUERY_CACHE_SOFT_TTL, cache.QUERY_CACHE_TTL
+
+
+class QueryExecutionService:
+    """Service for executing queries against data connections."""
+
+    async def execute(
+        self,
+        connector: DataConnector,
+        query: str,
+        parameters: dict | None = None,
+        timeout: int | None = None,
+        refresh_interval: int | None = None,
+        use_cache: bool = True,
+        user_id: UUID | None = None,
+    ) -> dict:
+        """Execute a query, serving it from the cache where possible.
+
+        ``refresh_interval`` is the owning dashboard's ``refresh_interval``;
+        ``user_id`` is the user the query is queued for on a busy connection.
+        """
+        timeout = min(timeout or settings.DEFAULT_QUERY_TIMEOUT, settings.MAX_QUERY_TIMEOUT)
+
+        async def load() -> dict:
+            return await self._run(connector, query, parameters, timeout, user_id)
+
+        if not use_cache:
+            return await load()
+
+        soft_ttl, hard_ttl = query_cache_ttls(refresh_interval)
+        return await cache.get_or_refresh_query_result(
+            query,
+            connector.config.name,
+            load,
+            parameters,
+            soft_ttl=soft_ttl,
+            hard_ttl=hard_ttl,
+        )
+
+    async def execute_many(
+        self,
+        queries: list[tuple[DataConnector, str, dict | None]],
+        timeout: int | None = None,
+        refresh_interval: int | None = None,
+        user_id: UUID | None = None,
+    ) -> list[dict | Exception]:
+        """Execute the ``(connector, query, parameters)`` queries of a dashboard's panels.
+
+        Cached results are looked up in one round-trip; misses run concurrently.
+        A query that fails yields its exception in place of its result, so one
+        failing panel does not fail the others.
+        """
+        timeout = min(timeout or settings.DEFAULT_QUERY_TIMEOUT, settings.MAX_QUERY_TIMEOUT)
+        soft_ttl, hard_ttl = query_cache_ttls(refresh_interval)
+
+        def loader(connector: DataConnector, query: str, parameters: dict | None):
+            return lambda: self._run(connector, query, parameters, timeout, user_id)
+
+        return await cache.get_or_refresh_query_results(
+            [
+                (query, connector.config.name, parameters, loader(connector, query, parameters))
+                for connector, query, parameters in queries
+            ],
+            soft_ttl=soft_ttl,
+            hard_ttl=hard_ttl,
+            return_exceptions=True,
+        )
+
+    async def _run(
+        self,
+        connector: DataConnector,
+        query: str,
+        parameters: dict | None,
+        timeout: int,
+        user_id: UUID | None,
+    ) -> dict:
+        """Run a query on the connector, sharing identical in-flight executions."""
+        try:
+            result = await singleflight.execute_query(
+                connector, query, parameters, timeout, user_id=str(user_id) if user_id else None
+            )
+            return result.model_dump(mode="json")
+        except Exception as e:
+            logger.error(f"Query failed on connection {connector.config.name}: {e}")
+            raise
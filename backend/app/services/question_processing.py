@@ -0,0 +1,208 @@
+"""
+Question processing pipeline: semantic analysis, SQL generation, execution and visualization
+"""
+
+from uuid import UUID, uuid4
+
+from kurobe.bi.connectors import DataConnector
+from kurobe.core.interfaces import engine_registry
+from kurobe.core.models import ChartType, PanelSpec, QueryResult
+
+from app.core.database import db
+from app.core.logging import logger
+from app.core.metrics import track_engine_call
+from app.services.connections import data_connections
+from app.services.panel_results import panel_result_store
+from app.services.query_execution import QueryExecutionService
+
+# Engines from the engine configuration used to process questions
+ENGINE_NAME = "default"
+
+
+class PipelineError(Exception):
+    """A question cannot be processed; retrying will not help."""
+
+
+class QuestionProcessingService:
+    """Runs the stages of answering a question.
+
+    Each stage reads what it needs from the database or from the previous
+    stage's return value, so stages can run on different workers. The plan
+    and generated SQL are saved in ``questions.plan``; the query result goes
+    to the panel result store and is passed on by its hash.
+    """
+
+    def __init__(self):
+        self._query_execution = QueryExecutionService()
+
+    async def start(self, question_id: UUID) -> bool:
+        """Mark a question as processing; False if it is gone or already finished."""
+        try:
+            query = """
+            UPDATE questions
+            SET status = 'processing', updated_at = NOW()
+            WHERE id = $1 AND status IN ('pending', 'processing')
+            RETURNING id
+            """
+
+            return await db.fetchval(query, question_id) is not None
+
+        except Exception as e:
+            logger.error(f"Failed to start processing question {question_id}: {e}")
+            raise
+
+    async def analyze(self, question_id: UUID):
+        """Analyze the question and plan its execution, if a semantic engine is configured."""
+        question = await self._get_question(question_id)
+
+        engine = engine_registry.get_engine("semantic", ENGINE_NAME)
+        if engine is None:
+            logger.info(f"No semantic engine configured, skipping analysis of question {question_id}")
+            return
+
+        provider = engine.config.provider
+        async with track_engine_call("semantic", provider, "analyze_question") as call:
+            analysis = await engine.analyze_question(question["text"], question["context"])
+            call.record_usage((analysis.get("metadata") or {}).get("usage"))
+
+        async with track_engine_call("semantic", provider, "generate_plan") as call:
+            plan = await engine.generate_plan(
+                question["text"], analysis, await self._available_connections(question["context"])
+            )
+            call.record_usage((plan.get("metadata") or {}).get("usage"))
+
+        await self._update_plan(question_id, {"analysis": analysis, "plan": plan})
+
+    async def generate_sql(self, question_id: UUID) -> tuple[str, str]:
+        """Generate the SQL answering the question; returns the SQL and its connection."""
+        question = await self._get_question(question_id)
+
+        engine = engine_registry.get_engine("text_to_sql", ENGINE_NAME)
+        if engine is None:
+            raise PipelineError("No text-to-SQL engine is configured")
+
+        context = question["context"] or {}
+        connection_ids = context.get("connection_ids") or []
+        plan = question["plan"] or {}
+
+        async with track_engine_call("text_to_sql", engine.config.provider, "generate_sql") as call:
+            generated = await engine.generate_sql(
+                question["text"],
+                context=context,
+                connection_id=connection_ids[0] if connection_ids else None,
+                schema_hints=plan.get("analysis"),
+            )
+            call.record_usage((generated.get("metadata") or {}).get("usage"))
+
+        sql = generated.get("sql")
+        connection_id = generated.get("connection_id") or (connection_ids[0] if connection_ids else None)
+        if not sql or not connection_id:
+            raise PipelineError("The text-to-SQL engine did not return a query and connection")
+
+        await self._update_plan(question_id, {"sql": sql, "connection_id": connection_id})
+        return sql, connection_id
+
+    async def execute(self, question_id: UUID, user_id: UUID, sql: str, connection_id: str) -> str:
+        """Run the generated SQL for the asking user; returns the hash of the stored result."""
+        connector = await self._get_connector(connection_id)
+        result = await self._query_execution.execute(connector, sql, user_id=user_id)
+        logger.info(f"Executed query of question {question_id}: {result.get('row_count')} rows")
+        return await panel_result_store.store({"data": None, "query_result": result})
+
+    async def visualize(self, question_id: UUID, user_id: UUID, result_hash: str) -> int:
+        """Create the question's panels and complete it; returns the number of panels."""
+        question = await self._get_question(question_id)
+        stored = await panel_result_store.load(result_hash)
+        if stored is None:
+            raise PipelineError(f"Query result {result_hash} is missing")
+        query_result = QueryResult(**stored["query_result"])
+
+        engine = engine_registry.get_engine("visualization", ENGINE_NAME)
+        if engine is None:
+            specs = [PanelSpec(id=str(uuid4()), type=ChartType.TABLE, title=question["text"][:255])]
+        else:
+            async with track_engine_call("visualization", engine.config.provider, "recommend_visualization"):
+                specs = await engine.recommend_visualization(query_result, question["text"], question["context"])
+
+        panels = []
+        for spec in specs:
+            spec_data = spec.model_dump(mode="json")
+            if spec_data.get("query_result") is None:
+                spec_data["query_result"] = stored["query_result"]
+            panels.append(await panel_result_store.store_spec(spec_data))
+
+        await self._complete(question_id, user_id, panels)
+        return len(panels)
+
+    async def fail(self, question_id: UUID, error: str):
+        """Mark a question as failed unless it finished already."""
+        try:
+            query = """
+            UPDATE questions
+            SET status = 'failed', error = $2, updated_at = NOW()
+            WHERE id = $1 AND status IN ('pending', 'processing')
+            """
+
+            await db.execute(query, question_id, error)
+            logger.warning(f"Question {question_id} failed: {error}")
+
+        except Exception as e:
+            logger.error(f"Failed to mark question {question_id} as failed: {e}")
+            raise
+
+    async def _get_question(self, question_id: UUID) -> dict:
+        row = await db.fetchrow("SELECT text, context, plan FROM questions WHERE id = $1", question_id)
+        if not row:
+            raise PipelineError(f"Question {question_id} not found")
+        return dict(row)
+
+    async def _update_plan(self, question_id: UUID, values: dict):
+        query = """
+        UPDATE questions
+        SET plan = COALESCE(plan, '{}'::jsonb) || $2::jsonb, updated_at = NOW()
+        WHERE id = $1
+        """
+
+        await db.execute(query, question_id, values)
+
+    async def _available_connections(self, context: dict | None) -> list[str]:
+        connection_ids = (context or {}).get("connection_ids")
+        if connection_ids:
+            return connection_ids
+        rows = await db.fetch("SELECT name FROM connections WHERE is_active ORDER BY name")
+        return [row["name"] for row in rows]
+
+    async def _get_connector(self, connection_id: str) -> DataConnector:
+        try:
+            return await data_connections.get_connector(connection_id)
+        except LookupError:
+            raise PipelineError(f"Connection {connection_id} not found") from None
+
+    async def _complete(self, question_id: UUID, user_id: UUID, panels: list[tuple[dict, str | None]]):
+        """Store the panels and complete the question in one transaction, once."""
+        async with db.acquire() as conn:
+            async with conn.transaction():
+                completed = await conn.fetchval(
+                    """
+                    UPDATE questions
+                    SET status = 'completed', error = NULL, completed_at = NOW(), updated_at = NOW()
+                    WHERE id = $1 AND status = 'processing'
+                    RETURNING id
+                    """,
+                    question_id,
+                )
+                if completed is None:
+                    logger.info(f"Question {question_id} is no longer processing, discarding its panels")
+                    return
+
+                await conn.executemany(
+                    """
+                    INSERT INTO panels (id, question_id, spec, result_hash, created_by, created_at, updated_at)
+                    VALUES ($1, $2, $3, $4, $5, NOW(), NOW())
+                    """,
+                    [(uuid4(), question_id, spec, result_hash, user_id) for spec, result_hash in panels],
+                )
+
+
+# Global question processing service
+question_processing = QuestionProcessingService()
@@ -7,13 +7,36 @@ from uuid import UUID, uuid4
 
 from app.core.database import db
 from app.core.logging import logger
+from app.core.pagination import keyset_condition, split_page
+from app.core.projection import select_columns
 from app.schemas import (
+    ChatHistoryResponse,
     ChatMessage,
     ChatRequest,
     ChatResponse,
+    PanelResultResponse,
+    QuestionListResponse,
     QuestionRequest,
     QuestionResponse,
+    QuestionSummary,
+    QuestionSummaryListResponse,
 )
+from app.services.panel_results import panel_result_store
+from app.services.question_processing import question_processing
+from app.workers.questions import enqueue_question
+
+# Columns behind the fields of a question; panels are loaded separately
+QUESTION_COLUMNS = {
+    "id": "id",
+    "text": "text",
+    "status": "status",
+    "plan": "plan",
+    "error": "error",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+    "completed_at": "completed_at",
+}
+QUESTION_FIELDS = (*QUESTION_COLUMNS, "panels")
 
 
 class QuestionService:
@@ -31,19 +54,24 @@ class QuestionService:
             RETURNING id, user_id, text, context, tags, status, created_at, updated_at, completed_at, error
             """
 
+            # The connections to answer from are kept with the context for the pipeline
+            context = request.context or {}
+            if request.connection_ids:
+                context = {**context, "connection_ids": request.connection_ids}
+
             result = await db.fetchrow(
                 query,
                 question_id,
                 user_id,
                 request.text,
-                request.context or {},
+                context,
                 request.tags or [],
             )
 
             logger.info(f"Created question {question_id} for user {user_id}")
 
-            # TODO: Trigger async processing of the question
-            # await self._process_question_async(question_id)
+            # Processing runs on the worker pool; the request only waits for the enqueue
+            await self._enqueue(question_id, user_id)
 
             return QuestionResponse(
                 id=result["id"],
@@ -75,13 +103,13 @@ class QuestionService:
                 return None
 
             # Get panels for this question
-            panels = await self.get_question_panels(question_id, user_id)
+            panels, _ = await self.get_question_panels(question_id, user_id)
 
             return QuestionResponse(
                 id=result["id"],
                 text=result["text"],
                 status=result["status"],
-                panels=panels,
+                panels=[panel["spec"] for panel in panels],
                 plan=result["plan"],
                 error=result["error"],
                 created_at=result["created_at"],
@@ -100,8 +128,15 @@ class QuestionService:
         offset: int = 0,
         status: str | None = None,
         tags: list[str] | None = None,
-    ) -> list[QuestionResponse]:
-        """List questions with filters."""
+        cursor: str | None = None,
+        fields: set[str] | None = None,
+    ) -> QuestionListResponse | QuestionSummaryListResponse:
+        """List questions with filters, newest first.
+
+        Pages continue after ``cursor``, the ``next_cursor`` of the previous
+        page; ``offset`` is kept for older clients. With ``fields`` only those
+        columns are read and the questions are returned as summaries.
+        """
         try:
             # Build query with filters
             conditions = ["user_id = $1"]
@@ -118,31 +153,51 @@ class QuestionService:
                 conditions.append(f"tags && ${param_count}")
                 params.append(tags)
 
+            if cursor:
+                condition, cursor_params = keyset_condition(cursor, param_count + 1)
+                param_count += len(cursor_params)
+                conditions.append(condition)
+                params.extend(cursor_params)
+
             where_clause = " AND ".join(conditions)
 
+            # The cursor needs id and created_at even when they are not selected
+            columns = select_columns(fields or set(QUESTION_FIELDS), QUESTION_COLUMNS, always=("id", "created_at"))
+
             query = f"""
-            SELECT id, user_id, text, context, plan, tags, status, error, created_at, updated_at, completed_at
+            SELECT {columns}
             FROM questions
             WHERE {where_clause}
-            ORDER BY created_at DESC
+            ORDER BY created_at DESC, id DESC
             LIMIT ${param_count + 1} OFFSET ${param_count + 2}
             """
 
-            params.extend([limit, offset])
-            results = await db.fetch(query, *params)
+            params.extend([limit + 1, offset])
+            results, next_cursor = split_page(await db.fetch(query, *params), limit)
+
+            # Get the panels of the whole page in one query
+            panels = {}
+            if fields is None or "panels" in fields:
+                panels = await self.get_panels_for_questions([result["id"] for result in results], user_id)
+
+            if fields is not None:
+                summaries = []
+                for result in results:
+                    values = {name: result[name] for name in fields if name in QUESTION_COLUMNS}
+                    if "panels" in fields:
+                        values["panels"] = [panel["spec"] for panel in panels.get(result["id"], [])]
+                    summaries.append(QuestionSummary(**values))
+                return QuestionSummaryListResponse(questions=summaries, next_cursor=next_cursor)
 
             # Convert to response objects
             questions = []
             for result in results:
-                # Get panels for each question (this could be optimized with a join)
-                panels = await self.get_question_panels(result["id"], user_id)
-
                 questions.append(
                     QuestionResponse(
                         id=result["id"],
                         text=result["text"],
                         status=result["status"],
-                        panels=panels,
+                        panels=[panel["spec"] for panel in panels.get(result["id"], [])],
                         plan=result["plan"],
                         error=result["error"],
                         created_at=result["created_at"],
@@ -151,7 +206,7 @@ class QuestionService:
                     )
                 )
 
-            return questions
+            return QuestionListResponse(questions=questions, next_cursor=next_cursor)
 
         except Exception as e:
             logger.error(f"Failed to list questions for user {user_id}: {e}")
@@ -250,24 +305,144 @@ class QuestionService:
             logger.error(f"Failed to chat with question {request.question_id}: {e}")
             raise
 
-    async def get_question_panels(self, question_id: UUID, user_id: UUID) -> list[dict]:
-        """Get all panels for a question."""
+    async def get_question_panels(
+        self,
+        question_id: UUID,
+        user_id: UUID,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> tuple[list[dict], str | None]:
+        """Get the panels of a question, oldest first, and the cursor of the next page.
+
+        Without a ``limit`` all panels after ``cursor`` are returned.
+        """
         try:
-            query = """
-            SELECT p.id, p.spec, p.is_pinned, p.position, p.created_at, p.updated_at
+            conditions = ["q.id = $1", "q.user_id = $2"]
+            params: list = [question_id, user_id]
+
+            if cursor:
+                condition, cursor_params = keyset_condition(cursor, len(params) + 1, descending=False, prefix="p.")
+                conditions.append(condition)
+                params.extend(cursor_params)
+
+            limit_clause = ""
+            if limit is not None:
+                params.append(limit + 1)
+                limit_clause = f"LIMIT ${len(params)}"
+
+            query = f"""
+            SELECT p.id, p.spec, p.is_pinned, p.position, p.result_hash, p.created_at, p.updated_at
             FROM panels p
             JOIN questions q ON p.question_id = q.id
-            WHERE q.id = $1 AND q.user_id = $2
-            ORDER BY p.created_at
+            WHERE {" AND ".join(conditions)}
+            ORDER BY p.created_at, p.id
+            {limit_clause}
             """
 
-            results = await db.fetch(query, question_id, user_id)
-            return [dict(result) for result in results]
+            results = await db.fetch(query, *params)
+            if limit is not None:
+                results, next_cursor = split_page(results, limit)
+            else:
+                next_cursor = None
+            return [dict(result) for result in results], next_cursor
 
         except Exception as e:
             logger.error(f"Failed to get panels for question {question_id}: {e}")
             raise
 
+    async def get_panel_result(self, question_id: UUID, panel_id: UUID, user_id: UUID) -> PanelResultResponse | None:
+        """Get the data and query result of a panel, for rendering it."""
+        try:
+            query = """
+            SELECT p.result_hash
+            FROM panels p
+            JOIN questions q ON p.question_id = q.id
+            WHERE p.id = $1 AND q.id = $2 AND q.user_id = $3
+            """
+
+            result_hash = await db.fetchval(query, panel_id, question_id, user_id)
+            if result_hash is None:
+                return None
+
+            result = await panel_result_store.load(result_hash)
+            if result is None:
+                return None
+
+            return PanelResultResponse(panel_id=panel_id, result_hash=result_hash, **result)
+
+        except Exception as e:
+            logger.error(f"Failed to get result of panel {panel_id}: {e}")
+            raise
+
+    async def get_chat_history(
+        self,
+        question_id: UUID,
+        user_id: UUID,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> ChatHistoryResponse:
+        """Get a page of a question's chat messages, oldest first."""
+        try:
+            conditions = ["q.id = $1", "q.user_id = $2"]
+            params: list = [question_id, user_id]
+
+            if cursor:
+                condition, cursor_params = keyset_condition(cursor, len(params) + 1, descending=False, prefix="m.")
+                conditions.append(condition)
+                params.extend(cursor_params)
+
+            params.append(limit + 1)
+            query = f"""
+            SELECT m.id, m.role, m.content, m.metadata, m.created_at
+            FROM chat_messages m
+            JOIN questions q ON m.question_id = q.id
+            WHERE {" AND ".join(conditions)}
+            ORDER BY m.created_at, m.id
+            LIMIT ${len(params)}
+            """
+
+            results, next_cursor = split_page(await db.fetch(query, *params), limit)
+            messages = [
+                ChatMessage(
+                    role=result["role"],
+                    content=result["content"],
+                    timestamp=result["created_at"],
+                    metadata=result["metadata"],
+                )
+                for result in results
+            ]
+            return ChatHistoryResponse(messages=messages, next_cursor=next_cursor)
+
+        except Exception as e:
+            logger.error(f"Failed to get chat history for question {question_id}: {e}")
+            raise
+
+    async def get_panels_for_questions(self, question_ids: list[UUID], user_id: UUID) -> dict[UUID, list[dict]]:
+        """Get the panels of several questions, keyed by question ID."""
+        if not question_ids:
+            return {}
+
+        try:
+            query = """
+            SELECT p.question_id, p.id, p.spec, p.is_pinned, p.position, p.result_hash, p.created_at, p.updated_at
+            FROM panels p
+            JOIN questions q ON p.question_id = q.id
+            WHERE q.id = ANY($1::uuid[]) AND q.user_id = $2
+            ORDER BY p.question_id, p.created_at, p.id
+            """
+
+            results = await db.fetch(query, question_ids, user_id)
+
+            panels: dict[UUID, list[dict]] = {}
+            for result in results:
+                panel = dict(result)
+                panels.setdefault(panel.pop("question_id"), []).append(panel)
+            return panels
+
+        except Exception as e:
+            logger.error(f"Failed to get panels for {len(question_ids)} questions: {e}")
+            raise
+
     async def retry_question(self, question_id: UUID, user_id: UUID) -> QuestionResponse | None:
         """Retry processing a failed question."""
         try:
@@ -283,8 +458,8 @@ class QuestionService:
             if not result:
                 return None
 
-            # TODO: Trigger async processing
-            # await self._process_question_async(question_id)
+            # Retries go to the background queue so they do not hold up new questions
+            await self._enqueue(question_id, user_id, background=True)
 
             return await self.get_question(question_id, user_id)
 
@@ -292,6 +467,15 @@ class QuestionService:
             logger.error(f"Failed to retry question {question_id}: {e}")
             raise
 
+    async def _enqueue(self, question_id: UUID, user_id: UUID, background: bool = False):
+        """Queue a question for processing, failing it if it cannot be queued."""
+        try:
+            await enqueue_question(question_id, user_id, background)
+        except Exception as e:
+            logger.error(f"Failed to queue question {question_id}: {e}")
+            await question_processing.fail(question_id, "Could not queue the question for processing")
+            raise
+
     async def _store_chat_message(
         self,
         question_id: UUID,
@@ -0,0 +1,7 @@
+"""
+Background workers for Kurobe
+
+Run the question-processing worker pool with::
+
+    dramatiq app.workers.questions
+"""
@@ -0,0 +1,46 @@
+"""
+Dramatiq broker shared by the API, which enqueues jobs, and the workers
+"""
+
+import dramatiq
+from dramatiq.asyncio import get_event_loop_thread
+from dramatiq.brokers.redis import RedisBroker
+from dramatiq.middleware import AsyncIO, Middleware
+
+from app.core.cache import close_cache, init_cache
+from app.core.config import settings
+from app.core.database import close_db, init_db
+from app.core.logging import logger, setup_logging, shutdown_logging
+from app.engines.registry import close_engines, init_engines
+from app.services.connections import data_connections
+
+
+class WorkerResources(Middleware):
+    """Opens the database, cache and engines when a worker process boots and closes them on shutdown."""
+
+    def after_worker_boot(self, broker, worker):
+        get_event_loop_thread().run_coroutine(self._open())
+
+    def before_worker_shutdown(self, broker, worker):
+        get_event_loop_thread().run_coroutine(self._close())
+
+    async def _open(self):
+        setup_logging()
+        await init_db()
+        await init_cache()
+        await init_engines()
+        logger.info("Kurobe worker started")
+
+    async def _close(self):
+        await close_engines()
+        await data_connections.close()
+        await close_cache()
+        await close_db()
+        logger.info("Kurobe worker shut down")
+        shutdown_logging()
+
+
+broker = RedisBroker(url=settings.DRAMATIQ_BROKER_URL)
+broker.add_middleware(AsyncIO())
+broker.add_middleware(WorkerResources())
+dramatiq.set_broker(broker)
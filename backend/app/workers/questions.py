@@ -0,0 +1,217 @@
+"""
+Question-processing actors
+
+A question moves through four actors, each its own message, so a failing
+stage is retried without repeating the ones before it::
+
+    analyze_question -> generate_question_sql -> execute_question_sql -> visualize_question
+
+New questions are queued on ``questions`` and retried ones on
+``questions_background``, so each can be served by its own worker pool
+(``dramatiq app.workers.questions --queues questions``). Later stages have
+a higher priority, which orders the messages a worker has prefetched; it
+does not move them ahead of messages still in Redis. A user has at most
+``QUESTION_MAX_CONCURRENT_PER_USER`` questions in progress; stages of
+further questions wait for a slot, up to ``QUESTION_SLOT_MAX_WAITS`` times.
+"""
+
+import asyncio
+import json
+from collections.abc import Awaitable, Callable
+from uuid import UUID, uuid4
+
+import dramatiq
+
+from app.core import cache
+from app.core.config import settings
+from app.core.logging import logger
+from app.services.question_processing import PipelineError, question_processing
+from app.workers.broker import broker
+
+QUESTIONS_QUEUE = "questions"
+BACKGROUND_QUEUE = "questions_background"
+
+# Seconds a completed stage is remembered, so redelivered messages are skipped
+STAGE_DONE_TTL = 24 * 3600
+
+# Idempotency key value of a stage whose next stage has been sent
+STAGE_SENT = "sent"
+
+STAGE_OPTIONS = {
+    "queue_name": QUESTIONS_QUEUE,
+    "max_retries": settings.QUESTION_MAX_RETRIES,
+    "min_backoff": settings.QUESTION_RETRY_MIN_BACKOFF,
+    "time_limit": settings.QUESTION_STAGE_TIME_LIMIT,
+    "on_retry_exhausted": "question_retries_exhausted",
+}
+
+broker.declare_queue(BACKGROUND_QUEUE)
+
+# The next actor and its extra arguments, or None when the question is done
+NextStage = tuple[dramatiq.Actor, tuple] | None
+
+
+async def enqueue_question(question_id: UUID, user_id: UUID, background: bool = False) -> str:
+    """Queue a question for processing and return the ID of this processing run."""
+    run_id = str(uuid4())
+    await _send(analyze_question, str(question_id), str(user_id), run_id, background)
+    return run_id
+
+
+async def _send(
+    actor: dramatiq.Actor,
+    question_id: str,
+    user_id: str,
+    run_id: str,
+    background: bool,
+    *args,
+    delay: int | None = None,
+):
+    message = actor.message(question_id, user_id, run_id, background, *args)
+    message = message.copy(queue_name=BACKGROUND_QUEUE if background else QUESTIONS_QUEUE)
+    # The Redis client is synchronous; keep it off the event loop
+    await asyncio.to_thread(broker.enqueue, message, delay=delay)
+
+
+def _slots_key(user_id: str) -> str:
+    return f"question_slots:{user_id}"
+
+
+async def _run_stage(
+    actor: dramatiq.Actor,
+    stage: Callable[[], Awaitable[NextStage]],
+    question_id: str,
+    user_id: str,
+    run_id: str,
+    background: bool,
+    *args,
+):
+    """Run a stage of a processing run once, holding one of the user's slots.
+
+    The run ID and actor name form the stage's idempotency key. When the
+    stage completes the key records the next stage, before that is sent, so
+    a redelivered message sends the next stage instead of running this one
+    again; once it is sent the message is skipped.
+    """
+    done_key = f"question_stage:{run_id}:{actor.actor_name}"
+    done = await cache.get(done_key)
+    if done == STAGE_SENT:
+        logger.info(f"Skipping {actor.actor_name} of question {question_id}, it already ran")
+        return
+
+    if done is None:
+        acquired = await cache.acquire_slot(
+            _slots_key(user_id), question_id, settings.QUESTION_MAX_CONCURRENT_PER_USER, settings.QUESTION_SLOT_LEASE
+        )
+        if not acquired:
+            await _wait_for_slot(actor, question_id, user_id, run_id, background, *args)
+            return
+
+        try:
+            next_stage = await stage()
+        except PipelineError as e:
+            await question_processing.fail(UUID(question_id), str(e))
+            next_stage = None
+
+        done = json.dumps(None if next_stage is None else [next_stage[0].actor_name, list(next_stage[1])])
+        if next_stage is not None:
+            # Renew the slot for the time the next stage spends in the queue
+            await cache.set_and_acquire_slot(
+                done_key,
+                done,
+                STAGE_DONE_TTL,
+                _slots_key(user_id),
+                question_id,
+                settings.QUESTION_MAX_CONCURRENT_PER_USER,
+                settings.QUESTION_SLOT_LEASE,
+            )
+        else:
+            await cache.set(done_key, done, ex=STAGE_DONE_TTL)
+    else:
+        logger.info(f"{actor.actor_name} of question {question_id} already ran, sending its next stage")
+
+    next_stage = json.loads(done)
+    if next_stage is not None:
+        next_actor_name, next_args = next_stage
+        await _send(broker.get_actor(next_actor_name), question_id, user_id, run_id, background, *next_args)
+    else:
+        await cache.release_slot(_slots_key(user_id), question_id)
+    await cache.set(done_key, STAGE_SENT, ex=STAGE_DONE_TTL)
+
+
+async def _wait_for_slot(
+    actor: dramatiq.Actor,
+    question_id: str,
+    user_id: str,
+    run_id: str,
+    background: bool,
+    *args,
+):
+    """Send a stage again after a delay, or fail the question once it waited too often."""
+    waits = await cache.incr(f"question_slot_waits:{run_id}", ex=STAGE_DONE_TTL)
+    if waits > settings.QUESTION_SLOT_MAX_WAITS:
+        await question_processing.fail(UUID(question_id), "No processing slot became free in time")
+        return
+    await _send(actor, question_id, user_id, run_id, background, *args, delay=settings.QUESTION_SLOT_WAIT_DELAY)
+
+
+@dramatiq.actor(priority=30, **STAGE_OPTIONS)
+async def analyze_question(question_id: str, user_id: str, run_id: str, background: bool):
+    """Start processing a question and analyze it."""
+
+    async def stage() -> NextStage:
+        if not await question_processing.start(UUID(question_id)):
+            logger.info(f"Question {question_id} was deleted or finished, not processing it")
+            return None
+        await question_processing.analyze(UUID(question_id))
+        return generate_question_sql, ()
+
+    await _run_stage(analyze_question, stage, question_id, user_id, run_id, background)
+
+
+@dramatiq.actor(priority=20, **STAGE_OPTIONS)
+async def generate_question_sql(question_id: str, user_id: str, run_id: str, background: bool):
+    """Generate the SQL answering a question."""
+
+    async def stage() -> NextStage:
+        sql, connection_id = await question_processing.generate_sql(UUID(question_id))
+        return execute_question_sql, (sql, connection_id)
+
+    await _run_stage(generate_question_sql, stage, question_id, user_id, run_id, background)
+
+
+@dramatiq.actor(priority=10, **STAGE_OPTIONS)
+async def execute_question_sql(
+    question_id: str, user_id: str, run_id: str, background: bool, sql: str, connection_id: str
+):
+    """Run a question's SQL against its connection."""
+
+    async def stage() -> NextStage:
+        result_hash = await question_processing.execute(UUID(question_id), UUID(user_id), sql, connection_id)
+        return visualize_question, (result_hash,)
+
+    await _run_stage(execute_question_sql, stage, question_id, user_id, run_id, background, sql, connection_id)
+
+
+@dramatiq.actor(priority=0, **STAGE_OPTIONS)
+async def visualize_question(question_id: str, user_id: str, run_id: str, background: bool, result_hash: str):
+    """Create a question's panels and complete it."""
+
+    async def stage() -> NextStage:
+        await question_processing.visualize(UUID(question_id), UUID(user_id), result_hash)
+        return None
+
+    await _run_stage(visualize_question, stage, question_id, user_id, run_id, background, result_hash)
+
+
+@dramatiq.actor(queue_name=QUESTIONS_QUEUE, max_retries=settings.QUESTION_MAX_RETRIES)
+async def question_retries_exhausted(message_data: dict, retry_info: dict):
+    """Fail a question whose stage kept failing."""
+    question_id, user_id = message_data["args"][:2]
+    traceback = message_data.get("options", {}).get("traceback") or ""
+    last_error = traceback.strip().splitlines()[-1] if traceback.strip() else "unknown error"
+
+    await question_processing.fail(
+        UUID(question_id), f"Processing failed after {retry_info['retries'] + 1} attempts: {last_error}"
+    )
+    await cache.release_slot(_slots_key(user_id), question_id)
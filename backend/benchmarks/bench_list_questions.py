@@ -0,0 +1,121 @@
+"""
+Benchmark of QuestionService.list_questions at 20 and 100 questions per page.
+
+Compares the batched panel fetch against the previous per-question panel
+queries. The schema is created from the migrations in a scratch Postgres
+schema, seeded with questions that have a few panels each, and dropped
+afterwards. Postgres round-trip latency dominates the difference, so the
+gap widens on a remote database.
+
+Usage (from the backend directory):
+
+    python benchmarks/bench_list_questions.py [--dsn DSN] [--iterations N]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import asyncpg
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings  # noqa: E402
+from app.core.database import db  # noqa: E402
+from app.services.questions import QuestionService  # noqa: E402
+
+MIGRATIONS = Path(__file__).resolve().parents[1] / "db" / "migration"
+SCHEMA = f"bench_list_questions_{os.getpid()}"
+QUESTIONS = 100
+PANELS_PER_QUESTION = 3
+
+
+def migrations() -> list[Path]:
+    """The ``V<n>__<description>.sql`` migrations, in version order."""
+    return sorted(MIGRATIONS.glob("V*__*.sql"), key=lambda path: int(path.name[1:].split("__")[0]))
+
+
+async def seed(conn: asyncpg.Connection) -> uuid.UUID:
+    user_id = uuid.uuid4()
+    await conn.execute(
+        "INSERT INTO users (id, email, username) VALUES ($1, $2, $3)", user_id, "bench@example.com", "bench"
+    )
+
+    question_ids = [uuid.uuid4() for _ in range(QUESTIONS)]
+    await conn.executemany(
+        "INSERT INTO questions (id, user_id, text, status) VALUES ($1, $2, $3, 'completed')",
+        [(question_id, user_id, f"Question {i}") for i, question_id in enumerate(question_ids)],
+    )
+
+    await conn.executemany(
+        "INSERT INTO panels (question_id, spec, created_by) VALUES ($1, $2::jsonb, $3)",
+        [
+            (question_id, json.dumps({"id": f"panel-{i}", "type": "bar", "title": f"Panel {i}"}), user_id)
+            for question_id in question_ids
+            for i in range(PANELS_PER_QUESTION)
+        ],
+    )
+    return user_id
+
+
+async def list_questions_per_row(service: QuestionService, user_id: uuid.UUID, limit: int) -> int:
+    """The previous listing: one panel query per question on the page."""
+    rows = await db.fetch(
+        "SELECT id FROM questions WHERE user_id = $1 ORDER BY created_at DESC LIMIT $2 OFFSET 0", user_id, limit
+    )
+    for row in rows:
+        await service.get_question_panels(row["id"], user_id)
+    return len(rows)
+
+
+async def timed(coro_factory, iterations: int) -> float:
+    for _ in range(5):
+        await coro_factory()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await coro_factory()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--dsn", default=str(settings.DATABASE_URL))
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    admin = await asyncpg.connect(args.dsn)
+    await admin.execute(f"CREATE SCHEMA {SCHEMA}")
+    try:
+        await admin.execute(f"SET search_path TO {SCHEMA}, public")
+        for migration in migrations():
+            await admin.execute(migration.read_text())
+        user_id = await seed(admin)
+
+        db._pool = await asyncpg.create_pool(
+            args.dsn,
+            min_size=1,
+            max_size=1,
+            server_settings={"search_path": f"{SCHEMA}, public", "jit": "off"},
+            init=db._init_connection,
+        )
+        db._initialized = True
+        service = QuestionService()
+
+        for limit in (20, 100):
+            batched = await timed(lambda: service.list_questions(user_id, limit=limit), args.iterations)
+            per_row = await timed(lambda: list_questions_per_row(service, user_id, limit), args.iterations)
+            print(f"{limit:>3} per page: batched {batched:7.2f} ms  per-question {per_row:7.2f} ms")
+
+        await db.disconnect()
+    finally:
+        await admin.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+        await admin.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,12 @@
+-- Kurobe BI Platform keyset pagination indexes
+-- Listings are ordered by (created_at, id) and continue after a cursor row
+-- Flyway migration V2
+
+-- Questions are listed per user, newest first
+CREATE INDEX idx_questions_user_created_at_id ON questions(user_id, created_at DESC, id DESC);
+
+-- Panels and chat messages are listed per question, oldest first
+CREATE INDEX idx_panels_question_created_at_id ON panels(question_id, created_at, id);
+CREATE INDEX idx_chat_messages_question_created_at_id ON chat_messages(question_id, created_at, id);
+
+-- End of migration
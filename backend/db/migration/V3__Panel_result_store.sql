@@ -0,0 +1,28 @@
+-- Kurobe BI Platform panel result store
+-- Panel data and query results move out of panels.spec into a content-addressed
+-- table, so reading a panel no longer reads its rows and identical results are
+-- stored once
+-- Flyway migration V3
+
+-- Result payloads keyed by the SHA-256 of their content
+CREATE TABLE IF NOT EXISTS panel_results (
+    result_hash CHAR(64) PRIMARY KEY,
+    payload BYTEA NOT NULL, -- {"data": [...], "query_result": {...}} in the binary cache encoding
+    size_bytes INTEGER NOT NULL, -- uncompressed size
+    row_count INTEGER,
+    created_at TIMESTAMPTZ DEFAULT NOW() -- reset whenever the result is stored again
+);
+
+-- Payloads are compressed by the application already
+ALTER TABLE panel_results ALTER COLUMN payload SET STORAGE EXTERNAL;
+
+ALTER TABLE panels ADD COLUMN IF NOT EXISTS result_hash CHAR(64) REFERENCES panel_results(result_hash);
+
+CREATE INDEX IF NOT EXISTS idx_panels_result_hash ON panels(result_hash);
+
+-- Results embedded in existing specs are moved by the application, which
+-- hashes them the same way as new results; this finds the ones left
+CREATE INDEX IF NOT EXISTS idx_panels_embedded_result ON panels(id)
+    WHERE result_hash IS NULL AND (spec ? 'data' OR spec ? 'query_result');
+
+-- End of migration
@@ -0,0 +1,70 @@
+"""
+Shared fixtures for the backend tests
+"""
+
+import asyncio
+
+import fakeredis
+import pytest
+from kurobe.bi.connectors import ConnectionConfig, DataConnector
+from kurobe.core.models import QueryResult
+
+from app.core import cache
+
+
+@pytest.fixture
+async def redis(monkeypatch):
+    """Point the cache module at an in-memory Redis and start from empty caches."""
+    server = fakeredis.FakeServer()
+    client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    binary_client = fakeredis.aioredis.FakeRedis(server=server)
+    monkeypatch.setattr(cache, "client", client)
+    monkeypatch.setattr(cache, "binary_client", binary_client)
+    monkeypatch.setattr(cache, "_initialized", True)
+    # Scripts are registered on the client that first runs them
+    monkeypatch.setattr(cache, "_token_bucket_script", None)
+    monkeypatch.setattr(cache, "_slot_script", None)
+    cache.local_cache.clear()
+
+    yield client
+
+    cache.local_cache.clear()
+    await client.aclose()
+    await binary_client.aclose()
+
+
+class FakeConnector(DataConnector):
+    """Connector whose queries return their own text, optionally blocking until released."""
+
+    def __init__(self, name: str = "warehouse", **config):
+        super().__init__(ConnectionConfig(name=name, type="duckdb", **config))
+        self.executions: list[str] = []
+        self.running = 0
+        self.max_running = 0
+        self.release = asyncio.Event()
+        self.release.set()
+        self.error: Exception | None = None
+
+    async def connect(self) -> None:
+        pass
+
+    async def disconnect(self) -> None:
+        pass
+
+    async def execute_query(self, query: str, parameters: dict | None = None, timeout: int | None = 30) -> QueryResult:
+        self.executions.append(query)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await self.release.wait()
+            if self.error is not None:
+                raise self.error
+            return QueryResult(columns=["query"], rows=[[query]], row_count=1, connection_id=self.config.name)
+        finally:
+            self.running -= 1
+
+    async def test_connection(self) -> bool:
+        return True
+
+    async def get_schema_info(self, schema: str | None = None) -> dict:
+        return {}
@@ -0,0 +1,76 @@
+"""
+Tests for admitting backend query executions to busy connections
+"""
+
+import asyncio
+
+import pytest
+from conftest import FakeConnector
+from kurobe.bi.connectors import AdmissionRejectedError
+from prometheus_client import REGISTRY
+
+from app.core import metrics, singleflight
+from app.services.query_execution import QueryExecutionService
+
+
+async def test_executions_wait_for_a_query_slot():
+    connector = FakeConnector(max_concurrent_queries=1)
+    connector.release.clear()
+
+    tasks = [
+        asyncio.create_task(singleflight.execute_query(connector, f"SELECT {i}", user_id="alice")) for i in range(3)
+    ]
+    await asyncio.sleep(0.01)
+    assert connector.running == 1
+    assert connector.admission_stats()["queue_depth_by_user"] == {"alice": 2}
+
+    connector.release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert [result.rows for result in results] == [[["SELECT 0"]], [["SELECT 1"]], [["SELECT 2"]]]
+    assert connector.max_running == 1
+
+
+async def test_queued_users_take_turns():
+    connector = FakeConnector(max_concurrent_queries=1)
+    connector.release.clear()
+    service = QueryExecutionService()
+
+    def run(query: str, user_id: str):
+        return asyncio.create_task(service.execute(connector, query, use_cache=False, user_id=user_id))
+
+    tasks = [run("first", "alice"), run("a1", "alice"), run("a2", "alice"), run("b1", "bob")]
+    await asyncio.sleep(0.01)
+    connector.release.set()
+    await asyncio.gather(*tasks)
+
+    assert connector.executions == ["first", "a1", "b1", "a2"]
+
+
+async def test_full_queue_rejects_the_query():
+    connector = FakeConnector(max_concurrent_queries=1, max_queued_queries=0)
+    connector.release.clear()
+    running = asyncio.create_task(singleflight.execute_query(connector, "SELECT 1"))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(AdmissionRejectedError):
+        await singleflight.execute_query(connector, "SELECT 2")
+
+    connector.release.set()
+    await running
+    assert connector.admission_stats()["rejected"] == 1
+
+
+async def test_admission_stats_are_exported(monkeypatch):
+    connector = FakeConnector(name="metrics_test", max_concurrent_queries=2)
+    monkeypatch.setattr(metrics, "_admission", [lambda: {"metrics_test": connector.admission_stats()}])
+    await singleflight.execute_query(connector, "SELECT 1")
+
+    def sample(name: str, **labels) -> float:
+        return REGISTRY.get_sample_value(name, {"connection_id": "metrics_test", **labels})
+
+    assert sample("kurobe_query_slots", state="max") == 2
+    assert sample("kurobe_query_slots", state="in_use") == 0
+    assert sample("kurobe_query_queue_depth") == 0
+    assert sample("kurobe_query_admissions_total", outcome="admitted") == 1
+    assert sample("kurobe_query_admissions_total", outcome="rejected") == 0
@@ -0,0 +1,159 @@
+"""
+Tests for API key validation caching and revocation
+"""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from app.core import cache
+from app.core.config import settings
+from app.services import api_keys
+from app.services.api_keys import APIKeyService, hash_api_key
+
+
+class FakeDB:
+    """``api_keys`` joined with ``users``, counting reads."""
+
+    def __init__(self):
+        self.keys: dict[str, dict] = {}
+        self.reads = 0
+
+    def add(self, api_key: str, expires_at: datetime | None = None) -> dict:
+        row = {
+            "id": uuid4(),
+            "user_id": uuid4(),
+            "email": "ada@example.com",
+            "username": "ada",
+            "full_name": "Ada",
+            "is_superuser": False,
+            "expires_at": expires_at,
+        }
+        self.keys[hash_api_key(api_key)] = row
+        return row
+
+    async def fetchrow(self, query: str, *args):
+        if query.lstrip().startswith("DELETE"):
+            key_id, user_id = args
+            for key_hash, row in list(self.keys.items()):
+                if row["id"] == key_id and row["user_id"] == user_id:
+                    del self.keys[key_hash]
+                    return {"key_hash": key_hash}
+            return None
+        self.reads += 1
+        return self.keys.get(args[0])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDB()
+    monkeypatch.setattr(api_keys, "db", db)
+    return db
+
+
+@pytest.fixture
+def service(redis, monkeypatch):
+    # Handlers registered by the services created here stay out of the global registry
+    monkeypatch.setattr(cache, "_invalidation_handlers", dict(cache._invalidation_handlers))
+    return APIKeyService()
+
+
+@pytest.fixture
+async def listener(service):
+    """Apply revocations published by any replica, as ``init_cache`` does."""
+    task = asyncio.create_task(cache._listen_for_invalidations())
+    await asyncio.sleep(0.05)
+    yield
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def test_validated_key_is_served_from_the_cache(service, db):
+    row = db.add("secret")
+
+    first = await service.validate("secret")
+    second = await service.validate("secret")
+
+    assert first == second
+    assert first["user_id"] == row["user_id"]
+    assert db.reads == 1
+
+
+async def test_other_replicas_use_the_key_cached_in_redis(service, db):
+    row = db.add("secret")
+    await service.validate("secret")
+
+    user = await APIKeyService().validate("secret")
+
+    assert user["api_key_id"] == row["id"]
+    assert user["user_id"] == row["user_id"]
+    assert db.reads == 1
+
+
+async def test_local_entry_expires_before_the_redis_entry(service, db, redis, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    db.add("secret")
+    await service.validate("secret")
+
+    clock.now += api_keys.LOCAL_CACHE_TTL
+    await redis.delete(f"api_key:{hash_api_key('secret')}")
+    await service.validate("secret")
+
+    assert db.reads == 2
+
+
+async def test_cached_key_is_read_again_after_its_ttl(service, db, monkeypatch):
+    monkeypatch.setattr(settings, "API_KEY_CACHE_TTL", 1)
+    db.add("secret")
+    await service.validate("secret")
+
+    await asyncio.sleep(1.1)
+    await service.validate("secret")
+
+    assert db.reads == 2
+
+
+async def test_unknown_and_expired_keys_are_rejected(service, db):
+    db.add("expired", expires_at=datetime.now(UTC) - timedelta(minutes=1))
+
+    assert await service.validate("unknown") is None
+    assert await service.validate("expired") is None
+    # Cached as validated, but still checked against its expiry
+    assert await service.validate("expired") is None
+    assert db.reads == 2
+
+
+async def test_deleted_key_is_rejected_at_once(service, db, redis):
+    row = db.add("secret")
+    await service.validate("secret")
+
+    assert await service.delete_api_key(row["id"], row["user_id"])
+
+    assert not await redis.exists(f"api_key:{hash_api_key('secret')}")
+    assert await service.validate("secret") is None
+
+
+async def test_revocation_on_another_replica_evicts_the_local_entry(service, db, redis, listener):
+    db.add("secret")
+    await service.validate("secret")
+
+    # Another replica deletes the key and revokes it
+    key_hash = hash_api_key("secret")
+    del db.keys[key_hash]
+    await redis.delete(f"api_key:{key_hash}")
+    await redis.publish(api_keys.REVOCATION_CHANNEL, key_hash)
+    await asyncio.sleep(0.05)
+
+    assert await service.validate("secret") is None
+    assert db.reads == 2
@@ -0,0 +1,229 @@
+"""
+Tests for the query result cache: local tier, stale-while-revalidate and invalidation
+"""
+
+import asyncio
+import math
+
+import pytest
+
+from app.core import cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+class Loader:
+    """Query loader returning a new result on every call."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        return {"rows": [[self.calls]]}
+
+
+# Local tier
+
+
+def test_local_cache_evicts_least_recently_used_entries(clock):
+    local = cache.LocalCache(max_bytes=30)
+    local.set("a", "A", 10, ttl=60)
+    local.set("b", "B", 10, ttl=60)
+    local.set("c", "C", 10, ttl=60)
+
+    assert local.get("a") == "A"
+    local.set("d", "D", 10, ttl=60)
+
+    assert local.get("b") is None
+    assert [local.get(key) for key in "acd"] == ["A", "C", "D"]
+    assert local.size_bytes == 30
+    assert len(local) == 3
+
+
+def test_local_cache_replacing_a_key_updates_its_size(clock):
+    local = cache.LocalCache(max_bytes=100)
+    local.set("a", "small", 10, ttl=60)
+    local.set("a", "large", 40, ttl=60)
+
+    assert local.get("a") == "large"
+    assert local.size_bytes == 40
+
+
+def test_local_cache_skips_values_over_budget(clock):
+    local = cache.LocalCache(max_bytes=10)
+    local.set("a", "A", 5, ttl=60)
+    local.set("huge", "H", 11, ttl=60)
+
+    assert local.get("huge") is None
+    assert local.get("a") == "A"
+
+
+def test_local_cache_entries_expire(clock):
+    local = cache.LocalCache(max_bytes=100)
+    local.set("a", "A", 10, ttl=5, expires_at=clock.now + 60)
+    local.set("forever", "F", 10, ttl=math.inf)
+    local.set("none", "N", 10, ttl=0)
+
+    assert local.get_entry("a") == ("A", clock.now + 60)
+    assert local.get("none") is None
+
+    clock.now += 5
+    assert local.get("a") is None
+    assert local.get("forever") == "F"
+    assert local.size_bytes == 10
+
+
+def test_encoded_values_round_trip():
+    value = {"columns": ["a"], "rows": [[i, "x" * 10] for i in range(200)]}
+
+    assert cache.decode_value(cache.encode_value(value)) == value
+    assert cache.decode_value(cache.encode_value({"small": 1})) == {"small": 1}
+    # Entries written before the binary encoding existed
+    assert cache.decode_value(b'{"legacy": true}') == {"legacy": True}
+
+
+# Stale-while-revalidate
+
+
+async def test_miss_is_loaded_inline_and_cached(redis):
+    load = Loader()
+
+    first = await cache.get_or_refresh_query_result("SELECT 1", "warehouse", load)
+    second = await cache.get_or_refresh_query_result("SELECT 1", "warehouse", load)
+
+    assert first == second == {"rows": [[1]]}
+    assert load.calls == 1
+    assert await redis.exists(cache.generate_query_cache_key("SELECT 1", "warehouse"))
+
+
+async def test_result_past_soft_ttl_is_served_stale_and_refreshed_once(redis):
+    load = Loader()
+    await cache.get_or_refresh_query_result("SELECT 1", "warehouse", load)
+
+    # With no soft TTL every cached result is stale
+    stale = await cache.get_or_refresh_query_result("SELECT 1", "warehouse", load, soft_ttl=0)
+    assert stale == {"rows": [[1]]}
+    await asyncio.gather(*cache._refresh_tasks.values())
+    assert load.calls == 2
+
+    # The refreshed result replaced the stale one, and the lease holds off another refresh
+    refreshed = await cache.get_or_refresh_query_result("SELECT 1", "warehouse", load, soft_ttl=0)
+    await asyncio.gather(*cache._refresh_tasks.values())
+    assert refreshed == {"rows": [[2]]}
+    assert load.calls == 2
+
+
+async def test_fresh_result_is_not_refreshed(redis):
+    load = Loader()
+    await cache.get_or_refresh_query_result("SELECT 1", "warehouse", load)
+
+    await cache.get_or_refresh_query_result("SELECT 1", "warehouse", load, soft_ttl=300, hard_ttl=3600)
+
+    assert not cache._refresh_tasks
+    assert load.calls == 1
+
+
+async def test_result_past_hard_ttl_is_loaded_inline(redis):
+    load = Loader()
+    await cache.get_or_refresh_query_result("SELECT 1", "warehouse", load, soft_ttl=1, hard_ttl=1)
+
+    await asyncio.sleep(1.1)
+    result = await cache.get_or_refresh_query_result("SELECT 1", "warehouse", load, soft_ttl=1, hard_ttl=1)
+
+    assert result == {"rows": [[2]]}
+    assert load.calls == 2
+
+
+async def test_failed_load_in_a_bulk_lookup_is_returned_in_place(redis):
+    async def fail() -> dict:
+        raise RuntimeError("warehouse down")
+
+    results = await cache.get_or_refresh_query_results(
+        [("SELECT 1", "warehouse", None, Loader()), ("SELECT 2", "warehouse", None, fail)],
+        return_exceptions=True,
+    )
+
+    assert results[0] == {"rows": [[1]]}
+    assert isinstance(results[1], RuntimeError)
+    assert await cache.get_cached_query_result("SELECT 2", "warehouse") is None
+
+
+
+# Bulk lookups
+
+
+async def test_bulk_lookup_loads_only_the_misses(redis):
+    cached, missing = Loader(), Loader()
+    await cache.get_or_refresh_query_result("SELECT 1", "warehouse", cached)
+
+    results = await cache.get_or_refresh_query_results(
+        [("SELECT 1", "warehouse", None, cached), ("SELECT 2", "warehouse", None, missing)]
+    )
+
+    assert results == [{"rows": [[1]]}, {"rows": [[1]]}]
+    assert (cached.calls, missing.calls) == (1, 1)
+
+
+async def test_bulk_lookup_and_write_each_take_one_round_trip(redis, monkeypatch):
+    loads = [Loader() for _ in range(30)]
+    queries = [(f"SELECT {i}", "warehouse", None, load) for i, load in enumerate(loads)]
+    round_trips = []
+    pipeline = cache.binary_client.pipeline
+
+    def counting_pipeline(*args, **kwargs):
+        pipe = pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def counted_execute(*args, **kwargs):
+            round_trips.append(len(pipe.command_stack))
+            return await execute(*args, **kwargs)
+
+        pipe.execute = counted_execute
+        return pipe
+
+    monkeypatch.setattr(cache.binary_client, "pipeline", counting_pipeline)
+
+    # All misses: one lookup, one write-back
+    await cache.get_or_refresh_query_results(queries)
+    assert len(round_trips) == 2
+    assert sum(load.calls for load in loads) == 30
+
+    # All cached in Redis: one lookup, nothing loaded
+    cache.local_cache.clear()
+    round_trips.clear()
+    results = await cache.get_or_refresh_query_results(queries)
+    assert round_trips == [60]
+    assert results == [{"rows": [[1]]}] * 30
+    assert sum(load.calls for load in loads) == 30
+
+
+
+# Invalidation
+
+
+async def test_invalidation_drops_results_that_read_a_table(redis):
+    load = Loader()
+    await cache.cache_query_result("SELECT * FROM orders", "warehouse", {"rows": []})
+    await cache.cache_query_result("SELECT * FROM users", "warehouse", {"rows": []})
+
+    assert await cache.invalidate_query_results("warehouse", ["orders"]) == 1
+    cache.local_cache.clear()
+
+    assert await cache.get_cached_query_result("SELECT * FROM orders", "warehouse") is None
+    assert await cache.get_cached_query_result("SELECT * FROM users", "warehouse") == {"rows": []}
+    await cache.get_or_refresh_query_result("SELECT * FROM orders", "warehouse", load)
+    assert load.calls == 1
@@ -0,0 +1,65 @@
+"""
+Tests for refreshing the panel results of a dashboard
+"""
+
+from uuid import uuid4
+
+import pytest
+from conftest import FakeConnector
+
+from app.services import dashboards
+from app.services.dashboards import DashboardService
+
+
+class FakeDB:
+    """Dashboard query stand-in returning fixed panels."""
+
+    def __init__(self, panels: list[dict]):
+        self.panels = panels
+
+    async def fetchval(self, query: str, *args):
+        return 0
+
+    async def fetch(self, query: str, *args):
+        return self.panels
+
+
+class FakeConnections:
+    def __init__(self, connectors: dict[str, FakeConnector]):
+        self.connectors = connectors
+
+    async def get_connector(self, connection_id: str) -> FakeConnector:
+        return self.connectors[connection_id]
+
+
+class FakeStore:
+    async def load(self, result_hash: str) -> dict:
+        return {"data": None, "query_result": {"columns": ["stored"], "rows": [[result_hash]], "row_count": 1}}
+
+
+def panel(sql: str, connection_id: str) -> dict:
+    return {"id": uuid4(), "result_hash": f"stored-{sql}", "sql": sql, "connection_id": connection_id}
+
+
+@pytest.fixture
+def connectors(monkeypatch):
+    connectors = {"warehouse": FakeConnector("warehouse"), "broken": FakeConnector("broken")}
+    connectors["broken"].error = RuntimeError("warehouse down")
+    monkeypatch.setattr(dashboards, "data_connections", FakeConnections(connectors))
+    monkeypatch.setattr(dashboards, "panel_result_store", FakeStore())
+    return connectors
+
+
+async def test_failing_panel_falls_back_to_its_stored_result(redis, monkeypatch, connectors):
+    panels = [panel("SELECT 1", "warehouse"), panel("SELECT 2", "broken"), panel("SELECT 3", "warehouse")]
+    monkeypatch.setattr(dashboards, "db", FakeDB(panels))
+
+    results = await DashboardService().get_panel_results(uuid4(), uuid4())
+
+    assert [result.panel_id for result in results] == [p["id"] for p in panels]
+    assert [result.query_result.rows for result in results] == [
+        [["SELECT 1"]],
+        [["stored-SELECT 2"]],
+        [["SELECT 3"]],
+    ]
+    assert results[1].result_hash == "stored-SELECT 2"
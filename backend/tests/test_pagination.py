@@ -0,0 +1,57 @@
+"""
+Tests for keyset pagination cursors
+"""
+
+from datetime import UTC, datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from app.core.pagination import decode_cursor, encode_cursor, keyset_condition, split_page
+
+
+def make_rows(count: int) -> list[dict]:
+    start = datetime(2026, 1, 1, tzinfo=UTC)
+    return [{"id": uuid4(), "created_at": start - timedelta(minutes=i)} for i in range(count)]
+
+
+def test_cursor_round_trip():
+    created_at, row_id = datetime(2026, 1, 1, 12, 30, tzinfo=UTC), uuid4()
+
+    assert decode_cursor(encode_cursor(created_at, row_id)) == (created_at, row_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "bm8tc2VwYXJhdG9y"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+def test_keyset_condition_continues_after_the_cursor():
+    created_at, row_id = datetime(2026, 1, 1, tzinfo=UTC), uuid4()
+    cursor = encode_cursor(created_at, row_id)
+
+    condition, params = keyset_condition(cursor, 3)
+    assert condition == "(created_at, id) < ($3, $4)"
+    assert params == [created_at, row_id]
+
+    condition, _ = keyset_condition(cursor, 2, descending=False, prefix="p.")
+    assert condition == "(p.created_at, p.id) > ($2, $3)"
+
+
+def test_split_page_without_more_rows():
+    rows = make_rows(3)
+
+    assert split_page(rows, 3) == (rows, None)
+    assert split_page([], 3) == ([], None)
+
+
+def test_split_page_trims_the_lookahead_row():
+    rows = make_rows(4)
+
+    page, next_cursor = split_page(rows, 3)
+
+    assert page == rows[:3]
+    assert decode_cursor(next_cursor) == (rows[2]["created_at"], rows[2]["id"])
+    _, params = keyset_condition(next_cursor, 1)
+    assert params == [rows[2]["created_at"], rows[2]["id"]]
@@ -0,0 +1,99 @@
+"""
+Tests for splitting panel specs and the content-addressed panel result store
+"""
+
+import pytest
+
+from app.services import panel_results
+from app.services.panel_results import PanelResultStore, hash_result, split_spec
+
+
+class FakeDB:
+    """In-memory stand-in for the ``panel_results`` table."""
+
+    def __init__(self):
+        self.rows: dict[str, dict] = {}
+        self.reads = 0
+
+    async def execute(self, query: str, result_hash: str, payload: bytes, size_bytes: int, row_count: int | None):
+        self.rows[result_hash] = {"payload": payload, "size_bytes": size_bytes, "row_count": row_count}
+        return "INSERT 0 1"
+
+    async def fetchrow(self, query: str, result_hash: str):
+        self.reads += 1
+        return self.rows.get(result_hash)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDB()
+    monkeypatch.setattr(panel_results, "db", db)
+    return db
+
+
+RESULT = {
+    "data": [{"region": "EU", "total": 10}],
+    "query_result": {"columns": ["region", "total"], "rows": [["EU", 10]], "row_count": 1},
+}
+
+
+def test_split_spec_moves_result_fields_out():
+    spec = {"type": "bar", "title": "Sales", **RESULT}
+
+    slim, result = split_spec(spec)
+
+    assert slim == {"type": "bar", "title": "Sales"}
+    assert result == RESULT
+
+
+def test_split_spec_without_result_data():
+    spec = {"type": "text", "data": None}
+
+    assert split_spec(spec) == ({"type": "text"}, None)
+
+
+def test_split_spec_keeps_a_partial_result():
+    slim, result = split_spec({"type": "table", "data": [1, 2]})
+
+    assert slim == {"type": "table"}
+    assert result == {"data": [1, 2], "query_result": None}
+
+
+def test_result_hash_ignores_key_order():
+    reordered = {"query_result": dict(reversed(RESULT["query_result"].items())), "data": RESULT["data"]}
+
+    assert hash_result(reordered) == hash_result(RESULT)
+    assert hash_result({**RESULT, "data": []}) != hash_result(RESULT)
+
+
+async def test_identical_results_are_stored_once(db):
+    store = PanelResultStore()
+
+    first = await store.store(RESULT)
+    second = await store.store(dict(reversed(RESULT.items())))
+
+    assert first == second == hash_result(RESULT)
+    assert list(db.rows) == [first]
+    assert db.rows[first]["row_count"] == 1
+
+
+async def test_store_spec_returns_the_slim_spec_and_hash(db):
+    store = PanelResultStore()
+
+    slim, result_hash = await store.store_spec({"type": "bar", **RESULT})
+    assert slim == {"type": "bar"}
+    assert result_hash == hash_result(RESULT)
+
+    assert await store.store_spec({"type": "text"}) == ({"type": "text"}, None)
+    assert len(db.rows) == 1
+
+
+async def test_loaded_results_are_kept_in_process(db):
+    result_hash = await PanelResultStore().store(RESULT)
+    store = PanelResultStore()
+
+    assert await store.load(result_hash) == RESULT
+    assert await store.load(result_hash) == RESULT
+    assert db.reads == 1
+
+    assert await store.load("0" * 64) is None
@@ -0,0 +1,30 @@
+"""
+Tests for selecting the fields of list responses
+"""
+
+import pytest
+
+from app.core.projection import parse_fields, select_columns
+
+
+def test_parse_fields_selects_known_fields():
+    assert parse_fields(None, {"id", "text"}) is None
+    assert parse_fields(" id , text,", {"id", "text", "status"}) == {"id", "text"}
+
+
+@pytest.mark.parametrize(
+    "fields, message",
+    [("id,secret,other", "Unknown fields: other, secret"), (" , ", "No fields selected")],
+)
+def test_parse_fields_rejects_bad_selections(fields, message):
+    with pytest.raises(ValueError, match=message):
+        parse_fields(fields, {"id", "text"})
+
+
+def test_select_columns_keeps_column_order_and_always_fields():
+    columns = {"id": "q.id", "text": "q.text", "plan": "q.plan", "created_at": "q.created_at"}
+
+    assert select_columns({"plan", "text"}, columns) == "q.text, q.plan"
+    assert select_columns({"text"}, columns, always=("id", "created_at")) == "q.id, q.text, q.created_at"
+    # Fields loaded separately have no column
+    assert select_columns({"text", "panels"}, columns) == "q.text"
@@ -0,0 +1,209 @@
+"""
+Tests for the question-processing actors: stage chaining, idempotency and user slots
+"""
+
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.core.config import settings
+from app.services.question_processing import PipelineError
+from app.workers import questions
+
+
+class FakeProcessing:
+    """Records pipeline calls in place of the question processing service."""
+
+    def __init__(self):
+        self.calls: list[str] = []
+        self.failures: dict[UUID, str] = {}
+        self.fail_at: str | None = None
+
+    def _call(self, name: str):
+        self.calls.append(name)
+        if name == self.fail_at:
+            raise PipelineError(f"{name} failed")
+
+    async def start(self, question_id: UUID) -> bool:
+        self._call("start")
+        return True
+
+    async def analyze(self, question_id: UUID):
+        self._call("analyze")
+
+    async def generate_sql(self, question_id: UUID) -> tuple[str, str]:
+        self._call("generate_sql")
+        return "SELECT 1", "warehouse"
+
+    async def execute(self, question_id: UUID, user_id: UUID, sql: str, connection_id: str) -> str:
+        self._call("execute")
+        return f"hash-of-{sql}-on-{connection_id}"
+
+    async def visualize(self, question_id: UUID, user_id: UUID, result_hash: str):
+        self._call(f"visualize:{result_hash}")
+
+    async def fail(self, question_id: UUID, error: str):
+        self.failures[question_id] = error
+
+
+class Sent:
+    """Messages sent through ``_send``, delivered on demand."""
+
+    def __init__(self):
+        self.messages: list[tuple] = []
+        self.fail_next = False
+
+    async def __call__(self, actor, question_id, user_id, run_id, background, *args, delay=None):
+        if self.fail_next:
+            self.fail_next = False
+            raise ConnectionError("broker unavailable")
+        self.messages.append((actor, (question_id, user_id, run_id, background, *args), delay))
+
+    async def deliver(self, message: tuple):
+        actor, args, _ = message
+        # Actors wrap their coroutine for dramatiq's worker threads
+        await actor.fn.__wrapped__(*args)
+
+    async def run_all(self) -> list[str]:
+        """Deliver messages until none are left; returns the actor names in order."""
+        delivered = []
+        while self.messages:
+            message = self.messages.pop(0)
+            delivered.append(message[0].actor_name)
+            await self.deliver(message)
+        return delivered
+
+
+@pytest.fixture
+def processing(monkeypatch):
+    processing = FakeProcessing()
+    monkeypatch.setattr(questions, "question_processing", processing)
+    return processing
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    sent = Sent()
+    monkeypatch.setattr(questions, "_send", sent)
+    return sent
+
+
+@pytest.fixture
+def ids():
+    return str(uuid4()), str(uuid4())
+
+
+async def test_stages_run_in_order_and_release_the_slot(redis, processing, sent, ids):
+    question_id, user_id = ids
+
+    await questions.enqueue_question(UUID(question_id), UUID(user_id))
+    delivered = await sent.run_all()
+
+    assert delivered == ["analyze_question", "generate_question_sql", "execute_question_sql", "visualize_question"]
+    assert processing.calls == [
+        "start",
+        "analyze",
+        "generate_sql",
+        "execute",
+        "visualize:hash-of-SELECT 1-on-warehouse",
+    ]
+    assert processing.failures == {}
+    assert await redis.zcard(questions._slots_key(user_id)) == 0
+
+
+async def test_background_runs_keep_their_flag(redis, processing, sent, ids):
+    await questions.enqueue_question(UUID(ids[0]), UUID(ids[1]), background=True)
+    message = sent.messages[0]
+    await sent.deliver(message)
+
+    assert sent.messages[0][1][3] is True
+
+
+async def test_redelivered_stage_is_skipped(redis, processing, sent, ids):
+    await questions.enqueue_question(UUID(ids[0]), UUID(ids[1]))
+    message = sent.messages.pop(0)
+
+    await sent.deliver(message)
+    await sent.deliver(message)
+
+    assert processing.calls == ["start", "analyze"]
+    assert [m[0].actor_name for m in sent.messages] == ["generate_question_sql"]
+
+
+async def test_redelivery_sends_the_next_stage_without_running_again(redis, processing, sent, ids):
+    await questions.enqueue_question(UUID(ids[0]), UUID(ids[1]))
+    message = sent.messages.pop(0)
+
+    # The stage completes, but sending its next stage fails
+    sent.fail_next = True
+    with pytest.raises(ConnectionError):
+        await sent.deliver(message)
+    assert sent.messages == []
+
+    await sent.deliver(message)
+
+    assert processing.calls == ["start", "analyze"]
+    assert [m[0].actor_name for m in sent.messages] == ["generate_question_sql"]
+    assert await sent.run_all() == ["generate_question_sql", "execute_question_sql", "visualize_question"]
+
+
+async def test_pipeline_error_fails_the_question_and_frees_the_slot(redis, processing, sent, ids):
+    question_id, user_id = ids
+    processing.fail_at = "generate_sql"
+
+    await questions.enqueue_question(UUID(question_id), UUID(user_id))
+    delivered = await sent.run_all()
+
+    assert delivered == ["analyze_question", "generate_question_sql"]
+    assert processing.failures == {UUID(question_id): "generate_sql failed"}
+    assert await redis.zcard(questions._slots_key(user_id)) == 0
+
+
+async def test_stage_waits_for_a_free_slot(redis, monkeypatch, processing, sent, ids):
+    question_id, user_id = ids
+    monkeypatch.setattr(settings, "QUESTION_MAX_CONCURRENT_PER_USER", 1)
+    await questions.cache.acquire_slot(questions._slots_key(user_id), "other-question", 1, 60)
+
+    await questions.enqueue_question(UUID(question_id), UUID(user_id))
+    await sent.deliver(sent.messages.pop(0))
+
+    # Not run, but sent again after a delay
+    assert processing.calls == []
+    [(actor, args, delay)] = sent.messages
+    assert actor is questions.analyze_question
+    assert args[0] == question_id
+    assert delay == settings.QUESTION_SLOT_WAIT_DELAY
+
+    await questions.cache.release_slot(questions._slots_key(user_id), "other-question")
+    await sent.run_all()
+    assert processing.calls[-1].startswith("visualize")
+
+
+async def test_question_fails_after_waiting_too_often(redis, monkeypatch, processing, sent, ids):
+    question_id, user_id = ids
+    monkeypatch.setattr(settings, "QUESTION_MAX_CONCURRENT_PER_USER", 1)
+    monkeypatch.setattr(settings, "QUESTION_SLOT_MAX_WAITS", 2)
+    await questions.cache.acquire_slot(questions._slots_key(user_id), "other-question", 1, 60)
+
+    await questions.enqueue_question(UUID(question_id), UUID(user_id))
+    delivered = await sent.run_all()
+
+    assert delivered == ["analyze_question"] * 3
+    assert processing.calls == []
+    assert processing.failures == {UUID(question_id): "No processing slot became free in time"}
+
+
+async def test_retries_exhausted_fails_the_question_and_frees_the_slot(redis, processing, ids):
+    question_id, user_id = ids
+    await questions.cache.acquire_slot(questions._slots_key(user_id), question_id, 3, 60)
+    message_data = {
+        "args": [question_id, user_id, "run", False],
+        "options": {"traceback": "Traceback (most recent call last):\n  ...\nTimeoutError: warehouse timed out\n"},
+    }
+
+    await questions.question_retries_exhausted.fn.__wrapped__(message_data, {"retries": 3})
+
+    assert processing.failures == {
+        UUID(question_id): "Processing failed after 4 attempts: TimeoutError: warehouse timed out"
+    }
+    assert await redis.zcard(questions._slots_key(user_id)) == 0
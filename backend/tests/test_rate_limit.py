@@ -0,0 +1,116 @@
+"""
+Tests for the token bucket rate limiter in Redis and its local fallback
+"""
+
+import asyncio
+from collections import OrderedDict
+
+import pytest
+
+from app.core import cache
+
+
+async def test_burst_is_limited_to_the_bucket_capacity(redis):
+    outcomes = [await cache.rate_limit("bucket", limit=3, window=60) for _ in range(4)]
+
+    assert [allowed for allowed, _, _ in outcomes] == [True, True, True, False]
+    assert [remaining for _, remaining, _ in outcomes] == [2, 1, 0, 0]
+    assert [retry_after for _, _, retry_after in outcomes[:3]] == [0, 0, 0]
+
+
+async def test_retry_after_is_the_time_until_enough_tokens_refill(redis):
+    # 2 tokens per 10 seconds: a token every 5 seconds
+    await cache.rate_limit("bucket", limit=2, window=10, cost=2)
+
+    allowed, _, retry_after = await cache.rate_limit("bucket", limit=2, window=10)
+    assert not allowed
+    assert retry_after == pytest.approx(5, abs=0.1)
+
+    allowed, _, retry_after = await cache.rate_limit("bucket", limit=2, window=10, cost=2)
+    assert not allowed
+    assert retry_after == pytest.approx(10, abs=0.1)
+
+
+async def test_tokens_refill_over_time(redis):
+    # 10 tokens per second
+    await cache.rate_limit("bucket", limit=10, window=1, cost=10)
+    assert not (await cache.rate_limit("bucket", limit=10, window=1))[0]
+
+    await asyncio.sleep(0.25)
+
+    allowed, remaining, _ = await cache.rate_limit("bucket", limit=10, window=1, cost=2)
+    assert allowed
+    assert remaining == 0
+
+
+async def test_buckets_are_kept_per_key_and_expire_once_full(redis):
+    await cache.rate_limit("alice", limit=1, window=60)
+
+    assert not (await cache.rate_limit("alice", limit=1, window=60))[0]
+    assert (await cache.rate_limit("bob", limit=1, window=60))[0]
+    # A bucket left alone for a window is full again, so it need not be kept
+    assert 0 < await redis.pttl("alice") <= 60_000
+
+
+async def test_check_rate_limit(redis):
+    assert await cache.check_rate_limit("bucket", limit=1, window=60)
+    assert not await cache.check_rate_limit("bucket", limit=1, window=60)
+
+
+# Local fallback
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class UnreachableRedis:
+    """Stand-in for ``get_client`` that always fails, counting connection attempts."""
+
+    def __init__(self):
+        self.attempts = 0
+
+    async def __call__(self):
+        self.attempts += 1
+        raise ConnectionError("Redis is down")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def unreachable_redis(monkeypatch, clock):
+    """Make Redis unreachable, starting from empty local buckets."""
+    get_client = UnreachableRedis()
+    monkeypatch.setattr(cache, "get_client", get_client)
+    monkeypatch.setattr(cache, "_rate_limit_redis_retry_at", 0.0)
+    monkeypatch.setattr(cache, "_local_buckets", OrderedDict())
+    return get_client
+
+
+async def test_local_buckets_limit_bursts_and_refill(unreachable_redis, clock):
+    outcomes = [await cache.rate_limit("bucket", limit=2, window=10) for _ in range(3)]
+
+    assert [allowed for allowed, _, _ in outcomes] == [True, True, False]
+    assert outcomes[2][2] == pytest.approx(5)
+
+    clock.now += 5
+    assert await cache.rate_limit("bucket", limit=2, window=10) == (True, 0, 0.0)
+
+
+async def test_redis_is_retried_after_a_backoff(unreachable_redis, clock):
+    await cache.rate_limit("bucket", limit=2, window=10)
+    await cache.rate_limit("bucket", limit=2, window=10)
+    assert unreachable_redis.attempts == 1
+
+    clock.now += cache.RATE_LIMIT_REDIS_BACKOFF
+    await cache.rate_limit("bucket", limit=2, window=10)
+    assert unreachable_redis.attempts == 2
@@ -0,0 +1,159 @@
+"""
+Tests for single-flight execution within a process and across replicas
+"""
+
+import asyncio
+import json
+
+import pytest
+from conftest import FakeConnector
+
+from app.core import singleflight
+
+
+class Counter:
+    """Shared function counting its calls, blocking until released."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        await self.release.wait()
+        return {"call": self.calls}
+
+
+async def test_concurrent_callers_share_one_execution():
+    connector = FakeConnector()
+    connector.release.clear()
+
+    tasks = [asyncio.create_task(singleflight.execute_query(connector, "SELECT 1")) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    connector.release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert connector.executions == ["SELECT 1"]
+    assert all(result is results[0] for result in results)
+    assert not singleflight._calls
+
+
+async def test_different_queries_run_separately():
+    connector = FakeConnector()
+
+    await asyncio.gather(
+        singleflight.execute_query(connector, "SELECT 1"),
+        singleflight.execute_query(connector, "SELECT 1", {"region": "EU"}),
+        singleflight.execute_query(FakeConnector(name="other"), "SELECT 1"),
+    )
+
+    assert connector.executions == ["SELECT 1", "SELECT 1"]
+
+
+async def test_failure_reaches_every_caller_and_is_not_shared_afterwards():
+    connector = FakeConnector()
+    connector.release.clear()
+    connector.error = RuntimeError("warehouse down")
+
+    tasks = [asyncio.create_task(singleflight.execute_query(connector, "SELECT 1")) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    connector.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert [str(result) for result in results] == ["warehouse down"] * 3
+    connector.error = None
+    await singleflight.execute_query(connector, "SELECT 1")
+    assert len(connector.executions) == 2
+
+
+async def test_a_caller_giving_up_does_not_cancel_the_others():
+    fn = Counter()
+    first = asyncio.create_task(singleflight.do("key", fn))
+    second = asyncio.create_task(singleflight.do("key", fn))
+    await asyncio.sleep(0.01)
+
+    first.cancel()
+    await asyncio.sleep(0.01)
+    fn.release.set()
+
+    assert await second == {"call": 1}
+    assert first.cancelled()
+
+
+async def test_execution_is_cancelled_once_every_caller_gave_up():
+    fn = Counter()
+    caller = asyncio.create_task(singleflight.do("key", fn))
+    await asyncio.sleep(0.01)
+    task = singleflight._calls["key"].task
+
+    caller.cancel()
+    await asyncio.sleep(0.01)
+
+    assert task.cancelled()
+    assert "key" not in singleflight._calls
+
+
+# Across replicas
+
+
+async def test_cluster_leader_publishes_its_result_and_releases_the_lock(redis):
+    fn = Counter()
+    fn.release.set()
+
+    assert await singleflight.do("key", fn, cluster=True) == {"call": 1}
+
+    assert json.loads(await redis.get("singleflight:result:key")) == {"call": 1}
+    assert not await redis.exists("singleflight:lock:key")
+
+
+async def test_follower_uses_the_result_published_by_the_lock_holder(redis):
+    fn = Counter()
+    await redis.set("singleflight:lock:key", "other-replica")
+
+    follower = asyncio.create_task(singleflight.do("key", fn, cluster=True))
+    await asyncio.sleep(0.05)
+    await redis.set("singleflight:result:key", json.dumps({"call": "leader"}))
+    await redis.publish("singleflight:done:key", "done")
+
+    assert await follower == {"call": "leader"}
+    assert fn.calls == 0
+
+
+async def test_follower_raises_the_lock_holders_error(redis):
+    await redis.set("singleflight:lock:key", "other-replica")
+
+    follower = asyncio.create_task(singleflight.do("key", Counter(), cluster=True))
+    await asyncio.sleep(0.05)
+    await redis.publish("singleflight:done:key", json.dumps({"error": "warehouse down"}))
+
+    with pytest.raises(RuntimeError, match="warehouse down"):
+        await follower
+
+
+async def test_follower_runs_the_query_itself_when_the_lock_holder_times_out(redis):
+    fn = Counter()
+    fn.release.set()
+    await redis.set("singleflight:lock:key", "crashed-replica")
+
+    assert await singleflight.do("key", fn, cluster=True, lock_ttl=0.1) == {"call": 1}
+    # The lock was not the follower's to release
+    assert await redis.get("singleflight:lock:key") == "crashed-replica"
+
+
+async def test_failing_leader_notifies_followers_and_releases_the_lock(redis):
+    async def fail():
+        raise RuntimeError("warehouse down")
+
+    pubsub = redis.pubsub()
+    await pubsub.subscribe("singleflight:done:key")
+
+    with pytest.raises(RuntimeError):
+        await singleflight.do("key", fail, cluster=True)
+
+    message = None
+    async with asyncio.timeout(1):
+        while message is None:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.1)
+    await pubsub.aclose()
+    assert json.loads(message["data"]) == {"error": "warehouse down"}
+    assert not await redis.exists("singleflight:lock:key")
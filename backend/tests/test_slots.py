@@ -0,0 +1,58 @@
+"""
+Tests for Redis concurrency slots and counters
+"""
+
+import asyncio
+
+from app.core import cache
+
+
+async def test_slots_are_limited_per_key(redis):
+    assert await cache.acquire_slot("slots", "q1", limit=2, lease=60)
+    assert await cache.acquire_slot("slots", "q2", limit=2, lease=60)
+    assert not await cache.acquire_slot("slots", "q3", limit=2, lease=60)
+
+    # A holder renews its own slot even when all are taken
+    assert await cache.acquire_slot("slots", "q1", limit=2, lease=60)
+
+    await cache.release_slot("slots", "q1")
+    assert await cache.acquire_slot("slots", "q3", limit=2, lease=60)
+    assert await redis.zcard("slots") == 2
+
+
+async def test_expired_lease_frees_its_slot(redis):
+    assert await cache.acquire_slot("slots", "crashed", limit=1, lease=0.2)
+    assert not await cache.acquire_slot("slots", "q2", limit=1, lease=60)
+
+    await asyncio.sleep(0.3)
+
+    assert await cache.acquire_slot("slots", "q2", limit=1, lease=60)
+    assert await redis.zrange("slots", 0, -1) == ["q2"]
+
+
+async def test_set_and_acquire_slot_renews_the_lease(redis):
+    assert await cache.acquire_slot("slots", "q1", limit=1, lease=0.2)
+
+    assert await cache.set_and_acquire_slot("done", "1", 60, "slots", "q1", limit=1, lease=60)
+    await asyncio.sleep(0.3)
+
+    assert await redis.get("done") == "1"
+    assert not await cache.acquire_slot("slots", "q2", limit=1, lease=60)
+
+
+async def test_set_and_acquire_slot_reports_a_full_key(redis):
+    assert await cache.acquire_slot("slots", "q1", limit=1, lease=60)
+
+    assert not await cache.set_and_acquire_slot("done", "1", 60, "slots", "q2", limit=1, lease=60)
+    assert await redis.get("done") == "1"
+
+
+async def test_counter_expires_from_its_first_increment(redis):
+    assert await cache.incr("waits", ex=60) == 1
+    await redis.expire("waits", 10)
+
+    assert await cache.incr("waits", ex=60) == 2
+    # The expiry is set once, so a counter cannot be kept alive by increments
+    assert 0 < await redis.ttl("waits") <= 10
+    assert await cache.incr("forever") == 1
+    assert await redis.ttl("forever") == -1
@@ -0,0 +1,54 @@
+"""
+Tests for finding the tables a query reads
+"""
+
+import pytest
+
+from app.core.sql import extract_tables, normalize_table_name
+
+
+@pytest.mark.parametrize(
+    "query, tables",
+    [
+        ("SELECT * FROM orders", {"orders"}),
+        ("SELECT * FROM sales.orders o", {"orders"}),
+        ("SELECT * FROM warehouse.sales.Orders AS o", {"orders"}),
+        ('SELECT * FROM "Sales"."Order Items"', {"order items"}),
+        ("SELECT * FROM `orders`", {"orders"}),
+        ("SELECT * FROM orders o, customers AS c WHERE o.customer_id = c.id", {"orders", "customers"}),
+        (
+            "SELECT * FROM orders o JOIN customers c ON c.id = o.customer_id "
+            "LEFT OUTER JOIN public.regions r ON r.id = c.region_id",
+            {"orders", "customers", "regions"},
+        ),
+        ("SELECT * FROM (SELECT id FROM orders) o JOIN (SELECT id FROM refunds) r USING (id)", {"orders", "refunds"}),
+        ("SELECT * FROM orders WHERE customer_id IN (SELECT id FROM customers)", {"orders", "customers"}),
+        ("INSERT INTO archive SELECT * FROM orders", {"archive", "orders"}),
+    ],
+)
+def test_tables_are_found(query, tables):
+    assert extract_tables(query) == tables
+
+
+def test_cte_names_are_not_tables():
+    query = """
+    WITH RECURSIVE recent AS (SELECT * FROM orders),
+         totals AS MATERIALIZED (SELECT customer_id, sum(amount) FROM recent GROUP BY 1)
+    SELECT * FROM totals JOIN customers ON customers.id = totals.customer_id
+    """
+
+    assert extract_tables(query) == {"orders", "customers"}
+
+
+def test_strings_and_comments_are_ignored():
+    query = """
+    -- FROM audit_log
+    SELECT 'FROM secrets' AS note /* JOIN hidden */ FROM orders
+    """
+
+    assert extract_tables(query) == {"orders"}
+
+
+@pytest.mark.parametrize("reference", ["orders", "Sales.Orders", '"ORDERS"', "db . sales . `orders`"])
+def test_table_names_are_normalized(reference):
+    assert normalize_table_name(reference) == "orders"
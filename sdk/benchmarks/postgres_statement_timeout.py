@@ -0,0 +1,91 @@
+"""
+Benchmark: per-query statement_timeout cost in PostgresConnector
+
+Compares the previous execution path (``SET statement_timeout`` round-trip,
+then ``conn.fetch``) with ``PostgresConnector.execute_query``, which relies on
+asyncpg's client-side timeout plus a pool-wide server backstop.
+
+Usage:
+    python benchmarks/postgres_statement_timeout.py --host localhost --user kurobe --password kurobe --database kurobe
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from kurobe.bi.connectors import ConnectionConfig, PostgresConnector
+
+
+def _summarize(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "mean": statistics.fmean(samples),
+        "p50": samples[len(samples) // 2],
+        "p95": samples[int(len(samples) * 0.95) - 1],
+    }
+
+
+async def _measure(run: Callable[[], Awaitable[object]], iterations: int, warmup: int) -> List[float]:
+    for _ in range(warmup):
+        await run()
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+async def main(args: argparse.Namespace) -> None:
+    connector = PostgresConnector(ConnectionConfig(
+        name="benchmark",
+        type="postgres",
+        host=args.host,
+        port=args.port,
+        database=args.database,
+        username=args.user,
+        password=args.password,
+    ))
+    await connector.connect()
+
+    timeout = 30
+
+    async def set_then_fetch() -> object:
+        async with connector._pool.acquire() as conn:
+            await conn.execute(f"SET statement_timeout = {timeout * 1000}")
+            return await conn.fetch(args.query)
+
+    async def execute_query() -> object:
+        return await connector.execute_query(args.query, timeout=timeout)
+
+    try:
+        results = {
+            "SET + fetch (previous)": await _measure(set_then_fetch, args.iterations, args.warmup),
+            "execute_query (current)": await _measure(execute_query, args.iterations, args.warmup),
+        }
+    finally:
+        await connector.disconnect()
+
+    print(f"{args.iterations} iterations of {args.query!r}")
+    summaries = {name: _summarize(samples) for name, samples in results.items()}
+    for name, summary in summaries.items():
+        print(f"  {name:<26} mean {summary['mean']:.3f} ms  p50 {summary['p50']:.3f} ms  p95 {summary['p95']:.3f} ms")
+
+    previous, current = summaries.values()
+    saved = previous["mean"] - current["mean"]
+    print(f"  saved per query: {saved:.3f} ms ({saved / previous['mean']:.0%})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=5432)
+    parser.add_argument("--database", default="kurobe")
+    parser.add_argument("--user", default="kurobe")
+    parser.add_argument("--password", default="kurobe")
+    parser.add_argument("--query", default="SELECT 1")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -1,15 +1,19 @@
 """
 Questions API client
 """
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Union
 from uuid import UUID
 
 from kurobe.api.base import BaseAPIClient
 from kurobe.core.schemas import (
     QuestionRequest,
     QuestionResponse,
+    QuestionListResponse,
+    QuestionSummaryListResponse,
+    ChatHistoryResponse,
     ChatRequest,
     ChatResponse,
+    PanelResultResponse,
 )
 
 
@@ -32,19 +36,57 @@ class QuestionsClient(BaseAPIClient):
         offset: int = 0,
         status: Optional[str] = None,
         tags: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
     ) -> List[QuestionResponse]:
         """List questions with optional filters"""
-        params = {
-            "limit": limit,
-            "offset": offset,
-        }
+        page = await self.list_questions_page(limit, status, tags, cursor, offset)
+        return page.questions
+    
+    async def list_questions_page(
+        self,
+        limit: int = 20,
+        status: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        fields: Optional[List[str]] = None,
+    ) -> Union[QuestionListResponse, QuestionSummaryListResponse]:
+        """Get one page of questions, newest first, with the cursor of the next page
+
+        Pass ``fields`` to get summaries holding only those fields.
+        """
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        if fields:
+            params["fields"] = ",".join(fields)
+        if offset:
+            params["offset"] = offset
         if status:
             params["status"] = status
         if tags:
             params["tags"] = ",".join(tags)
         
         data = await self.get("/questions", params=params)
-        return [QuestionResponse(**item) for item in data["questions"]]
+        if fields:
+            return QuestionSummaryListResponse(**data)
+        return QuestionListResponse(**data)
+    
+    async def iter_questions(
+        self,
+        page_size: int = 20,
+        status: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+    ) -> AsyncIterator[QuestionResponse]:
+        """Iterate over all matching questions, newest first, following page cursors"""
+        cursor = None
+        while True:
+            page = await self.list_questions_page(page_size, status, tags, cursor)
+            for question in page.questions:
+                yield question
+            if not page.next_cursor:
+                return
+            cursor = page.next_cursor
     
     async def update_question(
         self,
@@ -75,6 +117,24 @@ class QuestionsClient(BaseAPIClient):
         data = await self.get(f"/questions/{question_id}/panels")
         return data["panels"]
     
+    async def get_panel_result(self, question_id: UUID, panel_id: UUID) -> PanelResultResponse:
+        """Get the data and query result of a panel, to render it"""
+        data = await self.get(f"/questions/{question_id}/panels/{panel_id}/result")
+        return PanelResultResponse(**data)
+    
+    async def get_chat_history(
+        self,
+        question_id: UUID,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+    ) -> ChatHistoryResponse:
+        """Get one page of a question's chat messages, oldest first"""
+        params = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        data = await self.get(f"/questions/{question_id}/messages", params=params)
+        return ChatHistoryResponse(**data)
+    
     async def retry_question(self, question_id: UUID) -> QuestionResponse:
         """Retry processing a failed question"""
         data = await self.post(f"/questions/{question_id}/retry", {})
@@ -2,34 +2,20 @@
 BI SDK for Kurobe - Business Intelligence specific functionality
 """
 from kurobe.bi.connectors import (
+    ConnectionConfig,
     DataConnector,
     PostgresConnector,
     TrinoConnector,
     DuckDBConnector,
     ConnectionPool,
 )
-from kurobe.bi.engines import (
-    DefaultTextToSQLEngine,
-    DefaultVisualizationEngine,
-    DefaultSemanticEngine,
-)
-from kurobe.bi.orchestrator import BIOrchestrator
-from kurobe.bi.cache import QueryCache, ResultCache
 
 __all__ = [
     # Connectors
+    "ConnectionConfig",
     "DataConnector",
     "PostgresConnector",
     "TrinoConnector",
     "DuckDBConnector",
     "ConnectionPool",
-    # Engines
-    "DefaultTextToSQLEngine",
-    "DefaultVisualizationEngine",
-    "DefaultSemanticEngine",
-    # Orchestration
-    "BIOrchestrator",
-    # Cache
-    "QueryCache",
-    "ResultCache",
 ]
@@ -2,18 +2,51 @@
 Database connectors for Kurobe BI platform
 """
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Union
-from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Union
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing, asynccontextmanager, suppress
 import asyncio
+import functools
+import json
+import os
+import threading
+import time
 from datetime import datetime
 
 from pydantic import BaseModel, Field
 import asyncpg
 import httpx
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+from kurobe.core.columnar import ColumnarData
 from kurobe.core.models import QueryResult
 
 
+# Default number of rows per batch yielded by execute_stream
+DEFAULT_STREAM_BATCH_SIZE = 10_000
+
+# Trino responses larger than this are JSON-decoded off the event loop
+_TRINO_THREADED_DECODE_BYTES = 256 * 1024
+
+# Trino status codes that mean "busy, retry the same request"
+_TRINO_RETRY_STATUSES = {429, 502, 503, 504}
+
+# DuckDB types each columnar fetch format cannot return as the Python values
+# fetchall gives: Arrow turns HUGEINT into Decimal, NumPy turns DECIMAL and
+# HUGEINT into float64 (and rejects UHUGEINT), and TIMESTAMP_NS fails Arrow's
+# conversion to datetime and comes out of NumPy as an int
+_DUCKDB_INEXACT_TYPES = {
+    "arrow": ("HUGEINT", "TIMESTAMP_NS"),
+    "numpy": ("DECIMAL", "HUGEINT", "TIMESTAMP_NS"),
+}
+
+
 class ConnectionConfig(BaseModel):
     """Base configuration for database connections"""
     name: str
@@ -25,6 +58,139 @@ class ConnectionConfig(BaseModel):
     password: Optional[str] = None
     ssl: bool = False
     extra_params: Dict[str, Any] = Field(default_factory=dict)
+    
+    # Admission control: queries allowed to run at once (None = unlimited),
+    # queries allowed to wait for a slot, and how long each may wait (seconds)
+    max_concurrent_queries: Optional[int] = None
+    max_queued_queries: int = 100
+    queue_timeout: float = 30.0
+
+
+class AdmissionRejectedError(RuntimeError):
+    """A query was refused a slot: the wait queue is full or its deadline passed"""
+
+
+class AdmissionController:
+    """Bounds the queries running at once on a connection
+    
+    Up to ``max_in_flight`` queries run concurrently; the rest wait in a queue
+    of at most ``max_queued`` entries for up to ``queue_timeout`` seconds.
+    Waiters are grouped per user and freed slots are handed out round-robin
+    across users, so one user's burst cannot starve everyone else.
+    """
+    
+    def __init__(self, max_in_flight: int, max_queued: int = 100, queue_timeout: float = 30.0):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        
+        self._in_flight = 0
+        self._queued = 0
+        self._waiters: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+    
+    @asynccontextmanager
+    async def slot(self, user_id: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold a query slot for the duration of the block"""
+        await self.acquire(user_id)
+        try:
+            yield
+        finally:
+            self.release()
+    
+    async def acquire(self, user_id: Optional[str] = None) -> None:
+        """Wait for a query slot; raises AdmissionRejectedError if none is granted"""
+        start = time.monotonic()
+        
+        if self._in_flight < self.max_in_flight and not self._queued:
+            self._in_flight += 1
+            self._record_admission(0.0)
+            return
+        
+        if self._queued >= self.max_queued:
+            self._rejected += 1
+            raise AdmissionRejectedError(f"Query queue is full ({self._queued} waiting)")
+        
+        key = user_id or ""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(key, deque()).append(future)
+        self._queued += 1
+        
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await future
+        except BaseException as exc:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            else:
+                self._remove_waiter(key, future)
+            
+            if isinstance(exc, TimeoutError):
+                self._timed_out += 1
+                raise AdmissionRejectedError(
+                    f"No query slot became available within {self.queue_timeout}s"
+                ) from None
+            raise
+        
+        # release() transferred its slot to us without touching _in_flight
+        self._record_admission(time.monotonic() - start)
+    
+    def release(self) -> None:
+        """Free a slot, handing it to the next user in round-robin order"""
+        while self._waiters:
+            key, queue = next(iter(self._waiters.items()))
+            future = queue.popleft()
+            self._queued -= 1
+            if queue:
+                self._waiters.move_to_end(key)
+            else:
+                del self._waiters[key]
+            
+            if not future.done():
+                future.set_result(None)
+                return
+        
+        self._in_flight -= 1
+    
+    def _remove_waiter(self, key: str, future: asyncio.Future) -> None:
+        queue = self._waiters.get(key)
+        if queue is None:
+            return
+        try:
+            queue.remove(future)
+        except ValueError:
+            return
+        self._queued -= 1
+        if not queue:
+            del self._waiters[key]
+    
+    def _record_admission(self, waited: float) -> None:
+        self._admitted += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Current queue depth and cumulative admission/wait-time counters"""
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._in_flight,
+            "queue_depth": self._queued,
+            "queue_depth_by_user": {key: len(queue) for key, queue in self._waiters.items()},
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+            "timed_out": self._timed_out,
+            "wait_time_total_ms": self._wait_total * 1000,
+            "wait_time_avg_ms": self._wait_total * 1000 / self._admitted if self._admitted else 0.0,
+            "wait_time_max_ms": self._wait_max * 1000,
+        }
 
 
 class DataConnector(ABC):
@@ -33,6 +199,26 @@ class DataConnector(ABC):
     def __init__(self, config: ConnectionConfig):
         self.config = config
         self._pool = None
+        self._admission: Optional[AdmissionController] = None
+        if config.max_concurrent_queries:
+            self._admission = AdmissionController(
+                config.max_concurrent_queries,
+                config.max_queued_queries,
+                config.queue_timeout,
+            )
+    
+    @asynccontextmanager
+    async def admit(self, user_id: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold one of the connection's query slots (no-op without a limit)"""
+        if self._admission is None:
+            yield
+            return
+        async with self._admission.slot(user_id):
+            yield
+    
+    def admission_stats(self) -> Optional[Dict[str, Any]]:
+        """Queue depth and wait-time metrics, or None without a limit"""
+        return self._admission.stats() if self._admission else None
     
     @abstractmethod
     async def connect(self) -> None:
@@ -54,6 +240,50 @@ class DataConnector(ABC):
         """Execute a query and return results"""
         pass
     
+    async def execute_stream(
+        self,
+        query: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        timeout: Optional[int] = 30,
+        batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[QueryResult]:
+        """
+        Execute a query and yield results in batches of at most ``batch_size`` rows
+        
+        Every batch carries the column names, and at least one (possibly empty)
+        batch is yielded. The default implementation slices a fully materialized
+        result; connectors override it to read incrementally from the server.
+        """
+        result = await self.execute_query(query, parameters, timeout)
+        data = result.data
+        
+        offset = 0
+        while True:
+            yield QueryResult.from_columnar(
+                data.slice(offset, batch_size),
+                execution_time_ms=result.execution_time_ms,
+                query=result.query,
+                connection_id=result.connection_id,
+            )
+            offset += batch_size
+            if offset >= data.num_rows:
+                break
+    
+    def _stream_batch(
+        self,
+        columns: List[str],
+        rows: List[Any],
+        query: str,
+        start_time: datetime,
+    ) -> QueryResult:
+        """Build one execute_stream batch from row-oriented data"""
+        return QueryResult.from_columnar(
+            ColumnarData.from_rows(columns, rows),
+            execution_time_ms=(datetime.utcnow() - start_time).total_seconds() * 1000,
+            query=query,
+            connection_id=self.config.name,
+        )
+    
     @abstractmethod
     async def test_connection(self) -> bool:
         """Test if the connection is valid"""
@@ -74,6 +304,30 @@ class DataConnector(ABC):
 class PostgresConnector(DataConnector):
     """PostgreSQL database connector using asyncpg"""
     
+    # Prepared statements kept per pooled connection by asyncpg's statement cache
+    # (extra_params["prepared_statement_cache_size"])
+    PREPARED_STATEMENT_CACHE_SIZE = 128
+    
+    # Server-side statement_timeout backstop in seconds (extra_params["max_statement_timeout"]);
+    # per-query timeouts are enforced client-side by asyncpg
+    MAX_STATEMENT_TIMEOUT = 300
+    
+    # extra_params consumed by the connector rather than passed to asyncpg.create_pool
+    CONNECTOR_PARAMS = {"prepared_statement_cache_size", "max_statement_timeout"}
+    
+    def __init__(self, config: ConnectionConfig):
+        super().__init__(config)
+        self._statement_cache_size = int(
+            config.extra_params.get("prepared_statement_cache_size", self.PREPARED_STATEMENT_CACHE_SIZE)
+        )
+        self._max_statement_timeout = float(
+            config.extra_params.get("max_statement_timeout", self.MAX_STATEMENT_TIMEOUT)
+        )
+        # Statement keys per backend pid, mirroring each connection's statement
+        # cache so hits and misses can be counted
+        self._statement_keys: Dict[int, "OrderedDict[str, None]"] = {}
+        self._statement_stats = {"hits": 0, "misses": 0, "evictions": 0}
+    
     async def connect(self) -> None:
         """Establish connection pool to PostgreSQL"""
         dsn = f"postgresql://{self.config.username}:{self.config.password}@{self.config.host}:{self.config.port}/{self.config.database}"
@@ -81,12 +335,35 @@ class PostgresConnector(DataConnector):
         if self.config.ssl:
             dsn += "?sslmode=require"
         
+        pool_params = {
+            key: value for key, value in self.config.extra_params.items()
+            if key not in self.CONNECTOR_PARAMS
+        }
+        
+        # Sent in the startup packet, so it is the session default that RESET ALL
+        # restores on pool release; costs no round-trip per query
+        server_settings = dict(pool_params.pop("server_settings", None) or {})
+        server_settings.setdefault("statement_timeout", str(int(self._max_statement_timeout * 1000)))
+        
+        user_init = pool_params.pop("init", None)
+        
+        async def init(conn: asyncpg.Connection) -> None:
+            # A new connection starts with an empty statement cache
+            pid = conn.get_server_pid()
+            self._statement_keys.pop(pid, None)
+            conn.add_termination_listener(lambda _: self._statement_keys.pop(pid, None))
+            if user_init is not None:
+                await user_init(conn)
+        
         self._pool = await asyncpg.create_pool(
             dsn,
             min_size=2,
             max_size=10,
             command_timeout=60,
-            **self.config.extra_params
+            statement_cache_size=self._statement_cache_size,
+            server_settings=server_settings,
+            init=init,
+            **pool_params
         )
     
     async def disconnect(self) -> None:
@@ -94,6 +371,7 @@ class PostgresConnector(DataConnector):
         if self._pool:
             await self._pool.close()
             self._pool = None
+        self._statement_keys.clear()
     
     async def execute_query(
         self,
@@ -109,33 +387,26 @@ class PostgresConnector(DataConnector):
         
         async with self._pool.acquire() as conn:
             try:
-                # Set statement timeout
-                await conn.execute(f"SET statement_timeout = {timeout * 1000}")
+                # The timeout is enforced by asyncpg, which cancels the query on the
+                # server when it fires; only timeouts above the pool-wide backstop
+                # need a SET, and RESET ALL on release undoes it
+                await self._raise_statement_timeout(conn, timeout)
                 
-                # Execute query
-                if parameters:
-                    # Convert dict parameters to positional
-                    rows = await conn.fetch(query, *parameters.values())
-                else:
-                    rows = await conn.fetch(query)
+                # Execute query through the connection's statement cache, which
+                # also re-prepares statements made stale by schema changes;
+                # dict parameters are converted to positional
+                args = list(parameters.values()) if parameters else []
+                self._record_statement(conn, query)
+                rows = await conn.fetch(query, *args, timeout=timeout)
                 
                 # Calculate execution time
                 execution_time = (datetime.utcnow() - start_time).total_seconds() * 1000
                 
-                # Extract columns and convert rows
-                if rows:
-                    columns = list(rows[0].keys())
-                    data = [list(row.values()) for row in rows]
-                else:
-                    # Try to get column names from prepared statement
-                    stmt = await conn.prepare(query)
-                    columns = [attr.name for attr in stmt.get_attributes()]
-                    data = []
+                # Records are transposed straight into column buffers
+                columns = await self._columns(conn, query, rows)
                 
-                return QueryResult(
-                    columns=columns,
-                    rows=data,
-                    row_count=len(data),
+                return QueryResult.from_columnar(
+                    ColumnarData.from_rows(columns, rows),
                     execution_time_ms=execution_time,
                     query=query,
                     connection_id=self.config.name,
@@ -146,6 +417,94 @@ class PostgresConnector(DataConnector):
             except Exception as e:
                 raise RuntimeError(f"Query execution failed: {str(e)}")
     
+    async def execute_stream(
+        self,
+        query: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        timeout: Optional[int] = 30,
+        batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[QueryResult]:
+        """Stream a PostgreSQL query through a server-side cursor"""
+        if not self._pool:
+            raise RuntimeError("Not connected to database")
+        
+        start_time = datetime.utcnow()
+        args = list(parameters.values()) if parameters else []
+        
+        async with self._pool.acquire() as conn:
+            # Server-side cursors only live inside a transaction; the timeout
+            # applies to opening the cursor and to every FETCH
+            async with conn.transaction():
+                try:
+                    await self._raise_statement_timeout(conn, timeout, local=True)
+                    self._record_statement(conn, query)
+                    cursor = await conn.cursor(query, *args, timeout=timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"Query exceeded timeout of {timeout} seconds")
+                except Exception as e:
+                    raise RuntimeError(f"Query execution failed: {str(e)}")
+                
+                columns = None
+                while True:
+                    try:
+                        rows = await cursor.fetch(batch_size, timeout=timeout)
+                    except asyncio.TimeoutError:
+                        raise TimeoutError(f"Query exceeded timeout of {timeout} seconds")
+                    except Exception as e:
+                        raise RuntimeError(f"Query execution failed: {str(e)}")
+                    
+                    if columns is None:
+                        columns = await self._columns(conn, query, rows)
+                    yield self._stream_batch(columns, rows, query, start_time)
+                    if len(rows) < batch_size:
+                        break
+    
+    async def _raise_statement_timeout(
+        self,
+        conn: asyncpg.Connection,
+        timeout: Optional[float],
+        local: bool = False,
+    ) -> None:
+        """Lift the server-side backstop when a query may legitimately run longer"""
+        if timeout and timeout > self._max_statement_timeout:
+            scope = "LOCAL " if local else ""
+            await conn.execute(f"SET {scope}statement_timeout = {int(timeout * 1000)}")
+    
+    @staticmethod
+    async def _columns(conn: asyncpg.Connection, query: str, rows: List[asyncpg.Record]) -> List[str]:
+        """Column names of a result, read from the cached statement when it returned no rows"""
+        if rows:
+            return list(rows[0].keys())
+        # The public prepare() bypasses the statement cache and costs another
+        # Parse round-trip; the statement the query just ran with is cached
+        stmt = await conn._prepare(query, use_cache=True)
+        return [attr.name for attr in stmt.get_attributes()]
+    
+    def _record_statement(self, conn: asyncpg.Connection, query: str) -> None:
+        """Count a statement cache hit or miss for ``query`` on ``conn``"""
+        if self._statement_cache_size <= 0:
+            return
+        
+        keys = self._statement_keys.setdefault(conn.get_server_pid(), OrderedDict())
+        if query in keys:
+            keys.move_to_end(query)
+            self._statement_stats["hits"] += 1
+            return
+        
+        self._statement_stats["misses"] += 1
+        keys[query] = None
+        if len(keys) > self._statement_cache_size:
+            keys.popitem(last=False)
+            self._statement_stats["evictions"] += 1
+    
+    def statement_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the prepared statement cache across pooled connections"""
+        stats: Dict[str, Any] = dict(self._statement_stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        stats["max_size_per_connection"] = self._statement_cache_size
+        return stats
+    
     async def test_connection(self) -> bool:
         """Test PostgreSQL connection"""
         try:
@@ -203,6 +562,11 @@ class PostgresConnector(DataConnector):
 class TrinoConnector(DataConnector):
     """Trino/Presto database connector"""
     
+    # Retry policy for overloaded coordinators (429/502/503/504)
+    MAX_RETRIES = 5
+    RETRY_BACKOFF_BASE = 0.1
+    RETRY_BACKOFF_MAX = 10.0
+    
     def __init__(self, config: ConnectionConfig):
         super().__init__(config)
         self._client = None
@@ -239,53 +603,156 @@ class TrinoConnector(DataConnector):
         if not self._client:
             raise RuntimeError("Not connected to Trino")
         
-        if parameters:
-            # Simple parameter substitution for Trino
-            for key, value in parameters.items():
-                if isinstance(value, str):
-                    query = query.replace(f":{key}", f"'{value}'")
-                else:
-                    query = query.replace(f":{key}", str(value))
+        query = self._bind_parameters(query, parameters)
         
         start_time = datetime.utcnow()
         
-        # Submit query
-        response = await self._client.post(
-            "/v1/statement",
-            data=query,
-            timeout=timeout,
-        )
-        response.raise_for_status()
-        
-        result = response.json()
+        # Accumulate every page; the coordinator spreads data across many of them
+        columns: List[str] = []
+        rows: List[List[Any]] = []
         
-        # Poll for results
-        while "nextUri" in result:
-            response = await self._client.get(result["nextUri"], timeout=timeout)
-            response.raise_for_status()
-            result = response.json()
-        
-        # Extract results
-        columns = []
-        rows = []
-        
-        if "columns" in result:
-            columns = [col["name"] for col in result["columns"]]
-        
-        if "data" in result:
-            rows = result["data"]
+        try:
+            async with asyncio.timeout(timeout):
+                async with aclosing(self._iter_pages(query, timeout)) as pages:
+                    async for page in pages:
+                        if not columns and "columns" in page:
+                            columns = [col["name"] for col in page["columns"]]
+                        data = page.get("data")
+                        if data:
+                            rows.extend(data)
+        except TimeoutError:
+            raise TimeoutError(f"Query exceeded timeout of {timeout} seconds")
         
         execution_time = (datetime.utcnow() - start_time).total_seconds() * 1000
         
-        return QueryResult(
-            columns=columns,
-            rows=rows,
-            row_count=len(rows),
+        return QueryResult.from_columnar(
+            ColumnarData.from_rows(columns, rows),
             execution_time_ms=execution_time,
             query=query,
             connection_id=self.config.name,
         )
     
+    async def execute_stream(
+        self,
+        query: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        timeout: Optional[int] = 30,
+        batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[QueryResult]:
+        """Stream a Trino query, consuming one ``nextUri`` page at a time"""
+        if not self._client:
+            raise RuntimeError("Not connected to Trino")
+        
+        query = self._bind_parameters(query, parameters)
+        start_time = datetime.utcnow()
+        
+        columns: Optional[List[str]] = None
+        pending: List[List[Any]] = []
+        yielded = False
+        
+        async with aclosing(self._iter_pages(query, timeout)) as pages:
+            async for page in pages:
+                if columns is None and "columns" in page:
+                    columns = [col["name"] for col in page["columns"]]
+                
+                pending.extend(page.get("data") or [])
+                while len(pending) >= batch_size:
+                    yield self._stream_batch(columns or [], pending[:batch_size], query, start_time)
+                    del pending[:batch_size]
+                    yielded = True
+        
+        if pending or not yielded:
+            yield self._stream_batch(columns or [], pending, query, start_time)
+    
+    async def _iter_pages(self, query: str, timeout: Optional[int]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Submit a statement and yield each decoded response page
+        
+        The request for page N+1 is started before page N is handed to the
+        caller, so its round-trip and decoding overlap with the caller's work on
+        page N. If iteration stops before the query finished (timeout,
+        cancellation, early exit) the query is cancelled on the coordinator.
+        """
+        page = await self._request_page("POST", "/v1/statement", timeout, content=query)
+        next_uri: Optional[str] = None
+        next_page: Optional[asyncio.Task] = None
+        finished = False
+        
+        try:
+            while True:
+                error = page.get("error")
+                if error:
+                    raise RuntimeError(f"Query execution failed: {error.get('message', error)}")
+                
+                next_uri = page.get("nextUri")
+                if next_uri:
+                    next_page = asyncio.create_task(self._request_page("GET", next_uri, timeout))
+                
+                yield page
+                
+                if next_page is None:
+                    finished = True
+                    break
+                page = await next_page
+                next_page = None
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+            if not finished and next_uri:
+                await self._cancel_query(next_uri)
+    
+    async def _request_page(
+        self,
+        method: str,
+        url: str,
+        timeout: Optional[int],
+        **kwargs: Any,
+    ) -> Dict[str, Any]:
+        """Fetch and decode one protocol page, retrying while the coordinator is busy"""
+        attempt = 0
+        while True:
+            response = await self._client.request(method, url, timeout=timeout, **kwargs)
+            if response.status_code in _TRINO_RETRY_STATUSES and attempt < self.MAX_RETRIES:
+                await asyncio.sleep(self._retry_delay(response, attempt))
+                attempt += 1
+                continue
+            
+            response.raise_for_status()
+            content = response.content
+            if len(content) >= _TRINO_THREADED_DECODE_BYTES:
+                return await asyncio.to_thread(_json_loads, content)
+            return _json_loads(content)
+    
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> float:
+        """Delay before retrying: the server's Retry-After hint, else exponential backoff"""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+        return min(self.RETRY_BACKOFF_BASE * (2 ** attempt), self.RETRY_BACKOFF_MAX)
+    
+    async def _cancel_query(self, next_uri: str) -> None:
+        """Best-effort cancellation of a running query"""
+        if not self._client:
+            return
+        try:
+            await asyncio.wait_for(self._client.delete(next_uri), timeout=5)
+        except Exception:
+            pass
+    
+    @staticmethod
+    def _bind_parameters(query: str, parameters: Optional[Dict[str, Any]]) -> str:
+        """Simple parameter substitution for Trino"""
+        if parameters:
+            for key, value in parameters.items():
+                if isinstance(value, str):
+                    query = query.replace(f":{key}", f"'{value}'")
+                else:
+                    query = query.replace(f":{key}", str(value))
+        return query
+    
     async def test_connection(self) -> bool:
         """Test Trino connection"""
         try:
@@ -308,31 +775,145 @@ class TrinoConnector(DataConnector):
         # This is simplified - real implementation would get full schema details
         return {
             "catalog": catalog,
-            "schemas": result.rows if not schema else None,
-            "tables": result.rows if schema else None,
+            "schemas": result.data.to_pylist() if not schema else None,
+            "tables": result.data.to_pylist() if schema else None,
         }
 
 
+def _read_next_batch(reader: Any) -> Any:
+    """Next batch of a RecordBatchReader, or None once exhausted
+    
+    StopIteration cannot cross an executor future, so it is translated here.
+    """
+    try:
+        return reader.read_next_batch()
+    except StopIteration:
+        return None
+
+
+def _duckdb_fetch_format() -> str:
+    """Cheapest result format available: "arrow", "numpy", or "rows" (fetchall)"""
+    try:
+        import pyarrow  # noqa: F401
+        return "arrow"
+    except ImportError:
+        pass
+    try:
+        import numpy  # noqa: F401
+        return "numpy"
+    except ImportError:
+        return "rows"
+
+
+def _fetch_exact(fetch_format: str, description: Optional[List[Any]]) -> bool:
+    """Whether a columnar fetch format returns every column of a result as fetchall would
+    
+    Types are matched in the description's type names, so they are also found
+    nested in lists and structs; results holding one are fetched as rows.
+    """
+    return not any(
+        inexact in str(desc[1])
+        for desc in description or []
+        for inexact in _DUCKDB_INEXACT_TYPES.get(fetch_format, ())
+    )
+
+
 class DuckDBConnector(DataConnector):
-    """DuckDB file-based database connector"""
+    """DuckDB file-based database connector
+    
+    Queries run on a bounded thread pool owned by the connector. Each worker
+    thread lazily opens its own cursor (a duplicate of the database connection),
+    so concurrent queries never share connection state.
+    """
+    
+    # Upper bound on the default worker count (extra_params["worker_threads"] overrides it)
+    DEFAULT_WORKER_THREADS = 4
+    
+    # Result formats accepted in extra_params["fetch_format"]
+    FETCH_FORMATS = {"arrow", "numpy", "rows"}
     
     def __init__(self, config: ConnectionConfig):
         super().__init__(config)
         self._conn = None
-        # DuckDB operations will be wrapped in asyncio.to_thread
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._cursors: List[Any] = []
+        self._cursors_lock = threading.Lock()
+        self._worker_threads = max(1, int(config.extra_params.get(
+            "worker_threads",
+            min(self.DEFAULT_WORKER_THREADS, os.cpu_count() or 1),
+        )))
+        
+        # Arrow/NumPy results are handed to QueryResult as column buffers, so
+        # large scans never build a Python tuple per row
+        self._fetch_format = config.extra_params.get("fetch_format") or _duckdb_fetch_format()
+        if self._fetch_format not in self.FETCH_FORMATS:
+            raise ValueError(f"Unsupported DuckDB fetch_format: {self._fetch_format!r}")
     
     async def connect(self) -> None:
         """Open DuckDB database file"""
         import duckdb
         
         db_path = self.config.extra_params.get("path", ":memory:")
-        self._conn = await asyncio.to_thread(duckdb.connect, db_path)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._worker_threads,
+            thread_name_prefix=f"duckdb-{self.config.name}",
+        )
+        self._local = threading.local()
+        self._conn = await self._run(duckdb.connect, db_path)
     
     async def disconnect(self) -> None:
-        """Close DuckDB connection"""
+        """Close worker cursors and the DuckDB connection"""
         if self._conn:
-            await asyncio.to_thread(self._conn.close)
+            await self._run(self._close_all)
             self._conn = None
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+    
+    async def _run(self, func: Any, *args: Any) -> Any:
+        """Run a blocking DuckDB call on the connector's executor"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+    
+    def _cursor(self) -> Any:
+        """Cursor owned by the calling worker thread"""
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._conn.cursor()
+            self._local.cursor = cursor
+            with self._cursors_lock:
+                self._cursors.append(cursor)
+        return cursor
+    
+    def _close_all(self) -> None:
+        with self._cursors_lock:
+            cursors, self._cursors = self._cursors, []
+        for cursor in cursors:
+            cursor.close()
+        self._conn.close()
+    
+    def _execute_and_fetch(self, query: str, parameters: Optional[Dict[str, Any]]) -> ColumnarData:
+        """Execute and fetch in a single hop on a worker thread"""
+        cursor = self._cursor()
+        if parameters:
+            cursor.execute(query, parameters)
+        else:
+            cursor.execute(query)
+        
+        exact = _fetch_exact(self._fetch_format, cursor.description)
+        if self._fetch_format == "arrow" and exact:
+            # to_arrow_table supersedes fetch_arrow_table in newer DuckDB releases
+            fetch = getattr(cursor, "to_arrow_table", None) or cursor.fetch_arrow_table
+            return ColumnarData.from_arrow(fetch())
+        
+        columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        if self._fetch_format == "numpy" and exact:
+            # fetchnumpy renames duplicate columns (a, a_1), so names come from the description
+            return ColumnarData.from_numpy(cursor.fetchnumpy(), names=columns)
+        
+        rows = cursor.fetchall()
+        return ColumnarData.from_rows(columns, rows)
     
     async def execute_query(
         self,
@@ -346,34 +927,71 @@ class DuckDBConnector(DataConnector):
         
         start_time = datetime.utcnow()
         
-        # Execute query in thread pool
-        if parameters:
-            result = await asyncio.to_thread(
-                self._conn.execute,
-                query,
-                parameters,
-            )
-        else:
-            result = await asyncio.to_thread(
-                self._conn.execute,
-                query,
-            )
-        
-        # Fetch results
-        rows = await asyncio.to_thread(result.fetchall)
-        columns = [desc[0] for desc in result.description] if result.description else []
+        data = await self._run(self._execute_and_fetch, query, parameters)
         
         execution_time = (datetime.utcnow() - start_time).total_seconds() * 1000
         
-        return QueryResult(
-            columns=columns,
-            rows=rows,
-            row_count=len(rows),
+        return QueryResult.from_columnar(
+            data,
             execution_time_ms=execution_time,
             query=query,
             connection_id=self.config.name,
         )
     
+    async def execute_stream(
+        self,
+        query: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        timeout: Optional[int] = 30,
+        batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[QueryResult]:
+        """Stream a DuckDB query through a dedicated cursor"""
+        if not self._conn:
+            raise RuntimeError("Not connected to DuckDB")
+        
+        start_time = datetime.utcnow()
+        
+        # The stream outlives a single executor task, so it gets a cursor of its
+        # own rather than the worker's, which other queries would clobber
+        cursor = await self._run(self._conn.cursor)
+        try:
+            if parameters:
+                await self._run(cursor.execute, query, parameters)
+            else:
+                await self._run(cursor.execute, query)
+            
+            columns = [desc[0] for desc in cursor.description] if cursor.description else []
+            
+            if self._fetch_format == "arrow" and _fetch_exact("arrow", cursor.description):
+                # to_arrow_reader supersedes fetch_record_batch in newer DuckDB releases
+                fetch = getattr(cursor, "to_arrow_reader", None) or cursor.fetch_record_batch
+                reader = await self._run(fetch, batch_size)
+                
+                # Arrow record batches go to the result model without touching Python objects
+                yielded = False
+                while True:
+                    batch = await self._run(_read_next_batch, reader)
+                    if batch is None:
+                        break
+                    yield QueryResult.from_columnar(
+                        ColumnarData.from_arrow(batch),
+                        execution_time_ms=(datetime.utcnow() - start_time).total_seconds() * 1000,
+                        query=query,
+                        connection_id=self.config.name,
+                    )
+                    yielded = True
+                
+                if not yielded:
+                    yield self._stream_batch(columns, [], query, start_time)
+            else:
+                while True:
+                    rows = await self._run(cursor.fetchmany, batch_size)
+                    yield self._stream_batch(columns, rows, query, start_time)
+                    if len(rows) < batch_size:
+                        break
+        finally:
+            await self._run(cursor.close)
+    
     async def test_connection(self) -> bool:
         """Test DuckDB connection"""
         try:
@@ -422,58 +1040,319 @@ class DuckDBConnector(DataConnector):
         return schema_info
 
 
+class CircuitBreaker:
+    """Takes a connector out of rotation after repeated failures
+    
+    The breaker opens after ``failure_threshold`` consecutive failures and
+    rejects requests for ``recovery_timeout`` seconds. It is then half-open:
+    a single attempt is let through as a probe while the others are still
+    rejected, and the probe's outcome closes the breaker or opens it again.
+    A probe that reports no outcome within ``recovery_timeout`` is given up,
+    so the next attempt becomes the probe.
+    """
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, failure_threshold: int = 3, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_started_at: Optional[float] = None
+    
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.recovery_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+    
+    @property
+    def probing(self) -> bool:
+        """Whether a half-open probe is in flight"""
+        return (
+            self._probe_started_at is not None
+            and time.monotonic() - self._probe_started_at < self.recovery_timeout
+        )
+    
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.OPEN or self.probing:
+            return False
+        self._probe_started_at = time.monotonic()
+        return True
+    
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+        self._probe_started_at = None
+    
+    def record_failure(self) -> None:
+        self.failures += 1
+        # A failed half-open probe re-opens immediately
+        if self.failures >= self.failure_threshold or self._opened_at is not None:
+            self._opened_at = time.monotonic()
+        self._probe_started_at = None
+
+
 class ConnectionPool:
-    """Manages multiple database connections"""
+    """Manages multiple database connections
     
-    def __init__(self):
+    Connections added with ``lazy=True`` are connected on first ``acquire``.
+    ``warmup`` and ``close_all`` work on all connections concurrently, and
+    ``start_health_checks`` runs a background task that probes connected
+    connectors and circuit-breaks the ones that keep failing.
+    """
+    
+    def __init__(
+        self,
+        health_check_interval: float = 30.0,
+        health_check_timeout: float = 5.0,
+        failure_threshold: int = 3,
+        recovery_timeout: float = 30.0,
+    ):
         self._connections: Dict[str, DataConnector] = {}
+        self._connected: Set[str] = set()
+        self._connect_locks: Dict[str, asyncio.Lock] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._health_task: Optional[asyncio.Task] = None
+        self._health_check_interval = health_check_interval
+        self._health_check_timeout = health_check_timeout
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+    
+    @staticmethod
+    def _create_connector(config: ConnectionConfig) -> DataConnector:
+        if config.type == "postgres":
+            return PostgresConnector(config)
+        elif config.type == "trino":
+            return TrinoConnector(config)
+        elif config.type == "duckdb":
+            return DuckDBConnector(config)
+        raise ValueError(f"Unsupported connection type: {config.type}")
     
     async def add_connection(
         self,
         config: ConnectionConfig,
+        lazy: bool = False,
     ) -> DataConnector:
-        """Add a new connection to the pool"""
+        """
+        Add a new connection to the pool
+        
+        Unless ``lazy`` is set the connector is connected and tested right
+        away; otherwise that happens on first ``acquire`` or ``warmup``.
+        """
         if config.name in self._connections:
             raise ValueError(f"Connection {config.name} already exists")
         
-        # Create appropriate connector
-        if config.type == "postgres":
-            connector = PostgresConnector(config)
-        elif config.type == "trino":
-            connector = TrinoConnector(config)
-        elif config.type == "duckdb":
-            connector = DuckDBConnector(config)
-        else:
-            raise ValueError(f"Unsupported connection type: {config.type}")
-        
-        # Connect
-        await connector.connect()
+        connector = self._create_connector(config)
+        self._connections[config.name] = connector
+        self._connect_locks[config.name] = asyncio.Lock()
+        self._breakers[config.name] = CircuitBreaker(self._failure_threshold, self._recovery_timeout)
         
-        # Test connection
-        if not await connector.test_connection():
-            await connector.disconnect()
-            raise RuntimeError(f"Failed to connect to {config.name}")
+        if not lazy:
+            try:
+                await self._ensure_connected(config.name)
+            except BaseException:
+                self._forget(config.name)
+                raise
         
-        self._connections[config.name] = connector
         return connector
     
     def get_connection(self, name: str) -> DataConnector:
-        """Get a connection by name"""
+        """Get a connection by name (use ``acquire`` for lazily added connections)"""
         if name not in self._connections:
             raise KeyError(f"Connection {name} not found")
         return self._connections[name]
     
+    async def acquire(self, name: str) -> DataConnector:
+        """Get a connected connector, connecting it on first use
+        
+        Raises RuntimeError while the connector's circuit breaker is open.
+        """
+        if name not in self._connections:
+            raise KeyError(f"Connection {name} not found")
+        breaker = self._breakers[name]
+        if not breaker.allow_request():
+            raise RuntimeError(f"Connection {name} is unavailable after repeated failures")
+        if breaker.probing and name in self._connected:
+            # This request is the half-open probe: check the connector before handing it out
+            if not await self._test(name):
+                raise RuntimeError(f"Connection {name} is unavailable after repeated failures")
+        return await self._ensure_connected(name)
+    
+    async def _ensure_connected(self, name: str) -> DataConnector:
+        connector = self._connections[name]
+        if name in self._connected:
+            return connector
+        
+        async with self._connect_locks[name]:
+            if name in self._connected:
+                return connector
+            
+            breaker = self._breakers[name]
+            try:
+                await connector.connect()
+                if not await connector.test_connection():
+                    raise RuntimeError(f"Failed to connect to {name}")
+            except Exception:
+                breaker.record_failure()
+                with suppress(Exception):
+                    await connector.disconnect()
+                raise
+            
+            breaker.record_success()
+            self._connected.add(name)
+        return connector
+    
+    def _forget(self, name: str) -> None:
+        self._connections.pop(name, None)
+        self._connected.discard(name)
+        self._connect_locks.pop(name, None)
+        self._breakers.pop(name, None)
+    
+    async def warmup(self, names: Optional[List[str]] = None) -> Dict[str, bool]:
+        """Connect the given (default: all) connections concurrently
+        
+        Returns whether each connection came up; failures are recorded on the
+        connection's circuit breaker rather than raised.
+        """
+        names = list(self._connections) if names is None else list(names)
+        results = await asyncio.gather(
+            *(self._ensure_connected(name) for name in names),
+            return_exceptions=True,
+        )
+        return {name: not isinstance(result, BaseException) for name, result in zip(names, results)}
+    
+    def start_health_checks(self) -> None:
+        """Start probing connections every ``health_check_interval`` seconds"""
+        if self._health_task is None or self._health_task.done():
+            self._health_task = asyncio.create_task(self._health_loop())
+    
+    async def stop_health_checks(self) -> None:
+        """Stop the background health probes"""
+        task, self._health_task = self._health_task, None
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._health_check_interval)
+            await self.check_health()
+    
+    async def check_health(self) -> Dict[str, str]:
+        """Probe all connections once and return their circuit breaker states"""
+        await asyncio.gather(*(self._probe(name) for name in list(self._connections)))
+        return self.health_status()
+    
+    async def _probe(self, name: str) -> None:
+        breaker = self._breakers.get(name)
+        if breaker is None or not breaker.allow_request():
+            return
+        
+        if name not in self._connected:
+            # Lazy connections stay untouched until first use; ones that failed
+            # to connect are retried once the breaker lets a probe through
+            if breaker.failures:
+                with suppress(Exception):
+                    await self._ensure_connected(name)
+            return
+        
+        await self._test(name)
+    
+    async def _test(self, name: str) -> bool:
+        """Test a connected connector and record the outcome on its breaker"""
+        try:
+            healthy = await asyncio.wait_for(
+                self._connections[name].test_connection(),
+                self._health_check_timeout,
+            )
+        except Exception:
+            healthy = False
+        
+        breaker = self._breakers.get(name)
+        if breaker is not None:
+            if healthy:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+        return healthy
+    
+    async def execute_query(
+        self,
+        name: str,
+        query: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        timeout: Optional[int] = 30,
+        user_id: Optional[str] = None,
+    ) -> QueryResult:
+        """Run a query on a connection once it admits one more for ``user_id``"""
+        connector = await self.acquire(name)
+        async with connector.admit(user_id):
+            return await connector.execute_query(query, parameters, timeout)
+    
+    async def execute_stream(
+        self,
+        name: str,
+        query: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        timeout: Optional[int] = 30,
+        batch_size: int = DEFAULT_STREAM_BATCH_SIZE,
+        user_id: Optional[str] = None,
+    ) -> AsyncIterator[QueryResult]:
+        """Stream a query on a connection, holding its slot until the stream ends"""
+        connector = await self.acquire(name)
+        async with connector.admit(user_id):
+            async with aclosing(connector.execute_stream(query, parameters, timeout, batch_size)) as batches:
+                async for batch in batches:
+                    yield batch
+    
+    def admission_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Admission metrics for every connection with a concurrency limit"""
+        stats = {}
+        for name, connector in self._connections.items():
+            connector_stats = connector.admission_stats()
+            if connector_stats is not None:
+                stats[name] = connector_stats
+        return stats
+    
+    def health_status(self) -> Dict[str, str]:
+        """Circuit breaker state per connection"""
+        return {name: breaker.state for name, breaker in self._breakers.items()}
+    
     async def remove_connection(self, name: str) -> None:
         """Remove and disconnect a connection"""
-        if name in self._connections:
-            await self._connections[name].disconnect()
-            del self._connections[name]
+        connector = self._connections.get(name)
+        if connector is None:
+            return
+        
+        connected = name in self._connected
+        self._forget(name)
+        if connected:
+            await connector.disconnect()
     
     async def close_all(self) -> None:
-        """Close all connections"""
-        for connector in self._connections.values():
-            await connector.disconnect()
-        self._connections.clear()
+        """Close all connections concurrently"""
+        await self.stop_health_checks()
+        
+        connectors = [self._connections[name] for name in self._connected]
+        for name in list(self._connections):
+            self._forget(name)
+        
+        results = await asyncio.gather(
+            *(connector.disconnect() for connector in connectors),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
     
     def list_connections(self) -> List[str]:
         """List all connection names"""
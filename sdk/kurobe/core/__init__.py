@@ -11,6 +11,7 @@ from kurobe.core.models import (
     QueryResult,
     EngineType,
 )
+from kurobe.core.columnar import ColumnarData, RowView, RowsView
 from kurobe.core.interfaces import (
     Engine,
     EngineConfig,
@@ -37,6 +38,10 @@ __all__ = [
     "DataPoint",
     "QueryResult",
     "EngineType",
+    # Columnar results
+    "ColumnarData",
+    "RowView",
+    "RowsView",
     # Interfaces
     "Engine",
     "EngineConfig",
@@ -0,0 +1,301 @@
+"""
+Columnar storage for query results
+
+Connectors hand their column buffers (Python sequences, NumPy arrays or Arrow
+arrays) to ``ColumnarData`` as-is. Values are only converted to Python objects
+when a column is first read, so results that are forwarded or serialized
+column-wise never pay for per-row materialization.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union, overload
+from collections.abc import Sequence as SequenceABC
+
+
+ColumnKey = Union[int, str]
+
+
+def _to_pylist(column: Any) -> List[Any]:
+    """Convert a column buffer to a list of Python values"""
+    if isinstance(column, list):
+        return column
+    if hasattr(column, "to_pylist"):
+        # pyarrow Array / ChunkedArray
+        return column.to_pylist()
+    if hasattr(column, "tolist"):
+        # numpy ndarray / MaskedArray (masked entries become None)
+        return column.tolist()
+    return list(column)
+
+
+def _value_at(column: Any, index: int) -> Any:
+    """Read a single Python value from a column buffer without converting the rest"""
+    mask = getattr(column, "mask", None)
+    if mask is not None and getattr(mask, "ndim", 0) and mask[index]:
+        return None
+    
+    value = column[index]
+    if hasattr(value, "as_py"):
+        return value.as_py()
+    if hasattr(value, "item") and not isinstance(value, (str, bytes)):
+        return value.item()
+    return value
+
+
+def _slice(column: Any, offset: int, length: int) -> Any:
+    """Slice a column buffer, zero-copy where the buffer type allows it"""
+    if hasattr(column, "to_pylist") and hasattr(column, "slice"):
+        return column.slice(offset, length)
+    return column[offset:offset + length]
+
+
+class ColumnarData:
+    """Column-oriented buffers backing a QueryResult"""
+    
+    __slots__ = ("_names", "_columns", "_num_rows", "_materialized")
+    
+    def __init__(self, names: Sequence[str], columns: Sequence[Any], num_rows: Optional[int] = None):
+        if len(names) != len(columns):
+            raise ValueError(f"Got {len(columns)} column buffers for {len(names)} column names")
+        
+        self._names: List[str] = list(names)
+        self._columns: List[Any] = list(columns)
+        self._num_rows = num_rows if num_rows is not None else (len(self._columns[0]) if self._columns else 0)
+        self._materialized: List[Optional[List[Any]]] = [None] * len(self._columns)
+    
+    @classmethod
+    def from_rows(cls, names: Sequence[str], rows: Sequence[Sequence[Any]]) -> "ColumnarData":
+        """Transpose row-oriented data (lists, tuples, asyncpg Records) into columns"""
+        if not isinstance(rows, (list, tuple)):
+            rows = list(rows)
+        
+        if rows:
+            columns: List[Any] = list(zip(*rows))
+        else:
+            columns = [() for _ in names]
+        return cls(names, columns, len(rows))
+    
+    @classmethod
+    def from_arrow(cls, table: Any) -> "ColumnarData":
+        """Wrap a pyarrow Table or RecordBatch without copying its buffers"""
+        return cls(
+            list(table.schema.names),
+            [table.column(i) for i in range(table.num_columns)],
+            table.num_rows,
+        )
+    
+    @classmethod
+    def from_numpy(cls, arrays: Dict[str, Any], names: Optional[List[str]] = None) -> "ColumnarData":
+        """Wrap a mapping of column name to NumPy array (e.g. DuckDB ``fetchnumpy``)
+        
+        ``names`` replaces the mapping's keys in order, e.g. to keep duplicate
+        column names that the mapping had to make unique.
+        """
+        columns = list(arrays.values())
+        if names is None:
+            names = list(arrays)
+        elif len(names) != len(columns):
+            raise ValueError(f"Expected {len(columns)} column names, got {len(names)}")
+        return cls(list(names), columns)
+    
+    @classmethod
+    def from_ipc(cls, payload: bytes) -> "ColumnarData":
+        """Read data written by ``to_ipc``"""
+        import pyarrow as pa
+        
+        with pa.ipc.open_stream(payload) as reader:
+            return cls.from_arrow(reader.read_all())
+    
+    @property
+    def column_names(self) -> List[str]:
+        return list(self._names)
+    
+    @property
+    def num_columns(self) -> int:
+        return len(self._names)
+    
+    @property
+    def num_rows(self) -> int:
+        return self._num_rows
+    
+    def __len__(self) -> int:
+        return self._num_rows
+    
+    def _index(self, key: ColumnKey) -> int:
+        if isinstance(key, int):
+            return key
+        try:
+            return self._names.index(key)
+        except ValueError:
+            raise KeyError(key) from None
+    
+    def raw_column(self, key: ColumnKey) -> Any:
+        """Column buffer exactly as provided by the connector"""
+        return self._columns[self._index(key)]
+    
+    def column(self, key: ColumnKey) -> List[Any]:
+        """Python values of a single column, converted once and then cached"""
+        index = self._index(key)
+        values = self._materialized[index]
+        if values is None:
+            values = _to_pylist(self._columns[index])
+            if not isinstance(values, list):
+                values = list(values)
+            self._materialized[index] = values
+        return values
+    
+    def value(self, row: int, key: ColumnKey) -> Any:
+        """Single cell, read without materializing the whole column"""
+        index = self._index(key)
+        if row < 0:
+            row += self._num_rows
+        if not 0 <= row < self._num_rows:
+            raise IndexError("row index out of range")
+        
+        values = self._materialized[index]
+        if values is not None:
+            return values[row]
+        return _value_at(self._columns[index], row)
+    
+    def row(self, index: int) -> "RowView":
+        """Lazy view over one row"""
+        if index < 0:
+            index += self._num_rows
+        if not 0 <= index < self._num_rows:
+            raise IndexError("row index out of range")
+        return RowView(self, index)
+    
+    def iter_rows(self) -> Iterator[List[Any]]:
+        """Iterate rows as lists, materializing columns once up front"""
+        if not self._columns:
+            for _ in range(self._num_rows):
+                yield []
+            return
+        
+        for values in zip(*(self.column(i) for i in range(len(self._columns)))):
+            yield list(values)
+    
+    def to_pylist(self) -> List[List[Any]]:
+        """Row-oriented list-of-lists copy"""
+        return list(self.iter_rows())
+    
+    def to_pydict(self) -> Dict[str, List[Any]]:
+        """Column-oriented mapping; cheaper than ``to_pylist`` for serialization"""
+        return {name: self.column(i) for i, name in enumerate(self._names)}
+    
+    def slice(self, offset: int, length: int) -> "ColumnarData":
+        """Sub-range of rows sharing the underlying buffers"""
+        offset = max(0, min(offset, self._num_rows))
+        length = max(0, min(length, self._num_rows - offset))
+        return ColumnarData(
+            self._names,
+            [_slice(column, offset, length) for column in self._columns],
+            length,
+        )
+    
+    def to_arrow(self) -> Any:
+        """Convert to a pyarrow Table (requires pyarrow)"""
+        import pyarrow as pa
+        
+        arrays = []
+        for i, column in enumerate(self._columns):
+            if isinstance(column, (pa.Array, pa.ChunkedArray)):
+                arrays.append(column)
+            else:
+                arrays.append(pa.array(self.column(i)))
+        return pa.Table.from_arrays(arrays, names=self._names)
+    
+    def to_ipc(self) -> bytes:
+        """Serialize as an Arrow IPC stream (requires pyarrow)"""
+        import pyarrow as pa
+        
+        table = self.to_arrow()
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+
+class RowView(SequenceABC):
+    """Read-only view of a single row; values are read from the column buffers on access"""
+    
+    __slots__ = ("_data", "_index")
+    
+    def __init__(self, data: ColumnarData, index: int):
+        self._data = data
+        self._index = index
+    
+    def __len__(self) -> int:
+        return self._data.num_columns
+    
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(key, slice):
+            return [self._data.value(self._index, i) for i in range(self._data.num_columns)[key]]
+        if isinstance(key, int) and key < 0:
+            key += self._data.num_columns
+        if isinstance(key, int) and not 0 <= key < self._data.num_columns:
+            raise IndexError("column index out of range")
+        return self._data.value(self._index, key)
+    
+    def get(self, name: str, default: Any = None) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            return default
+    
+    def as_list(self) -> List[Any]:
+        return [self._data.value(self._index, i) for i in range(self._data.num_columns)]
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return dict(zip(self._data.column_names, self.as_list()))
+    
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, RowView):
+            return self.as_list() == other.as_list()
+        if isinstance(other, (list, tuple)):
+            return self.as_list() == list(other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"RowView({self.as_list()!r})"
+
+
+class RowsView(SequenceABC):
+    """List-of-lists compatibility view over ColumnarData"""
+    
+    __slots__ = ("_data",)
+    
+    def __init__(self, data: ColumnarData):
+        self._data = data
+    
+    @property
+    def data(self) -> ColumnarData:
+        return self._data
+    
+    def __len__(self) -> int:
+        return self._data.num_rows
+    
+    @overload
+    def __getitem__(self, index: int) -> List[Any]: ...
+    
+    @overload
+    def __getitem__(self, index: slice) -> List[List[Any]]: ...
+    
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self._data.row(i).as_list() for i in range(self._data.num_rows)[index]]
+        return self._data.row(index).as_list()
+    
+    def __iter__(self) -> Iterator[List[Any]]:
+        return self._data.iter_rows()
+    
+    def to_list(self) -> List[List[Any]]:
+        return self._data.to_pylist()
+    
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, RowsView):
+            return self._data is other._data or self.to_list() == other.to_list()
+        if isinstance(other, (list, tuple)):
+            return len(other) == len(self) and self.to_list() == [list(row) for row in other]
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"RowsView(rows={len(self)}, columns={self._data.column_names!r})"
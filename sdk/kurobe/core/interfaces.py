@@ -130,6 +130,10 @@ class VisualizationEngine(ABC):
         """
         Recommend visualizations for query results
         
+        ``query_result.data`` exposes the connector's column buffers (Arrow
+        or NumPy where available); read columns from it rather than iterating
+        ``rows`` to avoid per-row materialization.
+        
         Returns list of PanelSpec objects with recommended charts
         """
         pass
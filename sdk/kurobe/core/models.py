@@ -6,7 +6,9 @@ from typing import Any, Dict, List, Optional, Union
 from enum import Enum
 from uuid import UUID
 
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, PrivateAttr, field_serializer
+
+from kurobe.core.columnar import ColumnarData, RowView, RowsView
 
 
 class ChartType(str, Enum):
@@ -39,7 +41,11 @@ class DataPoint(BaseModel):
 
 
 class QueryResult(BaseModel):
-    """Result from a database query"""
+    """Result from a database query
+    
+    Connectors build results with ``from_columnar`` so rows are never validated
+    one by one; ``rows`` is then a lazy list-of-lists view over the column buffers.
+    """
     model_config = ConfigDict(arbitrary_types_allowed=True)
     
     columns: List[str]
@@ -48,6 +54,37 @@ class QueryResult(BaseModel):
     execution_time_ms: Optional[float] = None
     query: Optional[str] = None
     connection_id: Optional[str] = None
+    
+    _data: Optional[ColumnarData] = PrivateAttr(default=None)
+    
+    @classmethod
+    def from_columnar(cls, data: ColumnarData, **metadata: Any) -> "QueryResult":
+        """Build a result directly over column buffers, skipping validation"""
+        result = cls.model_construct(
+            columns=data.column_names,
+            rows=RowsView(data),
+            row_count=data.num_rows,
+            **metadata,
+        )
+        result._data = data
+        return result
+    
+    @property
+    def data(self) -> ColumnarData:
+        """Columnar representation of the result"""
+        if self._data is None:
+            self._data = ColumnarData.from_rows(self.columns, self.rows)
+        return self._data
+    
+    def row(self, index: int) -> RowView:
+        """Lazy view over a single row"""
+        return self.data.row(index)
+    
+    @field_serializer("rows")
+    def _serialize_rows(self, rows: Any) -> List[List[Any]]:
+        if isinstance(rows, RowsView):
+            return rows.to_list()
+        return rows
 
 
 class PanelSpec(BaseModel):
@@ -82,6 +119,7 @@ class Panel(BaseModel):
     spec: PanelSpec
     is_pinned: bool = False
     position: Optional[Dict[str, int]] = None  # {"x": 0, "y": 0}
+    result_hash: Optional[str] = None  # data and query_result, loaded separately
     created_by: UUID
     created_at: datetime
     updated_at: datetime
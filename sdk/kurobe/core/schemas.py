@@ -5,9 +5,9 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_serializer
 
-from kurobe.core.models import ChartType, Panel, PanelSpec, Question
+from kurobe.core.models import ChartType, DataPoint, Panel, PanelSpec, QueryResult, Question
 
 
 class QuestionRequest(BaseModel):
@@ -31,6 +31,36 @@ class QuestionResponse(BaseModel):
     completed_at: Optional[datetime] = None
 
 
+class QuestionSummary(BaseModel):
+    """Projection of a question holding only the fields selected with ``?fields=``"""
+    id: Optional[UUID] = None
+    text: Optional[str] = None
+    status: Optional[str] = None
+    panels: Optional[List[PanelSpec]] = None
+    plan: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    @model_serializer(mode="wrap")
+    def _serialize_selected(self, handler):
+        # Leave out the fields that were not selected rather than sending nulls
+        return {name: value for name, value in handler(self).items() if name in self.model_fields_set}
+
+
+class QuestionListResponse(BaseModel):
+    """Page of questions; pass ``next_cursor`` back to get the next page"""
+    questions: List[QuestionResponse]
+    next_cursor: Optional[str] = None
+
+
+class QuestionSummaryListResponse(BaseModel):
+    """Page of questions projected to the fields selected with ``?fields=``"""
+    questions: List[QuestionSummary]
+    next_cursor: Optional[str] = None
+
+
 class PanelRequest(BaseModel):
     """Request to create/update a panel"""
     question_id: UUID
@@ -46,10 +76,19 @@ class PanelResponse(BaseModel):
     spec: PanelSpec
     is_pinned: bool
     position: Optional[Dict[str, int]]
+    result_hash: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
 
+class PanelResultResponse(BaseModel):
+    """Data and query result of a panel, stored apart from its spec"""
+    panel_id: UUID
+    result_hash: str
+    data: Optional[List[DataPoint]] = None
+    query_result: Optional[QueryResult] = None
+
+
 class DashboardRequest(BaseModel):
     """Request to create/update a dashboard"""
     name: str
@@ -78,6 +117,27 @@ class DashboardResponse(BaseModel):
     updated_at: datetime
 
 
+class DashboardSummary(BaseModel):
+    """Projection of a dashboard holding only the fields selected with ``?fields=``"""
+    id: Optional[UUID] = None
+    user_id: Optional[UUID] = None
+    name: Optional[str] = None
+    description: Optional[str] = None
+    panels: Optional[List[Panel]] = None
+    layout: Optional[Dict[str, Any]] = None
+    refresh_interval: Optional[int] = None
+    filters: Optional[Dict[str, Any]] = None
+    tags: Optional[List[str]] = None
+    is_public: Optional[bool] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    @model_serializer(mode="wrap")
+    def _serialize_selected(self, handler):
+        # Leave out the fields that were not selected rather than sending nulls
+        return {name: value for name, value in handler(self).items() if name in self.model_fields_set}
+
+
 class ChatMessage(BaseModel):
     """Chat message in a conversation"""
     role: str  # "user" or "assistant"
@@ -86,6 +146,12 @@ class ChatMessage(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
 
 
+class ChatHistoryResponse(BaseModel):
+    """Page of a question's chat messages, oldest first"""
+    messages: List[ChatMessage]
+    next_cursor: Optional[str] = None
+
+
 class ChatRequest(BaseModel):
     """Request for chat interaction"""
     question_id: UUID
@@ -1,11 +1,11 @@
 """
 Question management following the Kortix pattern
 """
-from typing import List, Optional, AsyncGenerator
+from typing import List, Optional, AsyncGenerator, AsyncIterator
 from uuid import UUID
 
 from kurobe.api.questions import QuestionsClient, ChatRequest
-from kurobe.core.schemas import QuestionResponse, ChatResponse
+from kurobe.core.schemas import QuestionResponse, ChatResponse, PanelResultResponse
 from kurobe.core.models import Panel, PanelSpec
 
 
@@ -45,6 +45,10 @@ class Question:
         panels_data = await self._client.get_question_panels(self._question_id)
         return [PanelSpec(**panel) for panel in panels_data]
     
+    async def get_panel_result(self, panel_id: UUID) -> PanelResultResponse:
+        """Get the data and query result of a panel, loaded separately from its spec"""
+        return await self._client.get_panel_result(self._question_id, panel_id)
+    
     async def update_tags(self, tags: List[str]) -> QuestionResponse:
         """Update question tags"""
         response = await self._client.update_question(self._question_id, tags=tags)
@@ -105,6 +109,7 @@ class KurobeQuestion:
         offset: int = 0,
         status: Optional[str] = None,
         tags: Optional[List[str]] = None,
+        cursor: Optional[str] = None,
     ) -> List[Question]:
         """List questions with filters"""
         responses = await self._client.list_questions(
@@ -112,5 +117,16 @@ class KurobeQuestion:
             offset=offset,
             status=status,
             tags=tags,
+            cursor=cursor,
         )
         return [Question(self._client, resp.id) for resp in responses]
+    
+    async def iterate(
+        self,
+        page_size: int = 20,
+        status: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+    ) -> AsyncIterator[Question]:
+        """Iterate over all matching questions, newest first, fetching pages as needed"""
+        async for response in self._client.iter_questions(page_size, status=status, tags=tags):
+            yield Question(self._client, response.id)
@@ -0,0 +1,98 @@
+"""
+Tests for per-connection admission control with fair queuing
+"""
+import asyncio
+
+import pytest
+
+from kurobe.bi.connectors import AdmissionController, AdmissionRejectedError
+
+
+async def test_admission_runs_up_to_max_in_flight_at_once():
+    controller = AdmissionController(max_in_flight=2)
+
+    await controller.acquire()
+    await controller.acquire()
+    waiter = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+
+    assert not waiter.done()
+    assert controller.stats()["queue_depth"] == 1
+
+    controller.release()
+    await waiter
+    stats = controller.stats()
+    assert stats["in_flight"] == 2
+    assert stats["queue_depth"] == 0
+    assert stats["admitted"] == 3
+
+
+async def test_admission_hands_slots_out_round_robin_across_users():
+    controller = AdmissionController(max_in_flight=1)
+    await controller.acquire("holder")
+    order = []
+
+    async def query(user_id, label):
+        async with controller.slot(user_id):
+            order.append(label)
+
+    tasks = [asyncio.create_task(query("a", f"a{i}")) for i in range(3)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(query("b", "b0")))
+    await asyncio.sleep(0)
+    assert controller.stats()["queue_depth_by_user"] == {"a": 3, "b": 1}
+
+    controller.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["a0", "b0", "a1", "a2"]
+    assert controller.stats()["in_flight"] == 0
+
+
+async def test_admission_rejects_when_the_queue_is_full():
+    controller = AdmissionController(max_in_flight=1, max_queued=1)
+    await controller.acquire()
+    waiter = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejectedError):
+        await controller.acquire()
+    assert controller.stats()["rejected"] == 1
+
+    controller.release()
+    await waiter
+
+
+async def test_admission_gives_up_after_the_queue_timeout():
+    controller = AdmissionController(max_in_flight=1, queue_timeout=0.01)
+    await controller.acquire()
+
+    with pytest.raises(AdmissionRejectedError):
+        await controller.acquire("late")
+
+    stats = controller.stats()
+    assert stats["timed_out"] == 1
+    assert stats["queue_depth"] == 0
+    assert stats["queue_depth_by_user"] == {}
+    assert stats["in_flight"] == 1
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    controller = AdmissionController(max_in_flight=1)
+    await controller.acquire()
+    waiter = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert controller.stats()["queue_depth"] == 0
+
+    # The slot is freed rather than handed to the cancelled waiter
+    controller.release()
+    assert controller.stats()["in_flight"] == 0
+
+
+def test_admission_needs_at_least_one_slot():
+    with pytest.raises(ValueError):
+        AdmissionController(max_in_flight=0)
@@ -0,0 +1,106 @@
+"""
+Tests for the columnar query result storage
+"""
+from decimal import Decimal
+
+import pytest
+
+from kurobe.core.columnar import ColumnarData
+from kurobe.core.models import QueryResult
+
+
+def test_from_rows_transposes_into_columns():
+    data = ColumnarData.from_rows(["id", "name"], [(1, "a"), (2, "b"), (3, "c")])
+
+    assert data.num_rows == 3
+    assert data.column_names == ["id", "name"]
+    assert data.column("name") == ["a", "b", "c"]
+    assert data.value(-1, 0) == 3
+    assert data.row(1).as_dict() == {"id": 2, "name": "b"}
+    assert data.to_pylist() == [[1, "a"], [2, "b"], [3, "c"]]
+    assert data.to_pydict() == {"id": [1, 2, 3], "name": ["a", "b", "c"]}
+
+
+def test_from_rows_keeps_columns_of_empty_results():
+    data = ColumnarData.from_rows(["id", "name"], [])
+
+    assert data.num_rows == 0
+    assert data.column_names == ["id", "name"]
+    assert data.to_pylist() == []
+    assert data.to_pydict() == {"id": [], "name": []}
+
+
+def test_mismatched_names_and_columns_are_rejected():
+    with pytest.raises(ValueError):
+        ColumnarData(["a", "b"], [[1]])
+
+
+def test_missing_columns_and_rows_raise():
+    data = ColumnarData.from_rows(["id"], [(1,)])
+
+    with pytest.raises(KeyError):
+        data.column("missing")
+    with pytest.raises(IndexError):
+        data.row(1)
+    with pytest.raises(IndexError):
+        data.value(5, "id")
+
+
+def test_duplicate_column_names_resolve_to_the_first():
+    data = ColumnarData.from_rows(["a", "a"], [(1, 2)])
+
+    assert data.column_names == ["a", "a"]
+    assert data.value(0, "a") == 1
+    assert data.value(0, 1) == 2
+
+
+def test_slice_clamps_to_the_available_rows():
+    data = ColumnarData.from_rows(["n"], [(i,) for i in range(5)])
+
+    assert data.slice(3, 10).column("n") == [3, 4]
+    assert data.slice(10, 2).num_rows == 0
+    assert data.slice(1, 2).column_names == ["n"]
+
+
+def test_query_result_rows_view_compares_to_lists():
+    result = QueryResult.from_columnar(ColumnarData.from_rows(["x", "y"], [(1, Decimal("1.5"))]), query="SELECT 1")
+
+    assert result.columns == ["x", "y"]
+    assert result.row_count == 1
+    assert result.rows == [[1, Decimal("1.5")]]
+    assert result.rows[0] == [1, Decimal("1.5")]
+
+
+def test_from_numpy_takes_names_in_order():
+    np = pytest.importorskip("numpy")
+
+    data = ColumnarData.from_numpy({"a": np.array([1, 2]), "a_1": np.array([3.5, 4.5])}, names=["a", "a"])
+
+    assert data.column_names == ["a", "a"]
+    assert data.value(1, 1) == 4.5
+    assert isinstance(data.value(0, 0), int)
+    assert data.to_pylist() == [[1, 3.5], [2, 4.5]]
+
+    with pytest.raises(ValueError):
+        ColumnarData.from_numpy({"a": np.array([1])}, names=["a", "b"])
+
+
+def test_masked_numpy_values_read_as_none():
+    np = pytest.importorskip("numpy")
+
+    data = ColumnarData.from_numpy({"v": np.ma.masked_array([1, 2, 3], mask=[False, True, False])})
+
+    assert data.value(1, "v") is None
+    assert data.column("v") == [1, None, 3]
+
+
+def test_arrow_round_trip_through_ipc():
+    pa = pytest.importorskip("pyarrow")
+
+    table = pa.table({"id": [1, 2, 3], "name": ["a", None, "c"]})
+    data = ColumnarData.from_arrow(table)
+
+    assert data.slice(1, 2).to_pylist() == [[2, None], [3, "c"]]
+    restored = ColumnarData.from_ipc(data.to_ipc())
+    assert restored.column_names == ["id", "name"]
+    assert restored.to_pylist() == [[1, "a"], [2, None], [3, "c"]]
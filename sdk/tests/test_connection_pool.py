@@ -0,0 +1,107 @@
+"""
+Tests for circuit breaking in the connection pool
+"""
+import pytest
+
+from kurobe.bi import connectors
+from kurobe.bi.connectors import CircuitBreaker, ConnectionConfig, ConnectionPool
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(connectors.time, "monotonic", clock)
+    return clock
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=30)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+
+def test_breaker_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_breaker_lets_a_single_probe_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=30)
+    breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert breaker.probing
+    assert not breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert not breaker.probing
+    assert breaker.allow_request()
+
+
+def test_failed_probe_reopens_the_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=30)
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.now += 30
+    assert breaker.allow_request()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    clock.now += 30
+    assert breaker.allow_request()
+
+
+def test_stalled_probe_is_given_up_after_the_recovery_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow_request()
+
+    clock.now += 29
+    assert not breaker.allow_request()
+    clock.now += 1
+    assert breaker.allow_request()
+
+
+async def test_pool_circuit_breaks_a_connection_that_keeps_failing(monkeypatch):
+    pytest.importorskip("duckdb")
+    pool = ConnectionPool(failure_threshold=2, recovery_timeout=60)
+    connector = await pool.add_connection(ConnectionConfig(name="local", type="duckdb"), lazy=True)
+
+    async def unhealthy():
+        return False
+
+    monkeypatch.setattr(connector, "test_connection", unhealthy)
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="Failed to connect"):
+            await pool.acquire("local")
+
+    with pytest.raises(RuntimeError, match="unavailable"):
+        await pool.acquire("local")
+    assert pool.health_status() == {"local": CircuitBreaker.OPEN}
+    await pool.close_all()
@@ -0,0 +1,59 @@
+"""
+Tests for DuckDB result fetching in every fetch format
+"""
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from kurobe.bi.connectors import ConnectionConfig, DuckDBConnector
+
+pytest.importorskip("duckdb")
+
+
+@pytest.fixture(params=["arrow", "numpy", "rows"])
+async def duckdb(request):
+    pytest.importorskip("pyarrow" if request.param == "arrow" else "numpy")
+    connector = DuckDBConnector(
+        ConnectionConfig(name="local", type="duckdb", extra_params={"fetch_format": request.param})
+    )
+    await connector.connect()
+    yield connector
+    await connector.disconnect()
+
+
+async def fetch(connector: DuckDBConnector, query: str) -> tuple:
+    """The first row of a query, both executed and streamed"""
+    result = await connector.execute_query(query)
+    streamed = [batch async for batch in connector.execute_stream(query)]
+    assert streamed[0].rows[0] == result.rows[0]
+    return result.columns, result.rows[0]
+
+
+async def test_duplicate_column_names_are_kept(duckdb):
+    columns, row = await fetch(duckdb, "SELECT 1 AS a, 2 AS a")
+    
+    assert columns == ["a", "a"]
+    assert row == [1, 2]
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("SELECT sum(range) FROM range(10)", 45),
+        ("SELECT 1::UHUGEINT", 1),
+        ("SELECT [170141183460469231731687303715884105727::HUGEINT]", [2**127 - 1]),
+        ("SELECT 1.500::DECIMAL(18,3)", Decimal("1.500")),
+        ("SELECT 12345678901234567890.12::DECIMAL(38,2)", Decimal("12345678901234567890.12")),
+        ("SELECT '2026-01-01 12:00:00.123456789'::TIMESTAMP_NS", datetime(2026, 1, 1, 12, 0, 0, 123456)),
+        ("SELECT 2::BIGINT", 2),
+    ],
+)
+async def test_values_match_fetchall(duckdb, query, expected):
+    _, [value] = await fetch(duckdb, query)
+    
+    # Decimal("3") == 3, so the type is checked as well
+    assert value == expected
+    assert type(value) is type(expected)
+    if isinstance(value, list):
+        assert [type(item) for item in value] == [type(item) for item in expected]
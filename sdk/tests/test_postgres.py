@@ -0,0 +1,77 @@
+"""
+Tests for the PostgreSQL connector against a live server
+
+Set KUROBE_TEST_POSTGRES_HOST (and the _PORT/_USER/_PASSWORD/_DATABASE
+variables when they differ from the defaults) to run them.
+"""
+import os
+
+import pytest
+
+from kurobe.bi.connectors import ConnectionConfig, PostgresConnector
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("KUROBE_TEST_POSTGRES_HOST"), reason="KUROBE_TEST_POSTGRES_HOST is not set"
+)
+
+
+@pytest.fixture
+async def postgres():
+    connector = PostgresConnector(ConnectionConfig(
+        name="pg",
+        type="postgres",
+        host=os.environ.get("KUROBE_TEST_POSTGRES_HOST"),
+        port=int(os.environ.get("KUROBE_TEST_POSTGRES_PORT", 5432)),
+        database=os.environ.get("KUROBE_TEST_POSTGRES_DATABASE", "postgres"),
+        username=os.environ.get("KUROBE_TEST_POSTGRES_USER", "postgres"),
+        password=os.environ.get("KUROBE_TEST_POSTGRES_PASSWORD", "postgres"),
+        extra_params={"prepared_statement_cache_size": 2},
+    ))
+    await connector.connect()
+    # The pool hands out the most recently released connection, so these
+    # tests run every query on the same one
+    await connector.execute_query("DROP TABLE IF EXISTS kurobe_test_items")
+    await connector.execute_query("CREATE TABLE kurobe_test_items (id int, name text)")
+    yield connector
+    await connector.execute_query("DROP TABLE kurobe_test_items")
+    await connector.disconnect()
+
+
+async def test_repeated_queries_hit_the_statement_cache(postgres):
+    for _ in range(3):
+        await postgres.execute_query("SELECT id FROM kurobe_test_items")
+    
+    stats = postgres.statement_cache_stats()
+    # The DROP, the CREATE and the first SELECT prepared a statement each
+    assert (stats["hits"], stats["misses"]) == (2, 3)
+    assert stats["max_size_per_connection"] == 2
+
+
+async def test_least_recently_used_statements_are_evicted(postgres):
+    for query in ["SELECT 1", "SELECT 2", "SELECT 1"]:
+        await postgres.execute_query(query)
+    
+    stats = postgres.statement_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 4, 2)
+
+
+async def test_empty_result_columns_come_from_the_cached_statement(postgres):
+    result = await postgres.execute_query("SELECT id, name AS label FROM kurobe_test_items")
+    
+    assert result.columns == ["id", "label"]
+    assert result.row_count == 0
+    async with postgres._pool.acquire() as conn:
+        prepared = await conn.fetchval("SELECT count(*) FROM pg_prepared_statements")
+    # Only the statements the queries ran with; no extra one for the columns
+    assert prepared == 2
+
+
+async def test_cached_statement_survives_a_schema_change(postgres):
+    await postgres.execute_query("INSERT INTO kurobe_test_items VALUES (1, 'a')")
+    assert (await postgres.execute_query("SELECT * FROM kurobe_test_items")).columns == ["id", "name"]
+    
+    await postgres.execute_query("ALTER TABLE kurobe_test_items ADD COLUMN price int DEFAULT 0")
+    result = await postgres.execute_query("SELECT * FROM kurobe_test_items")
+    
+    assert result.columns == ["id", "name", "price"]
+    assert result.rows == [[1, "a", 0]]
@@ -0,0 +1,154 @@
+"""
+Tests for the Trino protocol client: paging, retries and cancellation
+"""
+import asyncio
+import json
+from contextlib import aclosing
+
+import httpx
+import pytest
+
+from kurobe.bi.connectors import ConnectionConfig, TrinoConnector
+
+
+def trino_connector(handler) -> TrinoConnector:
+    connector = TrinoConnector(ConnectionConfig(name="trino", type="trino", host="trino", port=8080))
+    connector._client = httpx.AsyncClient(base_url="http://trino:8080", transport=httpx.MockTransport(handler))
+    return connector
+
+
+def page(next_uri=None, columns=None, data=None, **extra):
+    body = {"id": "q1", **extra}
+    if next_uri:
+        body["nextUri"] = next_uri
+    if columns:
+        body["columns"] = [{"name": name, "type": "integer"} for name in columns]
+    if data is not None:
+        body["data"] = data
+    return httpx.Response(200, content=json.dumps(body))
+
+
+async def test_trino_follows_next_uri_pages():
+    def handler(request):
+        if request.method == "POST":
+            assert request.content == b"SELECT x FROM t"
+            return page("/v1/statement/q1/1")
+        if request.url.path == "/v1/statement/q1/1":
+            return page("/v1/statement/q1/2", columns=["x"], data=[[1], [2]])
+        return page(columns=["x"], data=[[3]])
+
+    connector = trino_connector(handler)
+    result = await connector.execute_query("SELECT x FROM t")
+
+    assert result.columns == ["x"]
+    assert result.rows == [[1], [2], [3]]
+    await connector.disconnect()
+
+
+async def test_trino_retries_busy_responses():
+    statuses = iter([503, 429, 200])
+    requests = []
+
+    def handler(request):
+        requests.append(request.method)
+        status = next(statuses)
+        if status != 200:
+            return httpx.Response(status, headers={"Retry-After": "0"})
+        return page(columns=["x"], data=[[1]])
+
+    connector = trino_connector(handler)
+    result = await connector.execute_query("SELECT 1")
+
+    assert result.rows == [[1]]
+    assert requests == ["POST", "POST", "POST"]
+    await connector.disconnect()
+
+
+async def test_trino_stops_retrying_after_max_retries(monkeypatch):
+    monkeypatch.setattr(TrinoConnector, "MAX_RETRIES", 2)
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(503, headers={"Retry-After": "0"})
+
+    connector = trino_connector(handler)
+    with pytest.raises(httpx.HTTPStatusError):
+        await connector.execute_query("SELECT 1")
+
+    assert len(requests) == 3
+    await connector.disconnect()
+
+
+def test_trino_retry_delay_prefers_retry_after():
+    connector = TrinoConnector(ConnectionConfig(name="trino", type="trino"))
+
+    assert connector._retry_delay(httpx.Response(503, headers={"Retry-After": "2.5"}), 0) == 2.5
+    assert connector._retry_delay(httpx.Response(503, headers={"Retry-After": "soon"}), 2) == pytest.approx(0.4)
+    assert connector._retry_delay(httpx.Response(503), 20) == TrinoConnector.RETRY_BACKOFF_MAX
+
+
+async def test_trino_cancels_a_stream_closed_early():
+    deleted = []
+
+    def handler(request):
+        if request.method == "DELETE":
+            deleted.append(request.url.path)
+            return httpx.Response(204)
+        if request.method == "POST":
+            return page("/v1/statement/q1/1", columns=["x"], data=[[1], [2]])
+        return page("/v1/statement/q1/2", columns=["x"], data=[[3], [4]])
+
+    connector = trino_connector(handler)
+    async with aclosing(connector.execute_stream("SELECT x FROM t", batch_size=2)) as batches:
+        async for batch in batches:
+            assert batch.rows == [[1], [2]]
+            break
+
+    assert deleted == ["/v1/statement/q1/1"]
+    await connector.disconnect()
+
+
+async def test_trino_cancels_a_query_that_times_out():
+    deleted = []
+
+    async def handler(request):
+        if request.method == "DELETE":
+            deleted.append(request.url.path)
+            return httpx.Response(204)
+        if request.method == "POST":
+            return page("/v1/statement/q1/1")
+        await asyncio.sleep(10)
+        return page(columns=["x"], data=[])
+
+    connector = trino_connector(handler)
+    with pytest.raises(TimeoutError):
+        await connector.execute_query("SELECT x FROM t", timeout=0.05)
+
+    assert deleted == ["/v1/statement/q1/1"]
+    await connector.disconnect()
+
+
+async def test_trino_does_not_cancel_a_finished_query():
+    deleted = []
+
+    def handler(request):
+        if request.method == "DELETE":
+            deleted.append(request.url.path)
+        return page(columns=["x"], data=[[1]])
+
+    connector = trino_connector(handler)
+    await connector.execute_query("SELECT 1")
+
+    assert deleted == []
+    await connector.disconnect()
+
+
+async def test_trino_query_error_is_raised():
+    def handler(request):
+        return page(error={"message": "line 1:8: Column 'y' cannot be resolved"})
+
+    connector = trino_connector(handler)
+    with pytest.raises(RuntimeError, match="cannot be resolved"):
+        await connector.execute_query("SELECT y")
+    await connector.disconnect()